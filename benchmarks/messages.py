@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import functools
+import json
+import random
+from typing import Any
+
+# Replayable WebSocket message sequences in each exchange's wire format. The
+# order book moves as a seeded random walk so that every run replays the same
+# frames: a snapshot followed by diffs that update, delete and insert levels
+# near the top of the book and keep the book uncrossed as the mid price moves.
+# Frames are kept as raw JSON text and decoded in the benchmark setup, like
+# frames received from the socket.
+
+NUM_MESSAGES = 1000
+
+
+class BookWalk:
+    def __init__(
+        self, seed: int, mid: int, levels: int, *, changes: tuple[int, int]
+    ) -> None:
+        self._random = random.Random(seed)
+        self._changes = changes
+        self.mid = mid
+        self.asks = {mid + 1 + i: self._size() for i in range(levels)}
+        self.bids = {mid - 1 - i: self._size() for i in range(levels)}
+
+    def _size(self) -> float:
+        return round(self._random.lognormvariate(0.0, 1.5), 3) or 0.001
+
+    def snapshot(self, depth: int) -> tuple[list[tuple[int, float]], ...]:
+        asks = sorted(self.asks.items())[:depth]
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        return asks, bids
+
+    def step(self) -> tuple[list[tuple[int, float]], ...]:
+        # Returns the changed (tick, size) levels per side, size 0 is a delete.
+        asks: dict[int, float] = {}
+        bids: dict[int, float] = {}
+
+        self.mid += self._random.choice((-1, 0, 0, 0, 1))
+        for book, changed, crossed in (
+            (self.asks, asks, lambda tick: tick <= self.mid),
+            (self.bids, bids, lambda tick: tick >= self.mid),
+        ):
+            for tick in [tick for tick in book if crossed(tick)]:
+                del book[tick]
+                changed[tick] = 0.0
+
+        for _ in range(self._random.randint(*self._changes)):
+            book, changed, sign = self._random.choice(
+                ((self.asks, asks, 1), (self.bids, bids, -1))
+            )
+            tick = self.mid + sign * (1 + int(self._random.expovariate(0.05)))
+            if tick in book and self._random.random() < 0.2:
+                del book[tick]
+                changed[tick] = 0.0
+            else:
+                book[tick] = changed[tick] = self._size()
+
+        return sorted(asks.items()), sorted(bids.items(), reverse=True)
+
+
+def _dumps(messages: list[Any]) -> list[str]:
+    return [json.dumps(msg, separators=(",", ":")) for msg in messages]
+
+
+def _levels(levels: list[tuple[int, float]], tick: float, digits: int) -> list[Any]:
+    return [[f"{t * tick:.{digits}f}", f"{s:.3f}" if s else "0"] for t, s in levels]
+
+
+@functools.cache
+def binance_depth() -> tuple[dict[str, Any], list[str]]:
+    """GET /fapi/v1/depth snapshot and ``<symbol>@depth@100ms`` diffs."""
+    walk = BookWalk(1, 600_000, 1000, changes=(5, 40))
+    asks, bids = walk.snapshot(1000)
+    update_id = 1_000_000
+    snapshot = {
+        "lastUpdateId": update_id,
+        "E": 1700000000000,
+        "T": 1700000000000,
+        "bids": _levels(bids, 0.1, 1),
+        "asks": _levels(asks, 0.1, 1),
+    }
+    messages = []
+    for i in range(NUM_MESSAGES):
+        asks, bids = walk.step()
+        first_id, update_id = update_id + 1, update_id + len(asks) + len(bids) + 1
+        messages.append(
+            {
+                "stream": "btcusdt@depth@100ms",
+                "data": {
+                    "e": "depthUpdate",
+                    "E": 1700000000100 + i * 100,
+                    "T": 1700000000100 + i * 100,
+                    "s": "BTCUSDT",
+                    "U": first_id,
+                    "u": update_id,
+                    "pu": first_id - 1,
+                    "b": _levels(bids, 0.1, 1),
+                    "a": _levels(asks, 0.1, 1),
+                },
+            }
+        )
+    return snapshot, _dumps(messages)
+
+
+@functools.cache
+def bybit_orderbook() -> list[str]:
+    """``orderbook.500.<symbol>`` snapshot and deltas."""
+    walk = BookWalk(2, 600_000, 500, changes=(1, 30))
+    asks, bids = walk.snapshot(500)
+    messages: list[Any] = [
+        {
+            "topic": "orderbook.500.BTCUSDT",
+            "type": "snapshot",
+            "ts": 1700000000000,
+            "data": {
+                "s": "BTCUSDT",
+                "b": _levels(bids, 0.1, 1),
+                "a": _levels(asks, 0.1, 1),
+                "u": 1,
+                "seq": 1000,
+            },
+            "cts": 1700000000000,
+        }
+    ]
+    for i in range(1, NUM_MESSAGES):
+        asks, bids = walk.step()
+        messages.append(
+            {
+                "topic": "orderbook.500.BTCUSDT",
+                "type": "delta",
+                "ts": 1700000000000 + i * 20,
+                "data": {
+                    "s": "BTCUSDT",
+                    "b": _levels(bids, 0.1, 1),
+                    "a": _levels(asks, 0.1, 1),
+                    "u": 1 + i,
+                    "seq": 1000 + i,
+                },
+                "cts": 1700000000000 + i * 20,
+            }
+        )
+    return _dumps(messages)
+
+
+@functools.cache
+def bitflyer_board() -> tuple[dict[str, Any], list[str]]:
+    """``lightning_board_snapshot_<product_code>`` and ``lightning_board_<product_code>``."""
+    walk = BookWalk(3, 10_000_000, 500, changes=(1, 20))
+
+    def message(channel: str, asks: list[Any], bids: list[Any]) -> dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "method": "channelMessage",
+            "params": {
+                "channel": channel,
+                "message": {
+                    "mid_price": walk.mid,
+                    "bids": [{"price": t, "size": s} for t, s in bids],
+                    "asks": [{"price": t, "size": s} for t, s in asks],
+                },
+            },
+        }
+
+    snapshot = message("lightning_board_snapshot_FX_BTC_JPY", *walk.snapshot(500))
+    messages = [
+        message("lightning_board_FX_BTC_JPY", *walk.step()) for _ in range(NUM_MESSAGES)
+    ]
+    return snapshot, _dumps(messages)
+
+
+@functools.cache
+def okx_books() -> list[str]:
+    """``books`` snapshot and updates."""
+    walk = BookWalk(4, 600_000, 400, changes=(1, 30))
+
+    def message(action: str, i: int, asks: list[Any], bids: list[Any]) -> Any:
+        return {
+            "arg": {"channel": "books", "instId": "BTC-USDT"},
+            "action": action,
+            "data": [
+                {
+                    "asks": [[*level, "0", "1"] for level in _levels(asks, 0.1, 1)],
+                    "bids": [[*level, "0", "1"] for level in _levels(bids, 0.1, 1)],
+                    "ts": str(1700000000000 + i * 10),
+                    "checksum": -1000 - i,
+                    "prevSeqId": i - 1 if i else -1,
+                    "seqId": i,
+                }
+            ],
+        }
+
+    messages = [message("snapshot", 0, *walk.snapshot(400))]
+    for i in range(1, NUM_MESSAGES):
+        messages.append(message("update", i, *walk.step()))
+    return _dumps(messages)
+
+
+@functools.cache
+def hyperliquid_l2book() -> list[str]:
+    """``l2Book`` (each message is a 20 level snapshot)."""
+    walk = BookWalk(5, 600_000, 100, changes=(1, 20))
+    messages = []
+    for i in range(NUM_MESSAGES):
+        walk.step()
+        asks, bids = walk.snapshot(20)
+        messages.append(
+            {
+                "channel": "l2Book",
+                "data": {
+                    "coin": "BTC",
+                    "time": 1700000000000 + i * 500,
+                    "levels": [
+                        [
+                            {"px": f"{t / 10:.1f}", "sz": f"{s:.3f}", "n": 1}
+                            for t, s in side
+                        ]
+                        for side in (bids, asks)
+                    ],
+                },
+            }
+        )
+    return _dumps(messages)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import pytest
+
+import pybotters
+from pybotters.ws import WebSocketApp
+
+from . import messages
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+# Receive-to-handler latency of WebSocketApp per dispatch mode. Frames are
+# received one per event loop iteration while other tasks keep the loop busy,
+# and the latency is measured from the frame leaving the receive iterator to
+# the JSON handler being called.
+
+LOAD_TASKS = 20
+
+
+class FrameSource:
+    def __init__(self, frames: list[str]) -> None:
+        self.frames = frames
+        self.received: list[int] = []
+
+    def __aiter__(self) -> AsyncIterator[aiohttp.WSMessage]:
+        return self._receive()
+
+    async def _receive(self) -> AsyncIterator[aiohttp.WSMessage]:
+        for frame in self.frames:
+            await asyncio.sleep(0)
+            self.received.append(time.perf_counter_ns())
+            yield aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, frame, None)
+
+
+async def _load() -> None:
+    while True:
+        await asyncio.sleep(0)
+
+
+async def _replay(dispatch: Any) -> list[int]:
+    source = FrameSource(messages.bybit_orderbook())
+    store = pybotters.BybitDataStore()
+    latencies: list[int] = []
+    done = asyncio.Event()
+
+    def record(msg: Any, ws: Any) -> None:
+        latencies.append(time.perf_counter_ns() - source.received[len(latencies)])
+        if len(latencies) == len(source.frames):
+            done.set()
+
+    async with aiohttp.ClientSession() as session:
+        app = WebSocketApp(session, "ws://localhost", dispatch=dispatch)
+        app._task.cancel()
+
+        load = [asyncio.create_task(_load()) for _ in range(LOAD_TASKS)]
+        try:
+            await app._ws_receive(source, [], [], [store.onmessage, record])
+            await done.wait()
+        finally:
+            for task in load:
+                task.cancel()
+            await asyncio.gather(*load, return_exceptions=True)
+
+    return latencies
+
+
+@pytest.mark.benchmark(group="dispatch")
+@pytest.mark.parametrize("dispatch", ["call_soon", "inline"])
+def test_dispatch_latency(benchmark: BenchmarkFixture, dispatch: str) -> None:
+    latencies = asyncio.run(_replay(dispatch))
+    percentiles = statistics.quantiles(latencies, n=100)
+    benchmark.extra_info.update(
+        {
+            "messages": len(latencies),
+            "p50_us": percentiles[49] / 1e3,
+            "p99_us": percentiles[98] / 1e3,
+        }
+    )
+
+    benchmark.pedantic(asyncio.run, setup=lambda: ((_replay(dispatch),), {}), rounds=5)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+import pybotters._json
+
+from . import messages
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+# Decodes each exchange feed's frames with every JSON backend that is installed.
+# Compare the results within a group to see the gain of orjson / msgspec over
+# the standard library, which is the fallback of pybotters._json.loads.
+
+FEEDS: dict[str, Callable[[], list[str]]] = {
+    "binance-depth": lambda: messages.binance_depth()[1],
+    "bybit-orderbook": messages.bybit_orderbook,
+    "bitflyer-board": lambda: messages.bitflyer_board()[1],
+    "okx-books": messages.okx_books,
+    "hyperliquid-l2book": messages.hyperliquid_l2book,
+}
+
+
+BACKENDS: dict[str, Callable[[], Callable[[str], Any]]] = {
+    "json": lambda: json.loads,
+    "orjson": lambda: pybotters._json._orjson()[0],
+    "msgspec": lambda: pybotters._json._msgspec()[0],
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("feed", FEEDS)
+def test_decode_feed(benchmark: BenchmarkFixture, feed: str, backend: str) -> None:
+    if backend != "json":
+        pytest.importorskip(backend)
+    loads = BACKENDS[backend]()
+    frames = FEEDS[feed]()
+    benchmark.group = f"json-{feed}"
+    benchmark.extra_info["bytes"] = sum(len(frame) for frame in frames)
+
+    def decode() -> list[Any]:
+        return [loads(frame) for frame in frames]
+
+    result = benchmark(decode)
+
+    assert result == [json.loads(frame) for frame in frames]
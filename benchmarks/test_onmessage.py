@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+import pybotters
+
+from . import messages
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from pybotters.store import DataStoreCollection, SortedBookStore
+
+# Replays each exchange's order book messages through DataStoreCollection.onmessage.
+# Throughput, per-message latency percentiles and peak traced memory of a replay
+# are recorded in ``extra_info`` and appear in ``--benchmark-json`` output.
+
+
+@dataclass
+class Replay:
+    store_class: type[DataStoreCollection]
+    frames: Callable[[], list[str]]
+    book: Callable[[Any], SortedBookStore]
+    query: dict[str, str]
+    init: Callable[[Any], None] | None = None
+
+    def setup(self) -> tuple[DataStoreCollection, list[Any]]:
+        frames = [json.loads(frame) for frame in self.frames()]
+        store = self.store_class()
+        if self.init:
+            self.init(store)
+        return store, frames
+
+
+def _binance_init(store: pybotters.BinanceUSDSMDataStore) -> None:
+    snapshot, _ = messages.binance_depth()
+    store.orderbook._onresponse("BTCUSDT", json.loads(json.dumps(snapshot)))
+
+
+def _bitflyer_init(store: pybotters.bitFlyerDataStore) -> None:
+    # The snapshot channel is only applied together with the connection it is
+    # unsubscribed from, so it is applied to the board directly.
+    snapshot, _ = messages.bitflyer_board()
+    store._snapshots.add("FX_BTC_JPY")
+    store.board._onmessage(
+        "FX_BTC_JPY", json.loads(json.dumps(snapshot))["params"]["message"]
+    )
+
+
+REPLAYS = {
+    "binance-depth": Replay(
+        pybotters.BinanceUSDSMDataStore,
+        lambda: messages.binance_depth()[1],
+        lambda store: store.orderbook,
+        {"s": "BTCUSDT"},
+        _binance_init,
+    ),
+    "bybit-orderbook": Replay(
+        pybotters.BybitDataStore,
+        messages.bybit_orderbook,
+        lambda store: store.orderbook,
+        {"s": "BTCUSDT"},
+    ),
+    "bitflyer-board": Replay(
+        pybotters.bitFlyerDataStore,
+        lambda: messages.bitflyer_board()[1],
+        lambda store: store.board,
+        {"product_code": "FX_BTC_JPY"},
+        _bitflyer_init,
+    ),
+    "okx-books": Replay(
+        pybotters.OKXDataStore,
+        messages.okx_books,
+        lambda store: store.books,
+        {"instId": "BTC-USDT"},
+    ),
+    "hyperliquid-l2book": Replay(
+        pybotters.HyperliquidDataStore,
+        messages.hyperliquid_l2book,
+        lambda store: store.l2_book,
+        {"coin": "BTC"},
+    ),
+}
+
+
+def replay(store: DataStoreCollection, frames: list[Any]) -> None:
+    for msg in frames:
+        store.onmessage(msg)
+
+
+def profile(spec: Replay, repeat: int = 5) -> dict[str, float]:
+    samples: list[int] = []
+    for _ in range(repeat):
+        store, frames = spec.setup()
+        for msg in frames:
+            start = time.perf_counter_ns()
+            store.onmessage(msg)
+            samples.append(time.perf_counter_ns() - start)
+    percentiles = statistics.quantiles(samples, n=100)
+
+    frames = [json.loads(frame) for frame in spec.frames()]
+    tracemalloc.start()
+    try:
+        store = spec.store_class()
+        if spec.init:
+            spec.init(store)
+        replay(store, frames)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "messages": len(frames),
+        "messages_per_sec": len(samples) / (sum(samples) / 1e9),
+        "p50_us": percentiles[49] / 1e3,
+        "p99_us": percentiles[98] / 1e3,
+        "peak_bytes": peak,
+    }
+
+
+def assert_uncrossed(spec: Replay, store: DataStoreCollection) -> None:
+    book = spec.book(store)
+    top = book.sorted(spec.query, limit=1)
+    (ask,), (bid,) = top[book._ASC_SIDE], top[book._DESC_SIDE]
+    assert float(bid[book._PRICE_KEY]) < float(ask[book._PRICE_KEY])
+
+
+@pytest.mark.benchmark(group="onmessage")
+@pytest.mark.parametrize("name", REPLAYS)
+def test_onmessage_replay(benchmark: BenchmarkFixture, name: str) -> None:
+    spec = REPLAYS[name]
+    benchmark.extra_info.update(profile(spec))
+
+    stores: list[DataStoreCollection] = []
+
+    def setup() -> tuple[tuple[DataStoreCollection, list[Any]], dict[str, Any]]:
+        store, frames = spec.setup()
+        stores.append(store)
+        return (store, frames), {}
+
+    benchmark.pedantic(replay, setup=setup, rounds=10)
+
+    assert_uncrossed(spec, stores[-1])
+
+
+@pytest.mark.benchmark(group="onmessage-sorted")
+@pytest.mark.parametrize("limit", [1, 10, 100])
+@pytest.mark.parametrize("name", REPLAYS)
+def test_sorted_after_replay(
+    benchmark: BenchmarkFixture, name: str, limit: int
+) -> None:
+    spec = REPLAYS[name]
+    store, frames = spec.setup()
+    replay(store, frames)
+    book = spec.book(store)
+
+    result = benchmark(book.sorted, spec.query, limit)
+
+    levels = min(limit, len(book) // 2)
+    assert len(result[book._ASC_SIDE]) == len(result[book._DESC_SIDE]) == levels
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import itertools
+import operator
+import uuid
+from typing import TYPE_CHECKING
+
+import pytest
+
+import pybotters.store
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+LEVELS_PER_SIDE = 50
+
+
+def orderbook_items(num_symbols: int) -> list[dict[str, str]]:
+    return [
+        {"s": f"SYM{i}USDT", "S": side, "p": str(100 + j), "q": "1.0"}
+        for i in range(num_symbols)
+        for side in ("a", "b")
+        for j in range(LEVELS_PER_SIDE)
+    ]
+
+
+@pytest.mark.benchmark(group="find")
+@pytest.mark.parametrize("num_symbols", [10, 40, 90])
+@pytest.mark.parametrize("indexes", [[], [["s"]]], ids=["scan", "index"])
+def test_find_by_symbol(
+    benchmark: BenchmarkFixture, num_symbols: int, indexes: list[list[str]]
+) -> None:
+    ds = pybotters.store.DataStore(
+        keys=["s", "S", "p"], data=orderbook_items(num_symbols), indexes=indexes
+    )
+
+    result = benchmark(ds.find, {"s": "SYM0USDT"})
+
+    assert len(result) == LEVELS_PER_SIDE * 2
+
+
+class OrderBook(pybotters.store.SortedBookStore):
+    _KEYS = ["s", "S", "p"]
+    _BOOK_KEYS = ["s"]
+    _SIDE_KEY = "S"
+    _ASC_SIDE = "a"
+    _DESC_SIDE = "b"
+    _PRICE_KEY = "p"
+
+
+@pytest.mark.benchmark(group="sorted")
+@pytest.mark.parametrize("num_symbols", [1, 10, 40])
+def test_sorted_limit(benchmark: BenchmarkFixture, num_symbols: int) -> None:
+    ds = OrderBook(data=orderbook_items(num_symbols))
+
+    result = benchmark(ds.sorted, {"s": "SYM0USDT"}, 5)
+
+    assert [x["p"] for x in result["a"]] == ["100", "101", "102", "103", "104"]
+
+
+@pytest.mark.benchmark(group="sorted")
+@pytest.mark.parametrize("num_symbols", [1, 10, 40])
+def test_sorted_limit_without_book(
+    benchmark: BenchmarkFixture, num_symbols: int
+) -> None:
+    ds = pybotters.store.DataStore(
+        keys=["s", "S", "p"], data=orderbook_items(num_symbols), indexes=[["s"]]
+    )
+
+    result = benchmark(ds._sorted, "S", "a", "b", "p", {"s": "SYM0USDT"}, 5)
+
+    assert [x["p"] for x in result["a"]] == ["100", "101", "102", "103", "104"]
+
+
+@pytest.mark.benchmark(group="watch")
+@pytest.mark.parametrize("num_watchers", [1, 3, 10])
+def test_update_with_watchers(benchmark: BenchmarkFixture, num_watchers: int) -> None:
+    ds = OrderBook(data=orderbook_items(1))
+    streams = [ds.watch() for _ in range(num_watchers)]
+    data = orderbook_items(1)
+
+    benchmark.pedantic(ds._update, args=(data,), rounds=200)
+
+    for stream in streams:
+        stream.close()
+
+
+@pytest.mark.benchmark(group="watch-filter")
+@pytest.mark.parametrize("query", [None, {"s": "SYM0USDT"}], ids=["all", "query"])
+def test_update_with_filtered_watchers(
+    benchmark: BenchmarkFixture, query: dict[str, str] | None
+) -> None:
+    ds = OrderBook(data=orderbook_items(10))
+    streams = [ds.watch(query=query) for _ in range(3)]
+    data = orderbook_items(10)
+
+    benchmark.pedantic(ds._update, args=(data,), rounds=50)
+
+    for stream in streams:
+        stream.close()
+
+
+@pytest.mark.benchmark(group="append")
+@pytest.mark.parametrize(
+    "datastore_class",
+    [pybotters.store.DataStore, pybotters.store.RingStore],
+    ids=["datastore", "ringstore"],
+)
+def test_insert_at_capacity(
+    benchmark: BenchmarkFixture, datastore_class: type[pybotters.store.DataStore]
+) -> None:
+    ds = datastore_class(data=[{"p": str(i)} for i in range(9999)])
+    data = [[{"p": str(i)}] for i in range(100)]
+
+    def insert() -> None:
+        for item in data:
+            ds._insert(item)
+
+    benchmark(insert)
+
+    assert len(ds) == 9999
+
+
+class Trade(pybotters.store.RingStore):
+    _MAXLEN = 99999
+    _COLUMNS = {
+        "timestamp": ("T", "q", int),
+        "price": ("p", "d", float),
+        "size": ("q", "d", float),
+    }
+
+
+def trade_items(num_trades: int) -> list[dict[str, object]]:
+    return [
+        {"T": 1700000000000 + i, "p": f"{100 + i % 50}.5", "q": "0.01"}
+        for i in range(num_trades)
+    ]
+
+
+@pytest.mark.benchmark(group="columns")
+def test_prices_from_find(benchmark: BenchmarkFixture) -> None:
+    ds = Trade(data=trade_items(99999))
+
+    result = benchmark(lambda: [float(item["p"]) for item in ds.find()])
+
+    assert len(result) == 99999
+
+
+@pytest.mark.benchmark(group="columns")
+def test_prices_from_columns(benchmark: BenchmarkFixture) -> None:
+    ds = Trade(data=trade_items(99999))
+    ds.columns()
+
+    def read() -> memoryview:
+        ds._insert(trade_items(1))
+        return ds.columns()["price"]
+
+    result = benchmark(read)
+
+    assert len(result) == 99999
+
+
+def _row_key_uuid_hash(keys: list[str]) -> Callable[[dict[str, str]], object]:
+    # Per-row work of the DataStore core before integer row ids.
+    return lambda item: (hash(tuple({k: item[k] for k in keys}.items())), uuid.uuid4())
+
+
+def _row_key_int_itemgetter(keys: list[str]) -> Callable[[dict[str, str]], object]:
+    key = operator.itemgetter(*keys)
+    ids = itertools.count()
+    return lambda item: (key(item), next(ids))
+
+
+@pytest.mark.benchmark(group="row-key")
+@pytest.mark.parametrize(
+    "row_key",
+    [_row_key_uuid_hash, _row_key_int_itemgetter],
+    ids=["uuid_hash", "int_itemgetter"],
+)
+def test_row_key(
+    benchmark: BenchmarkFixture,
+    row_key: Callable[[list[str]], Callable[[dict[str, str]], object]],
+) -> None:
+    func = row_key(["s", "S", "p"])
+    data = orderbook_items(10)
+
+    def run() -> None:
+        for item in data:
+            func(item)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="depth")
+def test_depth_diff(benchmark: BenchmarkFixture) -> None:
+    ds = pybotters.store.DataStore(keys=["s", "S", "p"], data=orderbook_items(10))
+    updates = [{**item, "q": "2.0"} for item in orderbook_items(10)]
+    deletes = orderbook_items(1)
+
+    def apply() -> None:
+        ds._update(updates)
+        ds._delete(deletes)
+        ds._insert(deletes)
+
+    benchmark(apply)
+
+    assert len(ds) == 10 * LEVELS_PER_SIDE * 2
+
+
+class SizedOrderBook(OrderBook):
+    _SIZE_KEY = "q"
+
+
+@pytest.mark.benchmark(group="numeric")
+def test_top_levels_from_float(benchmark: BenchmarkFixture) -> None:
+    ds = SizedOrderBook(data=orderbook_items(10))
+
+    def top() -> list[tuple[float, float]]:
+        book = ds.sorted({"s": "SYM0USDT"}, 10)
+        return [(float(x["p"]), float(x["q"])) for x in book["a"] + book["b"]]
+
+    result = benchmark(top)
+
+    assert len(result) == 20
+
+
+@pytest.mark.benchmark(group="numeric")
+def test_top_levels_from_numeric(benchmark: BenchmarkFixture) -> None:
+    ds = SizedOrderBook()
+    ds.set_ticks({"s": "SYM0USDT"}, "1", "0.1")
+    ds._insert(orderbook_items(10))
+
+    def top() -> list[tuple[int, int]]:
+        book = ds.sorted_numeric({"s": "SYM0USDT"}, 10)
+        return book["a"] + book["b"]
+
+    result = benchmark(top)
+
+    assert len(result) == 20
@@ -20,8 +20,23 @@ from .models.hyperliquid import HyperliquidDataStore
 from .models.kucoin import KuCoinDataStore
 from .models.okx import OKXDataStore
 from .models.phemex import PhemexDataStore
-from .store import DataStore, DataStoreCollection, StoreChange, StoreStream
-from .ws import ClientWebSocketResponse, WebSocketApp, WebSocketQueue
+from .sharedbook import SharedBook, SharedBookPublisher, SharedBookReader
+from .store import (
+    DataStore,
+    DataStoreCollection,
+    RingStore,
+    SortedBookStore,
+    StoreChange,
+    StoreSnapshot,
+    StoreStream,
+)
+from .ws import (
+    ClientWebSocketResponse,
+    ShardedWebSocketApp,
+    WebSocketApp,
+    WebSocketMultiplexer,
+    WebSocketQueue,
+)
 
 __all__: tuple[str, ...] = (
     # version
@@ -32,13 +47,22 @@ __all__: tuple[str, ...] = (
     "NotJSONContent",
     # ws
     "ClientWebSocketResponse",
+    "ShardedWebSocketApp",
     "WebSocketApp",
+    "WebSocketMultiplexer",
     "WebSocketQueue",
     # store
     "DataStore",
     "DataStoreCollection",
+    "RingStore",
+    "SortedBookStore",
     "StoreChange",
+    "StoreSnapshot",
     "StoreStream",
+    # sharedbook
+    "SharedBook",
+    "SharedBookPublisher",
+    "SharedBookReader",
     # models
     "BinanceCOINMDataStore",
     "BinanceSpotDataStore",
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .typedefs import JSONDumps, JSONLoads
+
+# Default JSON functions of Client, WebSocketApp and DataStore. orjson or msgspec
+# is used if installed, falling back to the standard library. ``dumps`` returns
+# str like json.dumps, as aiohttp sends the result as a text message.
+
+
+def _orjson() -> tuple[JSONLoads, JSONDumps]:
+    import orjson  # type: ignore[import-not-found, unused-ignore]
+
+    def dumps(obj: Any) -> str:
+        # Like json.dumps, non-str keys such as int are converted to str.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    return orjson.loads, dumps
+
+
+def _msgspec() -> tuple[JSONLoads, JSONDumps]:
+    import msgspec  # type: ignore[import-not-found, unused-ignore]
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+
+    def dumps(obj: Any) -> str:
+        return encoder.encode(obj).decode()
+
+    return decoder.decode, dumps
+
+
+def _detect() -> tuple[JSONLoads, JSONDumps]:
+    for backend in (_orjson, _msgspec):
+        try:
+            return backend()
+        except ImportError:
+            pass
+    return json.loads, json.dumps
+
+
+def _decode_errors() -> tuple[type[Exception], ...]:
+    # orjson.JSONDecodeError is a subclass of ValueError, msgspec.DecodeError is not.
+    try:
+        import msgspec  # type: ignore[import-not-found, unused-ignore]
+    except ImportError:
+        return (ValueError,)
+    return (ValueError, msgspec.DecodeError)
+
+
+loads, dumps = _detect()
+DecodeError = _decode_errors()
@@ -11,6 +11,7 @@ from urllib.parse import urlparse
 import aiohttp
 from aiohttp import hdrs
 
+from . import _json
 from .__version__ import __version__
 from .auth import Auth, PassphraseRequiredExchanges
 from .request import ClientRequest
@@ -22,6 +23,8 @@ if TYPE_CHECKING:
     from .typedefs import (
         APICredentialsDict,
         EncodedAPICredentialsDict,
+        JSONDumps,
+        JSONLoads,
         RequestContextManager,
         StrOrBytesPath,
         WsBytesHandler,
@@ -37,6 +40,8 @@ class Client:
         self,
         apis: APICredentialsDict | StrOrBytesPath | None = None,
         base_url: str = "",
+        json_loads: JSONLoads | None = None,
+        json_dumps: JSONDumps | None = None,
         **kwargs: Any,
     ) -> None:
         """HTTP / WebSocket API Client.
@@ -46,6 +51,8 @@ class Client:
         Args:
             apis: API 認証情報
             base_url: ベース URL
+            json_loads: JSON のデコード関数 (デフォルトは orjson, msgspec, json の順に自動選択)
+            json_dumps: JSON のエンコード関数 (デフォルトは orjson, msgspec, json の順に自動選択)
             **kwargs: :class:`aiohttp.ClientSession` にバイパスされる引数
         """
         self._session = aiohttp.ClientSession(
@@ -57,6 +64,8 @@ class Client:
             self._session.headers[hdrs.USER_AGENT] = f"pybotters/{__version__}"
         loaded_apis = self._load_apis(apis)
         self._session.__dict__["_apis"] = self._encode_apis(loaded_apis)
+        self._session.__dict__["_json_loads"] = json_loads or _json.loads
+        self._session.__dict__["_json_dumps"] = json_dumps or _json.dumps
         self._base_url = base_url
 
     async def __aenter__(self) -> Client:
@@ -147,8 +156,10 @@ class Client:
         ) as resp:
             text = await resp.text()
             try:
-                data = await resp.json(content_type=None)
-            except json.JSONDecodeError as e:
+                data = await resp.json(
+                    loads=self._session.__dict__["_json_loads"], content_type=None
+                )
+            except _json.DecodeError as e:
                 data = NotJSONContent(error=e)
 
         return FetchResult(response=resp, text=text, data=data)
@@ -257,6 +268,9 @@ class Client:
         autoping: bool = True,
         heartbeat: float = 10.0,
         auth: type[Auth] | None = Auth,
+        json_loads: JSONLoads | None = None,
+        json_dumps: JSONDumps | None = None,
+        dispatch: Literal["call_soon", "inline"] = "call_soon",
         **kwargs: Any,
     ) -> WebSocketApp:
         """WebSocket request.
@@ -273,6 +287,9 @@ class Client:
             autoping: Ping に対する自動 Pong 応答 (デフォルト True)
             heartbeat: WebSocket ハートビート (デフォルト 10.0 秒)
             auth: 認証オプション (デフォルトで有効、None で無効)
+            json_loads: JSON のデコード関数 (デフォルトは :class:`Client` の設定)
+            json_dumps: JSON のエンコード関数 (デフォルトは :class:`Client` の設定)
+            dispatch: ハンドラの呼び出し方法 (デフォルト ``"call_soon"`` 、 ``"inline"`` で受信ループ内で直接呼び出し)
             **kwargs: :meth:`aiohttp.ClientSession.ws_connect` にバイパスされる引数
 
         Returns:
@@ -293,6 +310,9 @@ class Client:
             autoping=autoping,
             heartbeat=heartbeat,
             auth=auth,
+            json_loads=json_loads,
+            json_dumps=json_dumps,
+            dispatch=dispatch,
             **kwargs,
         )
 
@@ -361,10 +381,10 @@ class NotJSONContent:
     """Result of JSON decoding failure.
 
     Attributes:
-        error: `JSONDecodeError`
+        error: JSON のデコードエラー
     """
 
-    error: json.JSONDecodeError
+    error: Exception
 
     def __bool__(self) -> Literal[False]:
         return False
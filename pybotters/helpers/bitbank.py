@@ -25,6 +25,8 @@ __all__ = [
 
 from typing import TYPE_CHECKING, Any, TypedDict, TypeVar, cast
 
+from .. import _json
+
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator, Callable
     from typing import Final
@@ -251,7 +253,7 @@ async def fetch_channel_and_token(
 
     url = f"{bitbank_server}/v1/user/subscribe"
     async with client.get(url) as resp:
-        data = await resp.json()
+        data = await resp.json(loads=_json.loads)
 
     if (not isinstance(data, dict)) or (data.get("success") != 1):
         raise ValueError(data)
@@ -287,7 +289,7 @@ async def fetch_subscribe(
         params["auth"] = token
 
     async with clinet.get(url, params=params) as resp:
-        data = await resp.json(content_type=None)
+        data = await resp.json(loads=_json.loads, content_type=None)
 
     if (not isinstance(data, dict)) or ("t" not in data):
         raise ValueError(data)
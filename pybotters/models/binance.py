@@ -7,8 +7,9 @@ from typing import TYPE_CHECKING, Any, Awaitable
 
 import aiohttp
 
+from .. import _json
 from ..auth import Auth
-from ..store import DataStore, DataStoreCollection
+from ..store import DataStore, DataStoreCollection, RingStore, SortedBookStore
 
 if TYPE_CHECKING:
     from yarl import URL
@@ -70,7 +71,7 @@ class BinanceDataStoreBase(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             endpoint = resp.url.path
             if self._is_target_endpoint(self._ORDERBOOK_INIT_ENDPOINT, endpoint):
                 self._initialize_orderbook(resp, data)
@@ -546,8 +547,16 @@ class BinanceCOINMDataStore(BinanceFuturesDataStoreBase):
         return self._get("markpricekline", Kline)
 
 
-class Trade(DataStore):
+class Trade(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "T"
+    _COLUMNS = {
+        "timestamp": ("T", "q", int),
+        "price": ("p", "d", float),
+        "size": ("q", "d", float),
+        # m: Is the buyer the market maker?
+        "side": ("m", "b", lambda m: -1 if m else 1),
+    }
 
     def _onmessage(self, item: Item) -> None:
         self._insert([item])
@@ -601,6 +610,14 @@ class CompositeIndex(DataStore):
 
 class Kline(DataStore):
     _KEYS = ["t", "s", "i"]
+    _COLUMNS = {
+        "timestamp": ("t", "q", int),
+        "open": ("o", "d", float),
+        "high": ("h", "d", float),
+        "low": ("l", "d", float),
+        "close": ("c", "d", float),
+        "volume": ("v", "d", float),
+    }
 
     def _onmessage(self, item: Item) -> None:
         self._update([item["k"]])
@@ -660,8 +677,16 @@ class Liquidation(DataStore):
         self._insert([item["o"]])
 
 
-class OrderBook(DataStore):
+class OrderBook(SortedBookStore):
     _KEYS = ["s", "S", "p"]
+    _INDEXES = [["s"]]
+    _BOOK_KEYS = ["s"]
+    _SIDE_KEY = "S"
+    _ASC_SIDE = "a"
+    _DESC_SIDE = "b"
+    _PRICE_KEY = "p"
+    _SIZE_KEY = "q"
+    _STATE = ["_last_update_id"]
     _BUFF_MAXLEN = 8000
 
     def _init(self) -> None:
@@ -671,18 +696,6 @@ class OrderBook(DataStore):
         )
         self._last_update_id: dict[str, int] = {}
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="S",
-            item_asc_key="a",
-            item_desc_key="b",
-            sort_key="p",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, item: Item) -> None:
         symbol = item["s"]
         self._buff[symbol].append(item)
@@ -784,6 +797,7 @@ class Position(DataStore):
 
 class Order(DataStore):
     _KEYS = ["s", "i"]
+    _INDEXES = [["s"]]
 
     def _onmessage(self, item: Item) -> None:
         if item["e"] == "ORDER_TRADE_UPDATE":
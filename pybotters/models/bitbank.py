@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict, deque
 from typing import TYPE_CHECKING, cast
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, RingStore, SortedBookStore
+from ..ws import _loads
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
@@ -30,7 +31,7 @@ class bitbankDataStore(DataStoreCollection):
 
     def _onmessage(self, msg: str, ws: ClientWebSocketResponse | None = None) -> None:
         if msg.startswith("42"):
-            data_json = json.loads(msg[2:])
+            data_json = _loads(ws)(msg[2:])
             room_name = data_json[1]["room_name"]
             data = data_json[1]["message"]["data"]
             if "transactions" in room_name:
@@ -66,8 +67,9 @@ class bitbankDataStore(DataStoreCollection):
         return self._get("ticker", Ticker)
 
 
-class Transactions(DataStore):
+class Transactions(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "executed_at"
 
     def _onmessage(self, room_name: str, data: dict[str, list[Item]]) -> None:
         for item in data["transactions"]:
@@ -75,8 +77,16 @@ class Transactions(DataStore):
             self._insert([{"pair": pair, **item}])
 
 
-class Depth(DataStore):
+class Depth(SortedBookStore):
     _KEYS = ["pair", "side", "price"]
+    _INDEXES = [["pair"]]
+    _BOOK_KEYS = ["pair"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "amount"
+    _STATE = ["_sequence_id", "timestamp"]
     _BUFF_MAXLEN = 8000
 
     def _init(self) -> None:
@@ -86,18 +96,6 @@ class Depth(DataStore):
         )
         self._sequence_id: dict[str, int] = {}
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
-
     def _apply_diff(self, pair: str, data: dict) -> None:
         for side_item, side in (("b", "bids"), ("a", "asks")):
             for item in cast("list[list[str]]", data[side_item]):
@@ -200,7 +198,7 @@ class bitbankPrivateDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            root = await resp.json()
+            root = await resp.json(loads=_json.loads)
 
             if not isinstance(root, dict) or root.get("success") != 1:
                 logger.warning(root)
@@ -392,7 +390,8 @@ class MarginPayable(DataStore):
     def _onmessage(self, params: list[Item]) -> None:
         # This store always updates only one item.
         for item in params:
-            for orig_item in self:
+            for _id in self._data:
+                orig_item = self._mutable(_id)
                 orig_item.clear()
                 orig_item.update(item)
                 self._put("update", source=orig_item, item=orig_item)
@@ -8,7 +8,8 @@ import operator
 from decimal import Decimal
 from typing import TYPE_CHECKING, Awaitable
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, RingStore, SortedBookStore
 from ..ws import ClientWebSocketResponse
 
 if TYPE_CHECKING:
@@ -48,7 +49,7 @@ class bitFlyerDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if resp.url.path == "/v1/me/getchildorders":
                 self.childorders._onresponse(data)
             elif resp.url.path == "/v1/me/getparentorders":
@@ -181,24 +182,20 @@ class bitFlyerDataStore(DataStoreCollection):
         return self._get("balance", Balance)
 
 
-class Board(DataStore):
+class Board(SortedBookStore):
     _KEYS = ["product_code", "side", "price"]
+    _INDEXES = [["product_code"]]
+    _BOOK_KEYS = ["product_code"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "size"
+    _STATE = ["mid_price"]
 
     def _init(self) -> None:
         self.mid_price: dict[str, float] = {}
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, product_code: str, message: Item) -> None:
         self.mid_price[product_code] = message["mid_price"]
         for side in ("asks", "bids"):
@@ -229,8 +226,9 @@ class Ticker(DataStore):
         self._update([message])
 
 
-class Executions(DataStore):
+class Executions(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "exec_date"
 
     def _onmessage(self, product_code: str, message: list[Item]) -> None:
         for item in message:
@@ -249,6 +247,7 @@ class ParentOrderEvents(DataStore):
 
 class ChildOrders(DataStore):
     _KEYS = ["child_order_acceptance_id"]
+    _INDEXES = [["product_code"]]
 
     def _onresponse(self, data: list[Item]) -> None:
         if data:
@@ -292,6 +291,7 @@ class ChildOrders(DataStore):
 
 class ParentOrders(DataStore):
     _KEYS = ["parent_order_acceptance_id"]
+    _INDEXES = [["product_code"]]
 
     def _onresponse(self, data: list[Item]) -> None:
         if data:
@@ -353,6 +353,7 @@ class Positions(DataStore):
                     else:
                         for uid, pos in positions.items():
                             if pos["size"] > item["size"]:
+                                pos = self._mutable(uid)
                                 collateral._onexecution(
                                     item["side"],
                                     pos["price"],
@@ -409,7 +410,7 @@ class Collateral(DataStore):
         if not len(self):
             self._insert([data])
         else:
-            item = self.find()[0]
+            item = self._mutable(next(iter(self._data)))
             item.update(data)
             self._put(
                 operation="update", source=data, item=data
@@ -428,7 +429,7 @@ class Collateral(DataStore):
         if not len(self):
             return
 
-        item = self.find()[0]
+        item = self._mutable(next(iter(self._data)))
 
         buy_price, sell_price = {
             "SELL": (open_price, close_price),
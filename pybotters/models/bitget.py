@@ -4,7 +4,8 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING, Awaitable
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     import aiohttp
@@ -36,7 +37,7 @@ class BitgetDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if resp.url.path in ("/api/mix/v1/order/current",):
                 if int(data.get("code", "0")) == 0:
                     self.orders._onresponse(data["data"])
@@ -153,24 +154,19 @@ class Trade(DataStore):
         )
 
 
-class OrderBook(DataStore):
+class OrderBook(SortedBookStore):
     _KEYS = ["instId", "side", "px"]
+    _INDEXES = [["instId"]]
+    _BOOK_KEYS = ["instId"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "px"
+    _SIZE_KEY = "sz"
 
     def _init(self) -> None:
         self.timestamp: int | None = None
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="px",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, message: Item) -> None:
         instId = message["arg"]["instId"]
         books = message["data"]
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from ..store import DataStore, DataStoreCollection
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     from ..typedefs import Item
@@ -251,8 +251,15 @@ class Candle(DataStore):
             self._update(data)
 
 
-class Book(DataStore):
+class Book(SortedBookStore):
     _KEYS = ["instType", "instId", "side", "price"]
+    _INDEXES = [["instType", "instId"]]
+    _BOOK_KEYS = ["instType", "instId"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "amount"
 
     def _onmessage(self, msg: Item) -> None:
         action = msg["action"]
@@ -287,18 +294,6 @@ class Book(DataStore):
         self._update(data_to_update)
         self._delete(data_to_delete)
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
-
 
 class Trade(DataStore):
     _KEYS = ["instType", "instId", "tradeId"]
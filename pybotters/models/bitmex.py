@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from ..store import DataStore, DataStoreCollection
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     from ..typedefs import Item
@@ -184,15 +184,10 @@ class BitMEXDataStore(DataStoreCollection):
         return self._get("wallet", DataStore)
 
 
-class OrderBook(DataStore):
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="Sell",
-            item_desc_key="Buy",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
+class OrderBook(SortedBookStore):
+    _BOOK_KEYS = ["symbol"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "Sell"
+    _DESC_SIDE = "Buy"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "size"
@@ -4,7 +4,8 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING, Awaitable
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, RingStore, SortedBookStore
 
 if TYPE_CHECKING:
     import aiohttp
@@ -52,7 +53,7 @@ class BybitDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
 
             if data is None or "retCode" not in data or data["retCode"] != 0:
                 raise ValueError(
@@ -193,20 +194,15 @@ class BybitDataStore(DataStoreCollection):
         return self._get("greeks", Greek)
 
 
-class OrderBook(DataStore):
+class OrderBook(SortedBookStore):
     _KEYS = ["s", "S", "p"]
-
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="S",
-            item_asc_key="a",
-            item_desc_key="b",
-            sort_key="p",
-            query=query,
-            limit=limit,
-        )
+    _INDEXES = [["s"]]
+    _BOOK_KEYS = ["s"]
+    _SIDE_KEY = "S"
+    _ASC_SIDE = "a"
+    _DESC_SIDE = "b"
+    _PRICE_KEY = "p"
+    _SIZE_KEY = "v"
 
     def _onmessage(self, msg: Item, topic_ext: list[str]) -> None:
         operation: dict[str, list[Item]] = {"delete": [], "update": [], "insert": []}
@@ -235,8 +231,15 @@ class OrderBook(DataStore):
         self._insert(operation["insert"])
 
 
-class Trade(DataStore):
+class Trade(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "T"
+    _COLUMNS = {
+        "timestamp": ("T", "q", int),
+        "price": ("p", "d", float),
+        "size": ("v", "d", float),
+        "side": ("S", "b", lambda s: 1 if s == "Buy" else -1),
+    }
 
     def _onmessage(self, msg: Item, topic_ext: list[str]) -> None:
         self._insert(msg["data"])
@@ -251,10 +254,17 @@ class Ticker(DataStore):
 
 class Kline(DataStore):
     _KEYS = ["symbol", "start", "end"]
+    _COLUMNS = {
+        "timestamp": ("start", "q", int),
+        "open": ("open", "d", float),
+        "high": ("high", "d", float),
+        "low": ("low", "d", float),
+        "close": ("close", "d", float),
+        "volume": ("volume", "d", float),
+    }
 
     def _onmessage(self, msg: Item, topic_ext: list[str]) -> None:
-        msg["data"] = [{"symbol": topic_ext[1], **x} for x in msg["data"]]
-        self._update(msg["data"])
+        self._update([{"symbol": topic_ext[1], **x} for x in msg["data"]])
 
 
 class AllLiquidation(DataStore):
@@ -290,8 +300,9 @@ class Position(DataStore):
         self._update(msg["data"])
 
 
-class Execution(DataStore):
+class Execution(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "execTime"
 
     def _onmessage(self, msg: Item, topic_ext: list[str]) -> None:
         self._insert(msg["data"])
@@ -299,6 +310,7 @@ class Execution(DataStore):
 
 class Order(DataStore):
     _KEYS = ["orderId"]
+    _INDEXES = [["category"]]
     _MAP_ORDER_STATUS = {
         "Created": "pending",
         "New": "pending",
@@ -6,12 +6,12 @@ from collections import defaultdict, deque
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any, Awaitable, cast
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     import aiohttp
 
-    from ..typedefs import Item
     from ..ws import ClientWebSocketResponse
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ class CoincheckDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if resp.url.path == "/api/order_books":
                 pair = resp.url.query.get("pair")
                 self.orderbook._onresponse(pair, data)
@@ -87,8 +87,15 @@ class Trades(DataStore):
             )
 
 
-class Orderbook(DataStore):
+class Orderbook(SortedBookStore):
     _KEYS = ["pair", "side", "rate"]
+    _INDEXES = [["pair"]]
+    _BOOK_KEYS = ["pair"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "rate"
+    _SIZE_KEY = "amount"
     _BUFF_MAXLEN = 8000
 
     def _init(self) -> None:
@@ -99,18 +106,6 @@ class Orderbook(DataStore):
         )
         self._sequence_number: dict[str, int] = {}
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="rate",
-            query=query,
-            limit=limit,
-        )
-
     def _onresponse(self, pair: str | None, data: dict[str, Any]) -> None:
         if pair is None:
             pair = cast("str | None", data.get("pair")) or "btc_jpy"
@@ -243,7 +238,7 @@ class CoincheckPrivateDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
 
             if not data.get("success"):
                 logger.warning(data)
@@ -5,8 +5,9 @@ import logging
 import warnings
 from typing import TYPE_CHECKING, Awaitable
 
-from pybotters.store import DataStore, DataStoreCollection
+from pybotters.store import DataStore, DataStoreCollection, SortedBookStore
 
+from .. import _json
 from ..auth import Auth
 
 if TYPE_CHECKING:
@@ -26,24 +27,19 @@ class TickerStore(DataStore):
         self._update([mes])
 
 
-class OrderBookStore(DataStore):
+class OrderBookStore(SortedBookStore):
     _KEYS = ["symbol", "side", "price"]
+    _INDEXES = [["symbol"]]
+    _BOOK_KEYS = ["symbol"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "size"
 
     def _init(self) -> None:
         self.timestamp: str | None = None
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, mes: Item) -> None:
         data = []
         for side in ("asks", "bids"):
@@ -148,7 +144,7 @@ class GMOCoinDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
 
             if data.get("status") != 0:
                 raise ValueError(
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from pybotters.store import DataStore, DataStoreCollection
+from pybotters.store import DataStore, DataStoreCollection, RingStore, SortedBookStore
 
 if TYPE_CHECKING:
     from pybotters.typedefs import Item
@@ -624,13 +624,28 @@ class WebData2(DataStore):
 class Candle(DataStore):
     _KEYS = ["t", "T", "s", "i"]
     _MAXLEN = 99999
+    _COLUMNS = {
+        "timestamp": ("t", "q", int),
+        "open": ("o", "d", float),
+        "high": ("h", "d", float),
+        "low": ("l", "d", float),
+        "close": ("c", "d", float),
+        "volume": ("v", "d", float),
+    }
 
     def _onmessage(self, msg: Item) -> None:
         self._insert([msg["data"]])
 
 
-class L2Book(DataStore):
+class L2Book(SortedBookStore):
     _KEYS = ["coin", "side", "px"]
+    _INDEXES = [["coin"]]
+    _BOOK_KEYS = ["coin"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "A"
+    _DESC_SIDE = "B"
+    _PRICE_KEY = "px"
+    _SIZE_KEY = "sz"
 
     def _init(self) -> None:
         self._time: int | None = None
@@ -657,28 +672,15 @@ class L2Book(DataStore):
 
         self._time = time
 
-    def sorted(
-        self,
-        query: Item | None = None,
-        limit: int | None = None,
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="A",
-            item_desc_key="B",
-            sort_key="px",
-            query=query,
-            limit=limit,
-        )
-
     @property
     def time(self) -> int | None:
         """Timestamp of the last update."""
         return self._time
 
 
-class Trades(DataStore):
+class Trades(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "time"
 
     def _onmessage(self, msg: Item) -> None:
         self._insert(msg["data"])
@@ -730,8 +732,9 @@ class UserEvents(DataStore):
         self._insert(data_to_insert)
 
 
-class UserFills(DataStore):
+class UserFills(RingStore):
     _MAXLEN = 99999
+    _TIMESTAMP_KEY = "time"
 
     def _onmessage(self, msg: Item) -> None:
         if (
@@ -9,10 +9,10 @@ from typing import TYPE_CHECKING, Any, Awaitable
 
 import aiohttp
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
-    from ..typedefs import Item
     from ..ws import ClientWebSocketResponse
 
 logger = logging.getLogger(__name__)
@@ -59,7 +59,7 @@ class KuCoinDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if resp.url.path == "/api/v1/positions":
                 self.positions._onresponse(data["data"])
             elif resp.url.path == "/api/v1/market/candles":
@@ -426,7 +426,7 @@ class Orderbook(DataStore):
         raise NotImplementedError
 
 
-class TopKOrderBook(DataStore):
+class TopKOrderBook(SortedBookStore):
     """
 
     # Spot
@@ -439,22 +439,17 @@ class TopKOrderBook(DataStore):
     """
 
     _KEYS = ["symbol", "side", "price"]
+    _INDEXES = [["symbol"]]
+    _BOOK_KEYS = ["symbol"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "size"
 
     def __init__(self, *args, **kwargs):
         super(TopKOrderBook, self).__init__(*args, **kwargs)
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="price",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, msg: dict[str, Any]) -> None:
         symbol = _symbol_from_msg(msg)
 
@@ -482,6 +477,14 @@ class Kline(DataStore):
     """
 
     _KEYS = ["symbol", "interval", "timestamp"]
+    _COLUMNS = {
+        "timestamp": ("timestamp", "q", int),
+        "open": ("open", "d", float),
+        "high": ("high", "d", float),
+        "low": ("low", "d", float),
+        "close": ("close", "d", float),
+        "volume": ("volume", "d", float),
+    }
 
     def __init__(self, *args, **kwargs):
         super(Kline, self).__init__(*args, **kwargs)
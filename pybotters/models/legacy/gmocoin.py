@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any, Awaitable, TypedDict, cast
 
 from pybotters.store import DataStore, DataStoreCollection
 
+from ... import _json
 from ...auth import Auth
 
 if TYPE_CHECKING:
@@ -354,12 +355,15 @@ class OrderStore(DataStore):
             self._delete([cast("Item", mes)])
 
     def _onexecution(self, mes: Execution) -> None:
-        current = cast("Order", self.get({"order_id": mes["order_id"]}))
+        _id = self._index.get(self._key({"order_id": mes["order_id"]}))
+        if _id is None:
+            return
+        current = cast("Order", self._data[_id])
         if (
             mes["order_executed_size"]
-            and current
             and current["executed_size"] < mes["order_executed_size"]
         ):
+            current = cast("Order", self._mutable(_id))
             current["executed_size"] = mes["order_executed_size"]
             remain = current["size"] - current["executed_size"]
             if remain == 0:
@@ -596,7 +600,7 @@ class GMOCoinDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
 
             if data.get("status") != 0:
                 raise ValueError(
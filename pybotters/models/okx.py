@@ -4,7 +4,8 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING, Any, Awaitable
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     import aiohttp
@@ -53,7 +54,7 @@ class OKXDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if data["code"] != "0":
                 logger.warning(f"Invalid response: {data}")
             if resp.url.path == "/api/v5/trade/orders-pending":
@@ -275,6 +276,13 @@ class _UpdateStore(DataStore):
 class _CandleStore(DataStore):
     _KEYS = ["channel", "instId", "ts"]
     _LIST_KEYS = ["ts", "o", "h", "l", "c"]
+    _COLUMNS = {
+        "timestamp": ("ts", "q", int),
+        "open": ("o", "d", float),
+        "high": ("h", "d", float),
+        "low": ("l", "d", float),
+        "close": ("c", "d", float),
+    }
 
     def _onmessage(self, msg: dict[str, Any]) -> None:
         for item in msg["data"]:
@@ -294,6 +302,7 @@ class OpenInterest(_UpdateStore): ...
 
 class Candle(_CandleStore):
     _LIST_KEYS = ["ts", "o", "h", "l", "c", "vol", "volCcy"]
+    _COLUMNS = {**_CandleStore._COLUMNS, "volume": ("vol", "d", float)}
 
 
 class Trades(_InsertStore): ...
@@ -311,26 +320,22 @@ class MarkPriceCandle(_CandleStore): ...
 class PriceLimit(_UpdateStore): ...
 
 
-class Books(DataStore):
+class Books(SortedBookStore):
     _KEYS = ["instId", "side", "px"]
+    _INDEXES = [["instId"]]
+    _BOOK_KEYS = ["instId"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "px"
+    _SIZE_KEY = "sz"
+    _STATE = ["checksum"]
     _LIST_KEYS = ["px", "sz", "liqSz", "ordSz"]
 
     def _init(self) -> None:
         self.checksum: dict[str, int] = {}
         self.ts: str | None = None
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="px",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, msg: dict[str, Any]) -> None:
         inst_id = msg["arg"]["instId"]
         action = msg.get("action", "snapshot")
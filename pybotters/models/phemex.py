@@ -4,7 +4,8 @@ import asyncio
 import logging
 from typing import TYPE_CHECKING, Awaitable
 
-from ..store import DataStore, DataStoreCollection
+from .. import _json
+from ..store import DataStore, DataStoreCollection, SortedBookStore
 
 if TYPE_CHECKING:
     import aiohttp
@@ -40,7 +41,7 @@ class PhemexDataStore(DataStoreCollection):
         """
         for f in asyncio.as_completed(aws):
             resp = await f
-            data = await resp.json()
+            data = await resp.json(loads=_json.loads)
             if resp.url.path in (
                 "/exchange/public/md/v2/kline",
                 "/exchange/public/md/kline",
@@ -192,24 +193,19 @@ class Trade(DataStore):
             )
 
 
-class OrderBook(DataStore):
+class OrderBook(SortedBookStore):
     _KEYS = ["symbol", "side", "priceEp"]
+    _INDEXES = [["symbol"]]
+    _BOOK_KEYS = ["symbol"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "priceEp"
+    _SIZE_KEY = "qty"
 
     def _init(self) -> None:
         self.timestamp: int | None = None
 
-    def sorted(
-        self, query: Item | None = None, limit: int | None = None
-    ) -> dict[str, list[Item]]:
-        return self._sorted(
-            item_key="side",
-            item_asc_key="asks",
-            item_desc_key="bids",
-            sort_key="priceEp",
-            query=query,
-            limit=limit,
-        )
-
     def _onmessage(self, message: Item) -> None:
         symbol = message["symbol"]
         if message.get("type") == "snapshot":
@@ -266,6 +262,14 @@ class Market24h(DataStore):
 
 class Kline(DataStore):
     _KEYS = ["symbol", "timestamp", "interval"]
+    _COLUMNS = {
+        "timestamp": ("timestamp", "q", int),
+        "open": ("open", "d", float),
+        "high": ("high", "d", float),
+        "low": ("low", "d", float),
+        "close": ("close", "d", float),
+        "volume": ("volume", "d", float),
+    }
 
     def _onresponse(self, symbol: str, data: Item) -> None:
         self._insert(
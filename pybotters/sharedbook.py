@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING, Any, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .store import DataStore, SortedBookStore
+    from .typedefs import Item
+
+
+# Layout: a 64 byte header followed by fixed-size float64 sections for asks and
+# bids (price, size) and trades (timestamp, price, size, side). ``seq`` is a
+# seqlock counter, odd while the publisher is writing.
+_MAGIC = b"PYBTBOOK"
+_HEADER = struct.Struct("<8sQdIIIII")
+_HEADER_SIZE = 64
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_LEVEL = struct.Struct("<dd")
+_TRADE = struct.Struct("<dddd")
+_TRADE_COLUMNS = ("timestamp", "price", "size", "side")
+_NAN = float("nan")
+# Names of the segments created by SharedBookPublisher in this process
+_published: set[str] = set()
+
+
+def _float(value: Any, conv: Callable[[Any], Any] = float) -> float:
+    try:
+        return float(conv(value))
+    except (TypeError, ValueError, KeyError):
+        return _NAN
+
+
+def _segment_size(depth: int, trades_limit: int) -> int:
+    return _HEADER_SIZE + _LEVEL.size * depth * 2 + _TRADE.size * trades_limit
+
+
+def _attach(name: str) -> tuple[memoryview, Callable[[], None]]:
+    try:
+        shm = _open_untracked(name)
+    except PermissionError:
+        return _attach_readonly(name)
+    return cast("memoryview", shm.buf), shm.close
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    # Attaching with SharedMemory registers the segment with the resource
+    # tracker, which would unlink it when this process exits. Segments of a
+    # SharedBookPublisher in this process keep the publisher's registration.
+    if sys.version_info >= (3, 13):  # no cov
+        return shared_memory.SharedMemory(name, track=False)
+    shm = shared_memory.SharedMemory(name)
+    if os.name == "posix" and name not in _published:
+        resource_tracker.unregister(f"/{shm.name}", "shared_memory")
+    return shm
+
+
+def _attach_readonly(name: str) -> tuple[memoryview, Callable[[], None]]:
+    # Fallback for segments this user may only read, as SharedMemory always
+    # opens them read-write. The stdlib has no public API for a read-only
+    # mapping, so this relies on the private _posixshmem module of CPython.
+    if os.name != "posix":  # no cov
+        raise PermissionError(f"Cannot attach to {name}")
+    import _posixshmem  # type: ignore[import-not-found, unused-ignore]
+
+    fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+    try:
+        mapped = mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+    finally:
+        os.close(fd)
+    buf = memoryview(mapped)
+
+    def close() -> None:
+        buf.release()
+        mapped.close()
+
+    return buf, close
+
+
+class SharedBookPublisher:
+    """板情報を共有メモリに公開するクラス
+
+    :class:`.SortedBookStore` の上位 ``depth`` 件の板情報と、
+    任意で約定履歴の DataStore の最新 ``trades_limit`` 件を
+    :mod:`multiprocessing.shared_memory` のセグメントに書き込みます。
+    別プロセスからは :class:`SharedBookReader` で読み取ります。
+
+    :meth:`publish` を呼び出した時点の DataStore の状態が公開されます。
+
+    Usage example: :ref:`shared-book`
+    """
+
+    def __init__(
+        self,
+        book: SortedBookStore,
+        query: Item | None = None,
+        *,
+        depth: int = 20,
+        trades: DataStore | None = None,
+        trades_query: Item | None = None,
+        trades_limit: int = 100,
+        name: str | None = None,
+    ) -> None:
+        """
+        Args:
+            book: 公開する板情報の DataStore
+            query: 板情報をフィルタするクエリ辞書
+            depth: 公開するサイドごとの最大件数
+            trades: 公開する約定履歴の DataStore。 :attr:`.DataStore._COLUMNS` に
+                ``"price"`` と ``"size"`` が定義されている必要があります
+            trades_query: 約定履歴をフィルタするクエリ辞書
+            trades_limit: 公開する約定履歴の最大件数
+            name: 共有メモリの名前。 省略した場合は自動で生成されます
+        """
+        if depth < 1:
+            raise ValueError(f"depth must be positive: {depth}")
+        if trades is None:
+            trades_limit = 0
+        elif not {"price", "size"} <= trades._COLUMNS.keys():
+            raise ValueError(f"{type(trades).__name__} has no price/size _COLUMNS")
+
+        self._book = book
+        self._query = query
+        self._depth = depth
+        self._trades = trades
+        self._trades_query = trades_query or {}
+        self._trades_limit = trades_limit
+        self._trade_specs = [
+            trades._COLUMNS.get(column) if trades is not None else None
+            for column in _TRADE_COLUMNS
+        ]
+        self._shm = shared_memory.SharedMemory(
+            name, create=True, size=_segment_size(depth, trades_limit)
+        )
+        self._buf = cast("memoryview", self._shm.buf)
+        _published.add(self._shm.name)
+        self._seq = 0
+        _HEADER.pack_into(self._buf, 0, _MAGIC, 0, 0.0, depth, trades_limit, 0, 0, 0)
+
+    @property
+    def name(self) -> str:
+        """:class:`SharedBookReader` に渡す共有メモリの名前"""
+        return self._shm.name
+
+    @property
+    def version(self) -> int:
+        """最後に公開したバージョン"""
+        return self._seq
+
+    def _pack_levels(self, levels: list[Item], offset: int) -> None:
+        buf = self._buf
+        price_key = self._book._PRICE_KEY
+        size_key = self._book._SIZE_KEY
+        for item in levels:
+            _LEVEL.pack_into(
+                buf, offset, _float(item.get(price_key)), _float(item.get(size_key))
+            )
+            offset += _LEVEL.size
+
+    def _latest_trades(self) -> list[Item]:
+        if self._trades is None:
+            return []
+        query = self._trades_query.items()
+        matched = (
+            item
+            for item in reversed(self._trades)
+            if all(k in item and item[k] == v for k, v in query)
+        )
+        latest = list(itertools.islice(matched, self._trades_limit))
+        latest.reverse()
+        return latest
+
+    def publish(self) -> int:
+        """DataStore の現在の状態を共有メモリに書き込みます。
+
+        Returns:
+            公開したバージョン
+        """
+        book = self._book.sorted(self._query, limit=self._depth)
+        asks = book[self._book._ASC_SIDE]
+        bids = book[self._book._DESC_SIDE]
+        trades = self._latest_trades()
+
+        buf = self._buf
+        seq = self._seq + 1
+        _SEQ.pack_into(buf, _SEQ_OFFSET, seq)
+
+        _HEADER.pack_into(
+            buf,
+            0,
+            _MAGIC,
+            seq,
+            time.time(),
+            self._depth,
+            self._trades_limit,
+            len(asks),
+            len(bids),
+            len(trades),
+        )
+        self._pack_levels(asks, _HEADER_SIZE)
+        self._pack_levels(bids, _HEADER_SIZE + _LEVEL.size * self._depth)
+        offset = _HEADER_SIZE + _LEVEL.size * self._depth * 2
+        for item in trades:
+            _TRADE.pack_into(
+                buf,
+                offset,
+                *(
+                    _float(item.get(spec[0]), spec[2]) if spec else _NAN
+                    for spec in self._trade_specs
+                ),
+            )
+            offset += _TRADE.size
+
+        self._seq = seq + 1
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq)
+        return self._seq
+
+    def close(self) -> None:
+        """共有メモリを閉じて削除します。"""
+        self._shm.close()
+        self._shm.unlink()
+        _published.discard(self._shm.name)
+
+    def __enter__(self) -> SharedBookPublisher:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+@dataclass(frozen=True)
+class SharedBook:
+    """:class:`SharedBookReader` で読み取った板情報のデータクラス
+
+    Attributes:
+        version: 公開されたバージョン
+        published_at: 公開された UNIX 時間
+        asks: 売り側の (価格, 数量) のリスト (価格の昇順)
+        bids: 買い側の (価格, 数量) のリスト (価格の降順)
+        trades: 約定履歴の (タイムスタンプ, 価格, 数量, サイド) のリスト (古い順)
+    """
+
+    version: int
+    published_at: float
+    asks: list[tuple[float, float]]
+    bids: list[tuple[float, float]]
+    trades: list[tuple[float, float, float, float]]
+
+
+class SharedBookReader:
+    """:class:`SharedBookPublisher` が公開した板情報を読み取るクラス
+
+    別プロセスから共有メモリに接続し、 pickle やソケットを介さずに板情報を参照します。
+    読み取り専用で、共有メモリは削除しません。
+
+    Usage example: :ref:`shared-book`
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name: :attr:`SharedBookPublisher.name`
+        """
+        self._buf, self._close = _attach(name)
+        magic, _, _, self._depth, self._trades_limit, *_ = _HEADER.unpack_from(
+            self._buf, 0
+        )
+        if magic != _MAGIC:
+            self._close()
+            raise ValueError(f"{name} is not a SharedBookPublisher segment")
+        self._size = _segment_size(self._depth, self._trades_limit)
+
+    @property
+    def version(self) -> int:
+        """現在公開されているバージョン
+
+        書き込み中は奇数になります。 変更の検知に利用できます。
+        """
+        return _SEQ.unpack_from(self._buf, _SEQ_OFFSET)[0]
+
+    def read(self, timeout: float | None = 1.0) -> SharedBook:
+        """公開されている板情報を読み取ります。
+
+        書き込み中の場合、書き込みが完了するまで読み取りを再試行します。
+
+        Args:
+            timeout: 再試行のタイムアウト秒数
+
+        Returns:
+            読み取った板情報
+
+        Raises:
+            TimeoutError: タイムアウトまでに一貫した状態を読み取れなかった場合
+        """
+        buf = self._buf
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+            if not seq & 1:
+                data = bytes(buf[: self._size])
+                if _SEQ.unpack_from(buf, _SEQ_OFFSET)[0] == seq:
+                    break
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("SharedBookPublisher is not responding")
+            time.sleep(0)
+
+        _, _, published_at, depth, _, n_asks, n_bids, n_trades = _HEADER.unpack_from(
+            data, 0
+        )
+        bids_offset = _HEADER_SIZE + _LEVEL.size * depth
+        trades_offset = bids_offset + _LEVEL.size * depth
+        return SharedBook(
+            version=seq,
+            published_at=published_at,
+            asks=list(_LEVEL.iter_unpack(data[_HEADER_SIZE:][: _LEVEL.size * n_asks])),
+            bids=list(_LEVEL.iter_unpack(data[bids_offset:][: _LEVEL.size * n_bids])),
+            trades=list(
+                _TRADE.iter_unpack(data[trades_offset:][: _TRADE.size * n_trades])
+            ),
+        )
+
+    def close(self) -> None:
+        """共有メモリとの接続を閉じます。"""
+        self._close()
+
+    def __enter__(self) -> SharedBookReader:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -1,36 +1,180 @@
 from __future__ import annotations
 
+import array
 import asyncio
-import copy
-import uuid
+import bisect
+import contextlib
+import decimal
+import heapq
+import itertools
+import operator
+import os
+import sys
+import time
+import weakref
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Literal, TypeVar, overload
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar, cast, overload
 
 if TYPE_CHECKING:
-    from collections.abc import Hashable, Iterator
+    from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+    from datetime import timedelta
 
-    from .typedefs import Item
+    from .typedefs import Item, StoreOverflow
     from .ws import ClientWebSocketResponse
 
 
+_MISSING: Any = object()
+_T = TypeVar("_T")
+_OVERFLOWS = ("drop_oldest", "drop_newest", "block_producer_error", "conflate_by_key")
+_COUNTERS = ("insert", "update", "delete", "sweeps", "evictions")
+_METRICS_SAMPLE = 32
+
+
+def _key_getter(keys: tuple[str, ...]) -> Callable[[Item], tuple[Hashable, ...]]:
+    # Built once per store. A single field still yields a tuple key.
+    if len(keys) > 1:
+        return operator.itemgetter(*keys)  # type: ignore[return-value]
+    elif keys:
+        (key,) = keys
+        return lambda item: (item[key],)
+    else:
+        return lambda item: ()
+
+
+def _index_add(
+    index: dict[tuple[Hashable, ...], dict[int, None]],
+    _id: int,
+    value: tuple[Hashable, ...],
+) -> None:
+    if _MISSING not in value:
+        try:
+            index.setdefault(value, {})[_id] = None
+        except TypeError:
+            pass
+
+
+def _index_discard(
+    index: dict[tuple[Hashable, ...], dict[int, None]],
+    _id: int,
+    value: tuple[Hashable, ...],
+) -> None:
+    try:
+        bucket = index[value]
+    except (KeyError, TypeError):
+        return
+    bucket.pop(_id, None)
+    if not bucket:
+        del index[value]
+
+
+def _parse_timestamp(value: Any) -> float | None:
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return _parse_isoformat(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Epoch in nanoseconds, microseconds, milliseconds or seconds.
+        for unit in (1e9, 1e6, 1e3):
+            if value > unit * 1e8:
+                return value / unit
+        return float(value)
+    return None
+
+
+def _tick_digits(tick: str) -> int:
+    exponent = decimal.Decimal(tick).normalize().as_tuple().exponent
+    return max(-exponent, 0) if isinstance(exponent, int) else 0
+
+
+def _scaled(value: Any, digits: int) -> int:
+    # Parses a decimal price or size into an integer of 10 ** -digits units.
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value * 10**digits
+    text = value if isinstance(value, str) else repr(value)
+    whole, _, frac = text.partition(".")
+    if (
+        whole.lstrip("-").isdigit()
+        and len(frac) <= digits
+        and (not frac or frac.isdigit())
+    ):
+        return int(whole + frac.ljust(digits, "0"))
+    scaled = decimal.Decimal(text).scaleb(digits)
+    return int(scaled.to_integral_value(decimal.ROUND_HALF_EVEN))
+
+
+def _parse_isoformat(text: str) -> float | None:
+    # datetime.fromisoformat() before Python 3.11 accepts neither "Z" nor more
+    # than 6 fractional digits (bitFlyer sends 7).
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    head, sep, tail = text.partition(".")
+    if sep:
+        digits = len(tail) - len(tail.lstrip("0123456789"))
+        text = f"{head}.{tail[:digits][:6].ljust(6, '0')}{tail[digits:]}"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
 class DataStore:
     """Abstract DataStore class."""
 
     _KEYS: list[str] = []
+    _INDEXES: list[list[str]] = []
+    _COLUMNS: dict[str, tuple[str, str, Callable[[Any], Any]]] = {}
+    _RETENTION: timedelta | None = None
+    _TIMESTAMP_KEY: str | None = None
+    _STATE: list[str] = []
     _MAXLEN = 9999
+    _CHANGELOG_MAXLEN = 9999
 
     def __init__(
         self,
         name: str | None = None,
         keys: list[str] | None = None,
         data: list[Item] | None = None,
+        *,
+        indexes: list[list[str]] | None = None,
     ) -> None:
         self.name: str | None = name
-        self._data: dict[uuid.UUID, Item] = {}
-        self._index: dict[int, uuid.UUID] = {}
+        self._data: dict[int, Item] = {}
+        self._index: dict[tuple[Hashable, ...], int] = {}
         self._keys: tuple[str, ...] = tuple(keys if keys else self._KEYS)
+        self._key = _key_getter(self._keys)
+        self._ids = itertools.count()
+        self._indexes: dict[
+            tuple[str, ...], dict[tuple[Hashable, ...], dict[int, None]]
+        ] = {
+            tuple(fields): {}
+            for fields in (indexes if indexes is not None else self._INDEXES)
+        }
         self._events: list[asyncio.Event] = []
         self._queues: list[asyncio.Queue] = []
+        self._filters: dict[
+            tuple[str, ...],
+            dict[tuple[Hashable, ...], list[_StoreQueue | _StoreWaiter]],
+        ] = {}
+        self._pending: list[_StoreQueue] = []
+        self._deferred = 0
+        self._overflowed = False
+        self._collected = False
+        self._counts: dict[str, int] | None = None
+        self._version = 0
+        self._owned: set[int] | None = None
+        self._snapshots: weakref.WeakSet[StoreSnapshot] = weakref.WeakSet()
+        self._changelog: deque[tuple[int, StoreChange]] | None = None
+        self._columns: _Columns | None = None
+        self._retention: timedelta | None = None
+        self._expiry: deque[tuple[float, int]] | None = None
+        if self._RETENTION is not None:
+            self.retention = self._RETENTION
         if data is None:
             data = []
         self._insert(data)
@@ -46,32 +190,77 @@ class DataStore:
     def __reversed__(self) -> Iterator[Item]:
         return reversed(self._data.values())
 
-    @staticmethod
-    def _hash(item: dict[str, Hashable]) -> int:
-        return hash(tuple(item.items()))
+    def _link(self, _id: int, item: Item) -> None:
+        for fields, index in self._indexes.items():
+            _index_add(index, _id, tuple(item.get(k, _MISSING) for k in fields))
+        if self._columns is not None:
+            self._columns.append(_id, item)
+        if self._expiry is not None:
+            ts = _parse_timestamp(item.get(self._TIMESTAMP_KEY))  # type: ignore[arg-type]
+            if ts is not None:
+                self._expire(_id, ts)
+
+    def _expire(self, _id: int, ts: float) -> None:
+        # Entries of updated and deleted rows are left behind and skipped by
+        # _sweep_expired(), so the deque is rebuilt once they outnumber the rows.
+        expiry = cast("deque[tuple[float, int]]", self._expiry)
+        if len(expiry) > 2 * len(self._data):
+            self._expiry = expiry = self._expiry_entries()
+        expiry.append((ts, _id))
+
+    def _expiry_entries(self) -> deque[tuple[float, int]]:
+        entries = []
+        for _id, item in self._data.items():
+            ts = _parse_timestamp(item.get(self._TIMESTAMP_KEY))  # type: ignore[arg-type]
+            if ts is not None:
+                entries.append((ts, _id))
+        entries.sort(key=lambda x: x[0])
+        return deque(entries)
+
+    def _unlink(self, _id: int, item: Item) -> None:
+        for fields, index in self._indexes.items():
+            _index_discard(index, _id, tuple(item.get(k, _MISSING) for k in fields))
+        if self._columns is not None:
+            self._columns.remove(_id)
+
+    def _relink(self, _id: int, item: Item, source: Item) -> None:
+        # Called before ``item.update(source)``.
+        if self._columns is not None:
+            self._columns.update(_id, source)
+        if self._expiry is not None and self._TIMESTAMP_KEY in source:
+            ts = _parse_timestamp(source[self._TIMESTAMP_KEY])
+            if ts is not None:
+                self._expire(_id, ts)
+        for fields, index in self._indexes.items():
+            if any(k in source for k in fields):
+                old = tuple(item.get(k, _MISSING) for k in fields)
+                new = tuple(source.get(k, v) for k, v in zip(fields, old, strict=True))
+                if old != new:
+                    _index_discard(index, _id, old)
+                    _index_add(index, _id, new)
 
     def _insert(self, data: list[Item]) -> None:
         if self._keys:
             for item in data:
                 try:
-                    keyitem = {k: item[k] for k in self._keys}
+                    key = self._key(item)
                 except KeyError:
-                    pass
+                    continue
+                _id = self._index.get(key)
+                if _id is None:
+                    _id = next(self._ids)
+                    self._index[key] = _id
                 else:
-                    keyhash = self._hash(keyitem)
-                    if keyhash not in self._index:
-                        _id = uuid.uuid4()
-                        self._data[_id] = item
-                        self._index[keyhash] = _id
-                        self._put("insert", None, item)
-                    else:
-                        self._data[self._index[keyhash]] = item
-                        self._put("insert", None, item)
+                    self._unlink(_id, self._data[_id])
+                self._data[_id] = item
+                self._link(_id, item)
+                self._put("insert", None, item)
             self._sweep_with_key()
         else:
             for item in data:
-                _id = uuid.uuid4()
+                _id = next(self._ids)
                 self._data[_id] = item
+                self._link(_id, item)
                 self._put("insert", None, item)
             self._sweep_without_key()
         self._set()
@@ -80,24 +269,27 @@ class DataStore:
         if self._keys:
             for item in data:
                 try:
-                    keyitem = {k: item[k] for k in self._keys}
+                    key = self._key(item)
                 except KeyError:
-                    pass
+                    continue
+                _id = self._index.get(key)
+                if _id is not None:
+                    current = self._mutable(_id)
+                    self._relink(_id, current, item)
+                    current.update(item)
+                    self._put("update", item, current)
                 else:
-                    keyhash = self._hash(keyitem)
-                    if keyhash in self._index:
-                        self._data[self._index[keyhash]].update(item)
-                        self._put("update", item, self._data[self._index[keyhash]])
-                    else:
-                        _id = uuid.uuid4()
-                        self._data[_id] = item
-                        self._index[keyhash] = _id
-                        self._put("update", None, item)
+                    _id = next(self._ids)
+                    self._data[_id] = item
+                    self._index[key] = _id
+                    self._link(_id, item)
+                    self._put("update", None, item)
             self._sweep_with_key()
         else:
             for item in data:
-                _id = uuid.uuid4()
+                _id = next(self._ids)
                 self._data[_id] = item
+                self._link(_id, item)
                 self._put("update", None, item)
             self._sweep_without_key()
         self._set()
@@ -106,56 +298,249 @@ class DataStore:
         if self._keys:
             for item in data:
                 try:
-                    keyitem = {k: item[k] for k in self._keys}
+                    key = self._key(item)
                 except KeyError:
-                    pass
-                else:
-                    keyhash = self._hash(keyitem)
-                    if keyhash in self._index:
-                        self._put("delete", item, self._data[self._index[keyhash]])
-                        del self._data[self._index[keyhash]]
-                        del self._index[keyhash]
+                    continue
+                _id = self._index.pop(key, None)
+                if _id is not None:
+                    current = self._data.pop(_id)
+                    self._put("delete", item, current)
+                    self._unlink(_id, current)
         self._set()
 
-    def _remove(self, uuids: list[uuid.UUID]) -> None:
-        if self._keys:
-            for _id in uuids:
-                if _id in self._data:
-                    item = self._data[_id]
-                    keyhash = self._hash({k: item[k] for k in self._keys})
-                    self._put("delete", None, self._data[_id])
-                    del self._data[_id]
-                    del self._index[keyhash]
-        else:
-            for _id in uuids:
-                if _id in self._data:
-                    self._put("delete", None, self._data[_id])
-                    del self._data[_id]
+    def _remove(self, ids: list[int]) -> None:
+        for _id in ids:
+            if _id in self._data:
+                item = self._data.pop(_id)
+                if self._keys:
+                    del self._index[self._key(item)]
+                self._put("delete", None, item)
+                self._unlink(_id, item)
         self._set()
 
     def _clear(self) -> None:
         for item in self:
             self._put("delete", None, item)
+        self._reset()
+        self._set()
+
+    def _reset(self) -> None:
         self._data.clear()
         self._index.clear()
+        for index in self._indexes.values():
+            index.clear()
+        if self._columns is not None:
+            self._columns.clear()
+        if self._expiry is not None:
+            self._expiry.clear()
+
+    def _restore(self, data: list[Item]) -> None:
+        # Bulk load without emitting changes.
+        self._reset()
+        self._discontinue()
+        if self._keys:
+            for item in data:
+                try:
+                    key = self._key(item)
+                except KeyError:
+                    continue
+                _id = self._index.get(key)
+                if _id is None:
+                    _id = next(self._ids)
+                    self._index[key] = _id
+                else:
+                    self._unlink(_id, self._data[_id])
+                self._data[_id] = item
+                self._link(_id, item)
+            self._sweep_with_key()
+        else:
+            for item in data:
+                _id = next(self._ids)
+                self._data[_id] = item
+                self._link(_id, item)
+            self._sweep_without_key()
         self._set()
 
     def _sweep_with_key(self) -> None:
+        self._sweep_expired()
         if len(self._data) > self._MAXLEN:
             over = len(self._data) - self._MAXLEN
-            _iter = iter(self._index)
-            keys = [next(_iter) for _ in range(over)]
-            for k in keys:
-                del self._data[self._index[k]]
-                del self._index[k]
+            keys = list(itertools.islice(self._index, over))
+            for key in keys:
+                _id = self._index.pop(key)
+                item = self._data.pop(_id)
+                self._unlink(_id, item)
+                self._log_eviction(item)
+            self._evicted(over)
 
     def _sweep_without_key(self) -> None:
+        self._sweep_expired()
         if len(self._data) > self._MAXLEN:
             over = len(self._data) - self._MAXLEN
-            _iter = iter(self._data)
-            keys = [next(_iter) for _ in range(over)]
-            for k in keys:
-                del self._data[k]
+            ids = list(itertools.islice(self._data, over))
+            for _id in ids:
+                item = self._data.pop(_id)
+                self._unlink(_id, item)
+                self._log_eviction(item)
+            self._evicted(over)
+
+    def _sweep_expired(self) -> None:
+        if self._expiry is None or self._retention is None:
+            return
+        expiry = self._expiry
+        cutoff = time.time() - self._retention.total_seconds()
+        size = len(self._data)
+        while expiry and expiry[0][0] < cutoff:
+            _id = expiry.popleft()[1]
+            if _id not in self._data:
+                continue
+            item = self._data[_id]
+            # The row may have been updated with a newer timestamp.
+            ts = _parse_timestamp(item.get(self._TIMESTAMP_KEY))  # type: ignore[arg-type]
+            if ts is not None and ts >= cutoff:
+                continue
+            if self._keys:
+                del self._index[self._key(item)]
+            self._unlink(_id, item)
+            del self._data[_id]
+            self._log_eviction(item)
+        if len(self._data) < size:
+            self._evicted(size - len(self._data))
+
+    def snapshot(self) -> StoreSnapshot:
+        """DataStore の現時点の読み取り専用のビューを作成します。
+
+        アイテムは複製されず、作成後に DataStore で更新されたアイテムのみが更新時に複製されます (コピーオンライト) 。
+        DataStore の更新が続いている間も、スナップショットは別スレッドから安全に参照できます。
+        スナップショットはイベントループのスレッドで作成してください。
+
+        Returns:
+            読み取り専用のビュー
+
+        Usage example: :ref:`snapshot`
+        """
+        snapshot = StoreSnapshot(
+            tuple(self._data.values()), self._keys, self._key, self._version
+        )
+        self._owned = set()
+        self._snapshots.add(snapshot)
+        return snapshot
+
+    def _own(self, _id: int, item: Item, owned: set[int]) -> Item:
+        # Copy-on-write of a row shared with a live snapshot.
+        if not self._snapshots:
+            self._owned = None
+            return item
+        owned.add(_id)
+        self._data[_id] = item = dict(item)
+        return item
+
+    def _mutable(self, _id: int) -> Item:
+        # The row to be changed in place, copied first if a live snapshot shares it.
+        item = self._data[_id]
+        if self._owned is not None and _id not in self._owned:
+            item = self._own(_id, item, self._owned)
+        return item
+
+    def _log_eviction(self, item: Item) -> None:
+        # Evictions are not emitted to streams, but changes_since() replays them
+        # as deletes so that mirrors of the DataStore drop the row as well.
+        self._version += 1
+        if self._changelog is not None:
+            self._changelog.append((self._version, self._change("delete", None, item)))
+
+    def _discontinue(self) -> None:
+        # Changes not emitted through _put() cannot be replayed by changes_since().
+        self._version += 1
+        if self._changelog is not None:
+            self._changelog.clear()
+
+    @property
+    def version(self) -> int:
+        """DataStore のバージョン
+
+        変更ごとに 1 ずつ増加します。 :meth:`changes_since` に渡して差分を取得できます。
+        """
+        return self._version
+
+    def changes_since(self, version: int) -> tuple[int, list[StoreChange] | None]:
+        """指定したバージョン以降の変更を取得します。
+
+        変更ログは初回の呼び出し時に作成され、最新 :attr:`_CHANGELOG_MAXLEN` 件を保持します。
+        不要になった変更ログは :attr:`keep_changelog` を無効にすると解放されます。
+        asyncio のタスク以外 (別スレッドなど) から DataStore の差分を取得する用途を想定しています。
+        件数の上限 (:attr:`_MAXLEN`) や保持期間による削除は ``source`` が None の
+        ``"delete"`` の変更として含まれます。
+
+        Args:
+            version: 前回取得した DataStore のバージョン
+
+        Returns:
+            現在のバージョンと、それまでの変更のリストのタプルを返します。
+            変更ログから指定したバージョン以降の変更を取得できない場合、変更のリストは None です。
+            その場合は :meth:`find` などで全件を取得し直してください
+
+        Usage example: :ref:`changes-since`
+        """
+        changelog = self._changelog
+        if changelog is None:
+            self._changelog = changelog = deque(maxlen=self._CHANGELOG_MAXLEN)
+        current = self._version
+        if version == current:
+            return current, []
+        # Copied at once, entries may be appended from another thread.
+        log = list(changelog)
+        if version > current or not log or log[0][0] > version + 1:
+            return current, None
+        start = bisect.bisect_right(log, version, key=lambda x: x[0])
+        return log[-1][0], [change._copy() for _, change in log[start:]]
+
+    @property
+    def keep_changelog(self) -> bool:
+        """変更ログを保持するかどうか
+
+        :meth:`changes_since` の初回の呼び出しで有効になります。
+        無効にすると変更ログは解放され、次の :meth:`changes_since` は変更のリストとして None を返します。
+        """
+        return self._changelog is not None
+
+    @keep_changelog.setter
+    def keep_changelog(self, value: bool) -> None:
+        if not value:
+            self._changelog = None
+        elif self._changelog is None:
+            self._changelog = deque(maxlen=self._CHANGELOG_MAXLEN)
+
+    def _changes(self) -> int:
+        if self._counts is None:
+            return 0
+        return self._counts["insert"] + self._counts["update"] + self._counts["delete"]
+
+    def _evicted(self, n: int) -> None:
+        if self._counts is not None:
+            self._counts["sweeps"] += 1
+            self._counts["evictions"] += n
+
+    @property
+    def retention(self) -> timedelta | None:
+        """データの保持期間
+
+        設定すると、タイムスタンプ (:attr:`_TIMESTAMP_KEY`) が保持期間より古いデータは
+        DataStore の更新時に削除されます。 None の場合は :attr:`_MAXLEN` による件数の制限のみです。
+        """
+        return self._retention
+
+    @retention.setter
+    def retention(self, value: timedelta | None) -> None:
+        if value is None:
+            self._retention = None
+            self._expiry = None
+            return
+        if self._TIMESTAMP_KEY is None:
+            raise ValueError(f"{type(self).__name__} does not define _TIMESTAMP_KEY")
+        self._retention = value
+        self._expiry = self._expiry_entries()
+        self._sweep_expired()
 
     def get(self, item: Item) -> Item | None:
         """DataStore から Item を取得します。
@@ -169,33 +554,50 @@ class DataStore:
         """
         if self._keys:
             try:
-                keyitem = {k: item[k] for k in self._keys}
+                _id = self._index.get(self._key(item))
             except KeyError:
-                pass
-            else:
-                keyhash = self._hash(keyitem)
-                if keyhash in self._index:
-                    return self._data[self._index[keyhash]]
+                return None
+            if _id is not None:
+                return self._data[_id]
         return None
 
     def _pop(self, item: Item) -> Item | None:
         if self._keys:
             try:
-                keyitem = {k: item[k] for k in self._keys}
+                _id = self._index.pop(self._key(item), None)
             except KeyError:
-                pass
-            else:
-                keyhash = self._hash(keyitem)
-                if keyhash in self._index:
-                    ret = self._data[self._index[keyhash]]
-                    del self._data[self._index[keyhash]]
-                    del self._index[keyhash]
-                    return ret
+                return None
+            if _id is not None:
+                ret = self._data.pop(_id)
+                self._unlink(_id, ret)
+                return ret
         return None
 
+    def _lookup(self, query: Item) -> Iterable[int] | None:
+        if self._keys and all(k in query for k in self._keys):
+            try:
+                _id = self._index.get(self._key(query))
+            except TypeError:
+                return None
+            return () if _id is None else (_id,)
+
+        best: tuple[str, ...] = ()
+        for fields in self._indexes:
+            if len(fields) > len(best) and all(k in query for k in fields):
+                best = fields
+        if not best:
+            return None
+        try:
+            return self._indexes[best].get(tuple(query[k] for k in best), {})
+        except TypeError:
+            return None
+
     def find(self, query: Item | None = None) -> list[Item]:
         """DataStore から Item のリストを取得します。
 
+        クエリに :attr:`.DataStore._KEYS` または :attr:`.DataStore._INDEXES` の
+        フィールドが含まれる場合は、インデックスを利用して検索します。
+
         Args:
             query: DataStore をフィルタするクエリ辞書
 
@@ -204,21 +606,28 @@ class DataStore:
             クエリの指定があれば、それに一致するデータを返します
         """
         if query:
+            ids = self._lookup(query)
+            items = self if ids is None else (self._data[_id] for _id in ids)
             return [
                 item
-                for item in self
+                for item in items
                 if all(k in item and query[k] == item[k] for k in query)
             ]
         else:
             return list(self)
 
-    def _find_with_uuid(self, query: Item | None = None) -> dict[uuid.UUID, Item]:
+    def _find_with_uuid(self, query: Item | None = None) -> dict[int, Item]:
         if query is None:
             query = {}
         if query:
+            ids = self._lookup(query)
+            if ids is None:
+                items: Iterable[tuple[int, Item]] = self._data.items()
+            else:
+                items = ((_id, self._data[_id]) for _id in ids)
             return {
                 _id: item
-                for _id, item in self._data.items()
+                for _id, item in items
                 if all(k in item and query[k] == item[k] for k in query)
             }
         else:
@@ -228,11 +637,7 @@ class DataStore:
         if query is None:
             query = {}
         if query:
-            ret = [
-                item
-                for item in self
-                if all(k in item and query[k] == item[k] for k in query)
-            ]
+            ret = self.find(query)
             self._delete(ret)
             return ret
         else:
@@ -267,10 +672,110 @@ class DataStore:
 
         return result
 
+    def columns(self) -> dict[str, memoryview]:
+        """DataStore のデータを列指向の配列として取得します。
+
+        :attr:`_COLUMNS` に定義された列ごとに、型付きの配列 (:mod:`array`) のビューを返します。
+        列の値はデータの格納時に変換され、ビューの取得時に複製は行われません。
+        列の順序は DataStore の反復順序と同じです。
+
+        Returns:
+            列名とその :class:`memoryview` の辞書。 :attr:`_COLUMNS` が未定義の場合は空の辞書です
+        """
+        if not self._COLUMNS:
+            return {}
+        if self._columns is None:
+            self._columns = _Columns(self._COLUMNS)
+            self._columns.rebuild(self._data.items())
+        return self._columns.views(self._data)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """DataStore のデータを列ごとの NumPy 配列として取得します。
+
+        :meth:`columns` のビューを複製せずに :class:`numpy.ndarray` に変換します。
+        NumPy がインストールされている必要があります。
+
+        Returns:
+            列名とその :class:`numpy.ndarray` の辞書
+        """
+        import numpy as np
+
+        return {name: np.asarray(view) for name, view in self.columns().items()}
+
+    @property
+    def collect_metrics(self) -> bool:
+        """変更回数などのカウンタを計測するかどうか
+
+        無効の場合、 :meth:`metrics` のカウンタは 0 になります。 デフォルトは無効です。
+        """
+        return self._counts is not None
+
+    @collect_metrics.setter
+    def collect_metrics(self, value: bool) -> None:
+        if not value:
+            self._counts = None
+        elif self._counts is None:
+            self._counts = dict.fromkeys(_COUNTERS, 0)
+
+    def metrics(self) -> dict[str, Any]:
+        """DataStore のメトリクスを取得します。
+
+        件数や変更ストリームの滞留数などのゲージは常に取得できます。
+        変更回数などのカウンタは :attr:`collect_metrics` が有効な間のみ計測される累計値です。
+
+        Returns:
+            メトリクスの辞書
+
+        Usage example: :ref:`metrics`
+        """
+        queues: list[Any] = [*self._queues]
+        waiters = len(self._events)
+        for routes in self._filters.values():
+            for targets in routes.values():
+                for target in targets:
+                    if isinstance(target, _StoreWaiter):
+                        waiters += 1
+                    else:
+                        queues.append(target)
+        depths = [queue.qsize() for queue in queues]
+        return {
+            **(self._counts or dict.fromkeys(_COUNTERS, 0)),
+            "size": len(self),
+            "bytes": self._estimate_bytes(),
+            "streams": len(queues),
+            "queued": sum(depths),
+            "max_queued": max(depths, default=0),
+            "dropped": sum(getattr(queue, "dropped", 0) for queue in queues),
+            "waiters": waiters,
+        }
+
+    def _estimate_bytes(self) -> int:
+        # Extrapolated from a few rows, values are measured shallowly.
+        size = sys.getsizeof(self._data) + sys.getsizeof(self._index)
+        sample = list(itertools.islice(self, _METRICS_SAMPLE))
+        if sample:
+            row = sum(
+                sys.getsizeof(item) + sum(map(sys.getsizeof, item.values()))
+                for item in sample
+            )
+            size += row * len(self) // len(sample)
+        return size
+
     def _set(self) -> None:
+        if self._deferred:
+            return
+        for queue in self._pending:
+            if queue._flush():
+                self._overflowed = True
+        self._pending.clear()
         for event in self._events:
             event.set()
         self._events.clear()
+        # A DataStore of a collection reports the overflow when the message is
+        # applied, so that model methods never stop between two operations.
+        if self._overflowed and not self._collected:
+            self._overflowed = False
+            raise asyncio.QueueFull
 
     async def wait(self) -> None:
         """DataStore にデータの変更があるまで待機します。
@@ -281,28 +786,746 @@ class DataStore:
         self._events.append(event)
         await event.wait()
 
+    async def wait_for(
+        self,
+        query: Item | None = None,
+        predicate: Callable[[Item], bool] | None = None,
+        *,
+        op: Literal["insert", "update", "delete"] | None = None,
+        timeout: float | None = None,
+    ) -> StoreChange:
+        """条件に一致する変更があるまで待機します。
+
+        :meth:`wait` と異なり、条件に一致しない変更では待機は解除されません。
+        待機の開始以前の DataStore の状態は確認しません。
+
+        Args:
+            query: 指定した場合、変更後のアイテムが全てのフィールドに一致する変更を待機します
+            predicate: 指定した場合、変更後のアイテムを渡して True を返す変更を待機します
+            op: 指定した場合、そのオペレーションの変更のみを待機します
+            timeout: タイムアウトの秒数。 超過した場合は :class:`asyncio.TimeoutError` を送出します
+
+        Returns:
+            条件に一致した変更
+
+        Usage example: :ref:`wait`
+        """
+        waiter = _StoreWaiter(op, predicate)
+        route = self._add_filter(query, waiter)
+        try:
+            return (await asyncio.wait_for(waiter._future, timeout))._copy()
+        finally:
+            self._discard_filter(route, waiter)
+
+    def _add_filter(
+        self, query: Item | None, target: _StoreQueue | _StoreWaiter
+    ) -> tuple[tuple[str, ...], tuple[Hashable, ...]]:
+        fields = tuple(sorted(query)) if query else ()
+        values = tuple(query[k] for k in fields) if query else ()
+        self._filters.setdefault(fields, {}).setdefault(values, []).append(target)
+        return fields, values
+
+    def _discard_filter(
+        self,
+        route: tuple[tuple[str, ...], tuple[Hashable, ...]],
+        target: _StoreQueue | _StoreWaiter,
+    ) -> None:
+        fields, values = route
+        routes = self._filters[fields]
+        routes[values].remove(target)
+        if not routes[values]:
+            del routes[values]
+            if not routes:
+                del self._filters[fields]
+
+    def _change(
+        self,
+        operation: Literal["insert", "update", "delete"],
+        source: Item | None,
+        item: Item,
+    ) -> StoreChange:
+        return StoreChange(
+            self,
+            operation,
+            None if source is None else dict(source),
+            dict(item),
+        )
+
     def _put(
         self,
         operation: Literal["insert", "update", "delete"],
         source: Item | None,
         item: Item,
     ) -> None:
-        for queue in self._queues:
-            queue.put_nowait(
-                StoreChange(self, operation, copy.deepcopy(source), copy.deepcopy(item))
-            )
+        if self._counts is not None:
+            self._counts[operation] += 1
+        self._version += 1
+        change = None
+        if self._changelog is not None:
+            change = self._change(operation, source, item)
+            self._changelog.append((self._version, change))
+        if not self._queues and not self._filters:
+            return
+
+        if self._queues:
+            if change is None:
+                change = self._change(operation, source, item)
+            for queue in self._queues:
+                queue.put_nowait(change)
+
+        for fields, routes in self._filters.items():
+            try:
+                targets = routes.get(tuple(item.get(k, _MISSING) for k in fields))
+            except TypeError:
+                continue
+            if targets:
+                for target in targets:
+                    if target._predicate is None or target._predicate(item):
+                        if change is None:
+                            change = self._change(operation, source, item)
+                        target.put_nowait(change)
+
+    @overload
+    def watch(
+        self,
+        *,
+        batch: Literal[False] = ...,
+        maxsize: int = ...,
+        overflow: StoreOverflow = ...,
+        query: Item | None = ...,
+        predicate: Callable[[Item], bool] | None = ...,
+    ) -> StoreStream[StoreChange]: ...
 
-    def watch(self) -> "StoreStream":
+    @overload
+    def watch(
+        self,
+        *,
+        batch: Literal[True],
+        maxsize: int = ...,
+        overflow: StoreOverflow = ...,
+        query: Item | None = ...,
+        predicate: Callable[[Item], bool] | None = ...,
+    ) -> StoreStream[list[StoreChange]]: ...
+
+    def watch(
+        self,
+        *,
+        batch: bool = False,
+        maxsize: int = 0,
+        overflow: StoreOverflow = "drop_oldest",
+        query: Item | None = None,
+        predicate: Callable[[Item], bool] | None = None,
+    ) -> StoreStream[Any]:
         """DataStore の更新データをストリームします。
 
+        Args:
+            batch: True の場合、 :meth:`_insert` や :meth:`_update` などの 1 回の操作
+                (:meth:`.DataStoreCollection.onmessage` の場合は 1 メッセージ) による
+                変更をリストにまとめて 1 度に配信します
+            maxsize: ストリームに滞留できる変更の上限数 (``batch`` の場合はリストの数)。
+                0 以下の場合は無制限です
+            overflow: 上限を超えた場合の動作
+
+                - ``"drop_oldest"``: 最も古い変更を破棄します
+                - ``"drop_newest"``: 新しい変更を破棄します
+                - ``"block_producer_error"``: 新しい変更を破棄し、更新操作の完了後に
+                  更新側へ :class:`asyncio.QueueFull` を送出します。 DataStoreCollection の
+                  DataStore では :meth:`.DataStoreCollection.onmessage` の完了時に送出し、
+                  ``initialize`` などそれ以外の更新による超過は次の onmessage で送出します
+                - ``"conflate_by_key"``: 同じキー (:attr:`_KEYS`) の変更を最新の 1 件にまとめ、
+                  それでも溢れる場合は最も古い変更を破棄します
+            query: 指定した場合、変更後のアイテムが全てのフィールドに一致する変更のみを配信します
+            predicate: 指定した場合、変更後のアイテムを渡して True を返す変更のみを配信します
+
         Usage example: :ref:`watch`
         """
-        return StoreStream(self)
+        return StoreStream(
+            self,
+            batch=batch,
+            maxsize=maxsize,
+            overflow=overflow,
+            query=query,
+            predicate=predicate,
+        )
+
+
+class SortedBookStore(DataStore):
+    """Abstract order book DataStore class.
+
+    板情報の DataStore 基底クラスです。
+    銘柄 (:attr:`_BOOK_KEYS`) とサイド (:attr:`_SIDE_KEY`) ごとに価格 (:attr:`_PRICE_KEY`) で
+    ソートされた状態を保持するため、 :meth:`sorted` は板全体を再ソートしません。
+    """
+
+    _BOOK_KEYS: list[str] = []
+    _SIDE_KEY: str
+    _ASC_SIDE: str
+    _DESC_SIDE: str
+    _PRICE_KEY: str
+    _SIZE_KEY: str
+
+    def __init__(
+        self,
+        name: str | None = None,
+        keys: list[str] | None = None,
+        data: list[Item] | None = None,
+        *,
+        indexes: list[list[str]] | None = None,
+    ) -> None:
+        self._books: dict[tuple[Hashable, ...], list[tuple[float, int, int]]] = {}
+        self._levels: dict[
+            int, tuple[tuple[Hashable, ...], tuple[float, int, int]]
+        ] = {}
+        self._ticks: dict[tuple[Hashable, ...], tuple[int, int]] = {}
+        self._numeric: dict[int, tuple[int, int]] = {}
+        super().__init__(name, keys, data, indexes=indexes)
+
+    def _link(self, _id: int, item: Item) -> None:
+        super()._link(_id, item)
+        self._link_level(_id, item)
+
+    def _unlink(self, _id: int, item: Item) -> None:
+        super()._unlink(_id, item)
+        self._unlink_level(_id)
+
+    def _link_level(self, _id: int, item: Item) -> None:
+        try:
+            book = (*(item[k] for k in self._BOOK_KEYS), item[self._SIDE_KEY])
+            digits = self._ticks.get(book[:-1]) if self._ticks else None
+            if digits is None:
+                numeric = None
+                price: float = float(item[self._PRICE_KEY])
+            else:
+                numeric = (
+                    _scaled(item[self._PRICE_KEY], digits[0]),
+                    _scaled(item[self._SIZE_KEY], digits[1]),
+                )
+                price = numeric[0]
+            levels = self._books.setdefault(book, [])
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            return
+        if numeric is not None:
+            self._numeric[_id] = numeric
+        # Ties are kept in DataStore order (ids are increasing) on both sides and
+        # across books, as a stable sort of the rows would do.
+        order = -_id if book[-1] == self._DESC_SIDE else _id
+        entry = (price, order, _id)
+        bisect.insort(levels, entry)
+        self._levels[_id] = (book, entry)
+
+    def _unlink_level(self, _id: int) -> None:
+        if _id in self._levels:
+            if self._numeric:
+                self._numeric.pop(_id, None)
+            book, entry = self._levels.pop(_id)
+            levels = self._books[book]
+            del levels[bisect.bisect_left(levels, entry)]
+            if not levels:
+                del self._books[book]
+
+    def _relink(self, _id: int, item: Item, source: Item) -> None:
+        super()._relink(_id, item, source)
+        for k in (*self._BOOK_KEYS, self._SIDE_KEY, self._PRICE_KEY):
+            if k in source and source[k] != item.get(k, _MISSING):
+                self._unlink_level(_id)
+                self._link_level(_id, {**item, **source})
+                return
+        if _id in self._numeric and self._SIZE_KEY in source:
+            book, _ = self._levels[_id]
+            try:
+                size = _scaled(source[self._SIZE_KEY], self._ticks[book[:-1]][1])
+            except (TypeError, ValueError, ArithmeticError):
+                self._unlink_level(_id)
+            else:
+                self._numeric[_id] = (self._numeric[_id][0], size)
+
+    def _reset(self) -> None:
+        self._books.clear()
+        self._levels.clear()
+        self._numeric.clear()
+        super()._reset()
+
+    def _numeric_key(self, item: Item) -> tuple[Hashable, ...]:
+        key = self._base_key(item)
+        try:
+            digits = self._ticks[tuple(item[k] for k in self._BOOK_KEYS)]
+            price = _scaled(key[self._price_pos], digits[0])
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            return key
+        return (*key[: self._price_pos], price, *key[self._price_pos + 1 :])
+
+    def set_ticks(self, book: Item, price_tick: str, size_tick: str) -> None:
+        """銘柄の価格と数量を固定小数点の整数で保持します。
+
+        以降に受信した銘柄の板情報は、価格と数量の刻み幅の桁数で整数に変換して保持されます。
+        価格のキーは整数で比較されるため ``"100.0"`` と ``"100.00"`` は同じ価格として扱われます。
+        整数の値は :meth:`sorted_numeric` で取得できます。
+
+        Args:
+            book: 銘柄 (:attr:`_BOOK_KEYS`) を指定する辞書
+            price_tick: 価格の刻み幅 (例: ``"0.1"``)
+            size_tick: 数量の刻み幅 (例: ``"0.001"``)
+
+        Raises:
+            ValueError: 銘柄の板情報が既に存在する場合
+        """
+        key = tuple(book[k] for k in self._BOOK_KEYS)
+        if any(levels[:-1] == key for levels in self._books):
+            raise ValueError(f"set_ticks() must be called before receiving {book}")
+        self._ticks[key] = (_tick_digits(price_tick), _tick_digits(size_tick))
+        if self._PRICE_KEY in self._keys and self._key != self._numeric_key:
+            self._base_key = self._key
+            self._price_pos = self._keys.index(self._PRICE_KEY)
+            self._key = self._numeric_key
+
+    def sorted(
+        self, query: Item | None = None, limit: int | None = None
+    ) -> dict[str, list[Item]]:
+        """板情報をサイドごとに価格でソートして取得します。
+
+        Args:
+            query: DataStore をフィルタするクエリ辞書
+            limit: サイドごとの最大件数
+
+        Returns:
+            売り側 (価格の昇順) と買い側 (価格の降順) のリストを格納した辞書を返します
+        """
+        return self._sorted_rows(self._data, query, limit)
+
+    def sorted_numeric(
+        self, query: Item | None = None, limit: int | None = None
+    ) -> dict[str, list[tuple[int, int]]]:
+        """板情報を固定小数点の整数で取得します。
+
+        :meth:`set_ticks` で設定した銘柄の ``(価格, 数量)`` を、
+        それぞれの刻み幅の桁数 (``"0.1"`` であれば 10 倍) の整数で :meth:`sorted` と同じ順序で返します。
+        :meth:`set_ticks` で設定していない銘柄は含まれません。
+
+        Args:
+            query: DataStore をフィルタするクエリ辞書
+            limit: サイドごとの最大件数
+
+        Returns:
+            売り側 (価格の昇順) と買い側 (価格の降順) のリストを格納した辞書を返します
+        """
+        return self._sorted_rows(self._numeric, query, limit)
+
+    def _sorted_rows(
+        self, rows: Mapping[int, _T], query: Item | None, limit: int | None
+    ) -> dict[str, list[_T]]:
+        if query is None:
+            query = {}
+
+        book_query = [
+            (i, query[k]) for i, k in enumerate(self._BOOK_KEYS) if k in query
+        ]
+        rest = {
+            k: v
+            for k, v in query.items()
+            if k not in self._BOOK_KEYS and k != self._SIDE_KEY
+        }
+
+        result: dict[str, list[_T]] = {self._ASC_SIDE: [], self._DESC_SIDE: []}
+        for side, reverse in ((self._ASC_SIDE, False), (self._DESC_SIDE, True)):
+            if self._SIDE_KEY in query and query[self._SIDE_KEY] != side:
+                continue
+
+            if len(book_query) == len(self._BOOK_KEYS):
+                try:
+                    found = self._books.get((*(v for _, v in book_query), side))
+                except TypeError:
+                    found = None
+                matched = [found] if found else []
+            else:
+                matched = [
+                    levels
+                    for book, levels in self._books.items()
+                    if book[-1] == side and all(book[i] == v for i, v in book_query)
+                ]
+            books = [reversed(levels) if reverse else levels for levels in matched]
+            if not books:
+                continue
+            elif len(books) == 1:
+                entries: Iterable[tuple[float, int, int]] = books[0]
+            else:
+                entries = heapq.merge(*books, reverse=reverse)
+
+            values = result[side]
+            for _, _, _id in entries:
+                if limit and len(values) >= limit:
+                    break
+                value = rows.get(_id)
+                if value is None:
+                    continue
+                if rest:
+                    item = self._data[_id]
+                    if not all(k in item and v == item[k] for k, v in rest.items()):
+                        continue
+                values.append(value)
+
+        return result
 
 
 TDataStore = TypeVar("TDataStore", bound=DataStore)
 
 
+class _Columns:
+    # Columnar mirror of a DataStore fed by the row lifecycle hooks. Rows are
+    # appended to typed arrays in iteration order. Evicting the oldest row only
+    # moves a start offset, an unlink immediately followed by a link of the same
+    # row (a replacement) is written in place and any other removal marks the
+    # mirror dirty so that it is rebuilt on the next read.
+    __slots__ = ("_specs", "_arrays", "_rows", "_start", "_removed", "_dirty")
+
+    def __init__(self, specs: dict[str, tuple[str, str, Callable[[Any], Any]]]) -> None:
+        self._specs = specs
+        self._arrays: dict[str, array.array] = {}
+        self._rows: dict[Hashable, int] = {}
+        self._start = 0
+        self._removed: Hashable | None = None
+        self._dirty = False
+        self.clear()
+
+    def _convert(self, typecode: str, conv: Callable[[Any], Any], value: Any) -> Any:
+        try:
+            return conv(value)
+        except (TypeError, ValueError, KeyError):
+            return float("nan") if typecode == "d" else 0
+
+    def append(self, _id: Hashable, item: Item) -> None:
+        if self._removed is not None and self._removed == _id:
+            self._removed = None
+            pos = self._rows[_id]
+            for name, (field, typecode, conv) in self._specs.items():
+                self._arrays[name][pos] = self._convert(typecode, conv, item.get(field))
+            return
+        self._resolve()
+        if self._dirty:
+            return
+        self._rows[_id] = len(self._arrays[next(iter(self._arrays))])
+        for name, (field, typecode, conv) in self._specs.items():
+            value = self._convert(typecode, conv, item.get(field))
+            try:
+                self._arrays[name].append(value)
+            except BufferError:
+                # A view returned by ``columns()`` is still alive.
+                self._arrays[name] = array.array(typecode, self._arrays[name])
+                self._arrays[name].append(value)
+
+    def remove(self, _id: Hashable) -> None:
+        self._resolve()
+        if not self._dirty:
+            self._removed = _id
+
+    def update(self, _id: Hashable, source: Item) -> None:
+        self._resolve()
+        if self._dirty:
+            return
+        pos = self._rows[_id]
+        for name, (field, typecode, conv) in self._specs.items():
+            if field in source:
+                self._arrays[name][pos] = self._convert(typecode, conv, source[field])
+
+    def _resolve(self) -> None:
+        if self._removed is None:
+            return
+        pos = self._rows.pop(self._removed)
+        self._removed = None
+        if pos != self._start:
+            self._dirty = True
+            return
+        self._start += 1
+        length = len(self._arrays[next(iter(self._arrays))])
+        if self._start > 1024 and self._start * 2 > length:
+            for name, values in self._arrays.items():
+                self._arrays[name] = values[self._start :]
+            self._rows = {_id: pos - self._start for _id, pos in self._rows.items()}
+            self._start = 0
+
+    def rebuild(self, rows: Iterable[tuple[Hashable, Item]]) -> None:
+        self.clear()
+        for _id, item in rows:
+            self.append(_id, item)
+
+    def views(self, data: Mapping[Any, Item]) -> dict[str, memoryview]:
+        self._resolve()
+        if self._dirty:
+            self.rebuild(data.items())
+        return {
+            name: memoryview(values)[self._start :]
+            for name, values in self._arrays.items()
+        }
+
+    def clear(self) -> None:
+        self._arrays = {
+            name: array.array(typecode)
+            for name, (_, typecode, _) in self._specs.items()
+        }
+        self._rows = {}
+        self._start = 0
+        self._removed = None
+        self._dirty = False
+
+
+class _Ring:
+    # Fixed-capacity circular buffer addressed by a monotonically increasing
+    # sequence number. Removed slots are kept as ``None`` until overwritten.
+    __slots__ = ("_items", "_capacity", "_base", "_start", "_end", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._items: list[Item | None] = []
+        self._capacity = max(capacity, 1)
+        self._base = 0
+        self._start = 0
+        self._end = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, seq: object) -> bool:
+        return (
+            isinstance(seq, int)
+            and self._start <= seq < self._end
+            and self._items[(seq - self._base) % self._capacity] is not None
+        )
+
+    def __getitem__(self, seq: int) -> Item:
+        if seq not in self:
+            raise KeyError(seq)
+        return self._items[(seq - self._base) % self._capacity]  # type: ignore[return-value]
+
+    def __delitem__(self, seq: int) -> None:
+        if seq not in self:
+            raise KeyError(seq)
+        self._items[(seq - self._base) % self._capacity] = None
+        self._size -= 1
+        if seq == self._start:
+            while (
+                self._start < self._end
+                and self._items[(self._start - self._base) % self._capacity] is None
+            ):
+                self._start += 1
+
+    def __iter__(self) -> Iterator[int]:
+        return (seq for seq, _ in self.items())
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self._items)
+
+    def pop(self, seq: int) -> Item:
+        item = self[seq]
+        del self[seq]
+        return item
+
+    def keys(self) -> list[int]:
+        return list(self)
+
+    def values(self) -> list[Item]:
+        items = self._slice(self._start, self._end)
+        if self._size == len(items):
+            return items  # type: ignore[return-value]
+        return [item for item in items if item is not None]
+
+    def items(self) -> list[tuple[int, Item]]:
+        return [
+            (seq, item)
+            for seq, item in zip(
+                range(self._start, self._end),
+                self._slice(self._start, self._end),
+                strict=True,
+            )
+            if item is not None
+        ]
+
+    def reversed(self) -> Iterator[Item]:
+        for seq in range(self._end - 1, self._start - 1, -1):
+            item = self._items[(seq - self._base) % self._capacity]
+            if item is not None:
+                yield item
+
+    def tail(self, n: int) -> list[Item]:
+        if n <= 0:
+            return []
+        if self._size == self._end - self._start:
+            return self._slice(max(self._start, self._end - n), self._end)  # type: ignore[return-value]
+        result = [item for _, item in zip(range(n), self.reversed(), strict=False)]
+        result.reverse()
+        return result
+
+    def _slice(self, start: int, end: int) -> list[Item | None]:
+        if start >= end:
+            return []
+        lo = (start - self._base) % self._capacity
+        hi = lo + end - start
+        if hi <= self._capacity:
+            return self._items[lo:hi]
+        return self._items[lo:] + self._items[: hi - self._capacity]
+
+    def append(self, item: Item) -> tuple[int, Item | None]:
+        evicted = None
+        if self._end - self._start == self._capacity:
+            evicted = self._items[(self._start - self._base) % self._capacity]
+            if evicted is not None:
+                self._size -= 1
+            self._start += 1
+        seq = self._end
+        pos = (seq - self._base) % self._capacity
+        if pos == len(self._items):
+            self._items.append(item)
+        else:
+            self._items[pos] = item
+        self._end += 1
+        self._size += 1
+        return seq, evicted
+
+    def clear(self) -> None:
+        self._items = []
+        self._base = self._start = self._end
+        self._size = 0
+
+
+class RingStore(DataStore):
+    """Abstract append-only DataStore class.
+
+    約定履歴などの追記のみの DataStore 基底クラスです。
+    固定長 (:attr:`_MAXLEN`) の循環バッファにアイテムを保持し、
+    追加と古いアイテムの破棄を定数時間で行います。キー (:attr:`_KEYS`) は指定できません。
+    """
+
+    def __init__(
+        self,
+        name: str | None = None,
+        keys: list[str] | None = None,
+        data: list[Item] | None = None,
+        *,
+        indexes: list[list[str]] | None = None,
+    ) -> None:
+        super().__init__(name, keys, indexes=indexes)
+        if self._keys:
+            raise ValueError("RingStore does not support keys")
+        self._data: _Ring = _Ring(self._MAXLEN)  # type: ignore[assignment]
+        if data:
+            self._insert(data)
+
+    def __reversed__(self) -> Iterator[Item]:
+        return self._data.reversed()
+
+    def _insert(self, data: list[Item]) -> None:
+        self._append("insert", data)
+
+    def _update(self, data: list[Item]) -> None:
+        self._append("update", data)
+
+    def _restore(self, data: list[Item]) -> None:
+        self._reset()
+        self._discontinue()
+        self._append(None, data)
+
+    def _append(
+        self, operation: Literal["insert", "update"] | None, data: list[Item]
+    ) -> None:
+        size = len(self._data)
+        for item in data:
+            seq, evicted = self._data.append(item)
+            if evicted is not None:
+                self._unlink(seq - self._data._capacity, evicted)
+                self._log_eviction(evicted)
+            self._link(seq, item)
+            if operation is not None:
+                self._put(operation, None, item)
+        if size + len(data) > len(self._data):
+            self._evicted(size + len(data) - len(self._data))
+        self._sweep_expired()
+        self._set()
+
+    def tail(self, n: int) -> list[Item]:
+        """末尾 (最新) から最大 n 件のアイテムを古い順のリストで取得します。
+
+        Args:
+            n: 取得する件数
+
+        Returns:
+            最新 n 件のアイテムのリスト
+        """
+        return self._data.tail(n)
+
+
+class StoreSnapshot:
+    """DataStore のある時点の読み取り専用のビュー
+
+    :meth:`DataStore.snapshot` で作成します。
+    作成後に DataStore が更新されても内容は変化しないため、 :class:`concurrent.futures.ThreadPoolExecutor`
+    などの別スレッドから参照できます。 アイテムは DataStore と共有されるため変更しないでください。
+
+    Usage example: :ref:`snapshot`
+    """
+
+    __slots__ = ("_items", "_keys", "_key", "_index", "version", "__weakref__")
+
+    def __init__(
+        self,
+        items: tuple[Item, ...],
+        keys: tuple[str, ...],
+        key: Callable[[Item], tuple[Hashable, ...]],
+        version: int,
+    ) -> None:
+        self._items = items
+        self._keys = keys
+        # The key getter of the DataStore, e.g. numeric prices of a SortedBookStore.
+        self._key = key
+        self._index: dict[tuple[Hashable, ...], Item] | None = None
+        #: スナップショット作成時の :attr:`.DataStore.version`
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self._items)
+
+    def __reversed__(self) -> Iterator[Item]:
+        return reversed(self._items)
+
+    def get(self, item: Item) -> Item | None:
+        """スナップショットから Item を取得します。
+
+        Args:
+            item: DataStore のキー (:attr:`.DataStore._KEYS`) を指定する辞書
+
+        Returns:
+            キーに一致するアイテムがあればそのアイテムを返します。
+            なければ None を返します
+        """
+        if not self._keys:
+            return None
+        if self._index is None:
+            self._index = {self._key(x): x for x in self._items}
+        try:
+            return self._index.get(self._key(item))
+        except KeyError:
+            return None
+
+    def find(self, query: Item | None = None) -> list[Item]:
+        """スナップショットから Item のリストを取得します。
+
+        Args:
+            query: スナップショットをフィルタするクエリ辞書
+
+        Returns:
+            クエリの指定がなければ全件データを返します。
+            クエリの指定があれば、それに一致するデータを返します
+        """
+        if query:
+            return [
+                item
+                for item in self._items
+                if all(k in item and query[k] == item[k] for k in query)
+            ]
+        else:
+            return list(self._items)
+
+
 @dataclass
 class StoreChange:
     """DataStore の変更データクラス
@@ -313,6 +1536,10 @@ class StoreChange:
         source: 変更に影響したデータ。 なければ None が格納されます
         data: 変更されたデータ
 
+    ``source`` と ``data`` は変更時点のデータで、受け取り側ごとに複製された辞書です。
+    ネストされた辞書とリストは複製されず、 DataStore のアイテムおよび他の受け取り側と共有されます。
+    ネストされた値を変更する場合は :func:`copy.deepcopy` などで複製してください。
+
     Usage example: :ref:`watch`
     """
 
@@ -321,37 +1548,241 @@ class StoreChange:
     source: Item | None
     data: Item
 
+    def _copy(self) -> StoreChange:
+        # The change is shared by every stream, each consumer gets its own top level dicts.
+        return StoreChange(
+            self.store,
+            self.operation,
+            None if self.source is None else dict(self.source),
+            dict(self.data),
+        )
+
+
+class _StoreQueue(asyncio.Queue):
+    def __init__(
+        self,
+        store: DataStore,
+        *,
+        batch: bool = False,
+        maxsize: int = 0,
+        overflow: StoreOverflow = "drop_oldest",
+        predicate: Callable[[Item], bool] | None = None,
+    ) -> None:
+        if overflow not in _OVERFLOWS:
+            raise ValueError(f"overflow must be one of {_OVERFLOWS}: {overflow!r}")
+        if overflow == "conflate_by_key":
+            if batch:
+                raise ValueError("conflate_by_key cannot be used with batch")
+            if not store._keys:
+                raise ValueError("conflate_by_key requires a DataStore with keys")
+        self._store = store
+        self._overflow = overflow
+        self._predicate = predicate
+        self._batch = batch
+        self._buffer: list[StoreChange] = []
+        self._scheduled = False
+        self._overflowed = False
+        self.dropped = 0
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        if self._overflow == "conflate_by_key":
+            self._queue: Any = OrderedDict()
+        else:
+            super()._init(maxsize)
+
+    def _put(self, item: Any) -> None:
+        if self._overflow == "conflate_by_key":
+            self._queue[self._conflate_key(item)] = item
+        else:
+            super()._put(item)
+
+    def _get(self) -> Any:
+        if self._overflow == "conflate_by_key":
+            return self._queue.popitem(last=False)[1]
+        return super()._get()
+
+    def _conflate_key(self, change: StoreChange) -> tuple[Any, ...]:
+        return tuple(change.data.get(k) for k in self._store._keys)
+
+    def put_nowait(self, item: Any) -> None:
+        if self._batch or self._store._deferred:
+            self._schedule()
+            self._buffer.append(item)
+        else:
+            self._offer(item)
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            self._store._pending.append(self)
+
+    def _flush(self) -> bool:
+        if self._buffer:
+            buffer, self._buffer = self._buffer, []
+            if self._batch:
+                self._offer(buffer)
+            else:
+                for change in buffer:
+                    self._offer(change)
+        self._scheduled = False
+        overflowed, self._overflowed = self._overflowed, False
+        return overflowed
+
+    def _offer(self, item: Any) -> None:
+        if self._overflow == "conflate_by_key":
+            key = self._conflate_key(item)
+            if key in self._queue:
+                self._queue[key] = item
+                self.dropped += 1
+                return
+        if self.full():
+            if self._overflow == "drop_newest":
+                self.dropped += _count(item)
+                return
+            elif self._overflow == "block_producer_error":
+                self.dropped += _count(item)
+                self._overflowed = True
+                self._schedule()
+                return
+            self.dropped += _count(self.get_nowait())
+        super().put_nowait(item)
+
+
+class _StoreWaiter:
+    # One-shot target in DataStore._filters used by DataStore.wait_for().
+    __slots__ = ("_op", "_predicate", "_future")
+
+    def __init__(
+        self,
+        op: Literal["insert", "update", "delete"] | None,
+        predicate: Callable[[Item], bool] | None,
+    ) -> None:
+        self._op = op
+        self._predicate = predicate
+        self._future: asyncio.Future[StoreChange] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+    def put_nowait(self, change: StoreChange) -> None:
+        if not self._future.done() and self._op in (None, change.operation):
+            self._future.set_result(change)
+
 
-class StoreStream:
+def _count(item: StoreChange | list[StoreChange]) -> int:
+    return len(item) if isinstance(item, list) else 1
+
+
+class StoreStream(Generic[_T]):
     """DataStore の変更ストリーム
 
     Usage example: :ref:`watch`
     """
 
-    def __init__(self, store: "DataStore") -> None:
-        self._queue: asyncio.Queue[StoreChange] = asyncio.Queue()
-        store._queues.append(self._queue)
+    def __init__(
+        self,
+        store: "DataStore",
+        *,
+        batch: bool = False,
+        maxsize: int = 0,
+        overflow: StoreOverflow = "drop_oldest",
+        query: Item | None = None,
+        predicate: Callable[[Item], bool] | None = None,
+    ) -> None:
+        self._queue: _StoreQueue = _StoreQueue(
+            store, batch=batch, maxsize=maxsize, overflow=overflow, predicate=predicate
+        )
+        self._route: tuple[tuple[str, ...], tuple[Hashable, ...]] | None = None
+        if query or predicate is not None:
+            self._route = store._add_filter(query, self._queue)
+        else:
+            store._queues.append(self._queue)
         self._store = store
 
-    async def get(self) -> StoreChange:
-        return await self._queue.get()
+    @property
+    def dropped(self) -> int:
+        """上限超過により破棄された変更の数"""
+        return self._queue.dropped
+
+    async def get(self) -> _T:
+        item = await self._queue.get()
+        if isinstance(item, list):
+            return cast("_T", [change._copy() for change in item])
+        return cast("_T", item._copy())
 
     def close(self):
-        self._store._queues.remove(self._queue)
+        if self._route is None:
+            self._store._queues.remove(self._queue)
+        else:
+            self._store._discard_filter(self._route, self._queue)
 
-    def __enter__(self) -> "StoreStream":
+    def __enter__(self) -> "StoreStream[_T]":
         return self
 
     def __exit__(self, *args: Any) -> None:
         self.close()
 
-    def __aiter__(self) -> "StoreStream":
+    def __aiter__(self) -> "StoreStream[_T]":
         return self
 
-    async def __anext__(self) -> StoreChange:
+    async def __anext__(self) -> _T:
         return await self.get()
 
 
+_STATE_VERSION = 1
+_STORE_METRICS = (
+    ("sweeps", "datastore_sweeps_total", "counter"),
+    ("evictions", "datastore_evictions_total", "counter"),
+    ("size", "datastore_size", "gauge"),
+    ("bytes", "datastore_bytes", "gauge"),
+    ("streams", "datastore_streams", "gauge"),
+    ("queued", "datastore_queued", "gauge"),
+    ("max_queued", "datastore_max_queued", "gauge"),
+    ("dropped", "datastore_dropped_total", "counter"),
+    ("waiters", "datastore_waiters", "gauge"),
+)
+_ONMESSAGE_METRICS = (
+    ("messages", "onmessage_total", "counter"),
+    ("seconds", "onmessage_seconds_total", "counter"),
+    ("max_seconds", "onmessage_max_seconds", "gauge"),
+)
+
+
+class _Timing:
+    __slots__ = ("count", "seconds", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def asdict(self) -> dict[str, Any]:
+        return {
+            "messages": self.count,
+            "seconds": self.seconds,
+            "max_seconds": self.max,
+        }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _import_msgpack() -> Any:
+    # Prefer the C extension when installed, the vendored copy is pure Python.
+    try:
+        import msgpack  # type: ignore
+    except ImportError:
+        from ._static_dependencies import msgpack
+    return msgpack
+
+
 class DataStoreCollection:
     """Abstract DataStoreCollection class.
 
@@ -362,6 +1793,8 @@ class DataStoreCollection:
     def __init__(self) -> None:
         self._stores: dict[str, DataStore] = {}
         self._events: list[asyncio.Event] = []
+        self._timing: _Timing | None = None
+        self._channels: dict[str, _Timing] = {}
         self._iscorofunc = asyncio.iscoroutinefunction(self._onmessage)
         if hasattr(self, "_init"):
             self._init()
@@ -379,12 +1812,18 @@ class DataStoreCollection:
         keys: list[str] | None = None,
         data: list[Item] | None = None,
         datastore_class: type[DataStore] = DataStore,
+        indexes: list[list[str]] | None = None,
     ) -> None:
         if keys is None:
             keys = []
         if data is None:
             data = []
-        self._stores[name] = datastore_class(name, keys, data)
+        if indexes is None:
+            store = datastore_class(name, keys, data)
+        else:
+            store = datastore_class(name, keys, data, indexes=indexes)
+        store._collected = True
+        self._stores[name] = store
 
     @overload
     def _get(self, name: str, type_: type[TDataStore]) -> TDataStore: ...
@@ -400,6 +1839,100 @@ class DataStoreCollection:
     def _onmessage(self, msg: Any, ws: ClientWebSocketResponse | None = None) -> None:
         print(msg)
 
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """全ての DataStore のデータを MessagePack 形式でファイルに保存します。
+
+        DataStore のデータと、 :attr:`.DataStore._STATE` に定義された内部状態が保存されます。
+        :meth:`load` で読み込むことで、再起動後に DataStore の状態を復元できます。
+
+        保存できる値は MessagePack で表現できる型 (数値、文字列、リスト、辞書など) のみです。
+        :class:`~decimal.Decimal` や :class:`~datetime.datetime` などを含む DataStore がある場合は
+        DataStore 名を含む :class:`TypeError` を送出し、ファイルは作成・変更されません。
+
+        Args:
+            path: 保存先のファイルパス
+        """
+        msgpack = _import_msgpack()
+        # Each DataStore is packed separately so that the error names the DataStore.
+        packer = msgpack.Packer()
+        chunks = [
+            packer.pack_map_header(3),
+            packer.pack("version"),
+            packer.pack(_STATE_VERSION),
+            packer.pack("saved_at"),
+            packer.pack(time.time()),
+            packer.pack("stores"),
+            packer.pack_map_header(len(self._stores)),
+        ]
+        for name, store in self._stores.items():
+            stored = {
+                "keys": list(store._keys),
+                "data": list(store),
+                "state": {attr: getattr(store, attr) for attr in store._STATE},
+            }
+            try:
+                chunks.append(packer.pack(name) + packer.pack(stored))
+            except (TypeError, ValueError) as e:
+                raise TypeError(f"DataStore {name!r} cannot be saved: {e}") from e
+
+        tmp = f"{os.fspath(path)}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.writelines(chunks)
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def load(self, path: str | os.PathLike[str]) -> datetime:
+        """:meth:`save` で保存したファイルから DataStore の状態を復元します。
+
+        ファイルに含まれる DataStore のデータは置き換えられます。
+        復元による変更は :meth:`.DataStore.watch` には配信されません。
+        保存時と DataStore のキーが異なる場合は :class:`ValueError` を送出し、何も復元しません。
+
+        復元されるのはデータと :attr:`.DataStore._STATE` に定義された内部状態のみです。
+        板情報の ``initialized`` やバッファされたメッセージなど、それ以外の内部状態は復元されない為、
+        必要に応じて改めて REST API で初期化してください。
+
+        Args:
+            path: :meth:`save` で保存したファイルパス
+
+        Returns:
+            保存された日時 (UTC) 。データの鮮度の判断に利用できます
+        """
+        msgpack = _import_msgpack()
+        with open(path, "rb") as f:
+            state = msgpack.unpackb(f.read())
+        if state.get("version") != _STATE_VERSION:
+            raise ValueError(f"Unsupported state version: {state.get('version')!r}")
+
+        stores = {
+            name: (self._stores[name], stored)
+            for name, stored in state["stores"].items()
+            if name in self._stores
+        }
+        for name, (store, stored) in stores.items():
+            if stored["keys"] != list(store._keys):
+                raise ValueError(
+                    f"Keys of DataStore {name!r} do not match: "
+                    f"{stored['keys']} != {list(store._keys)}"
+                )
+
+        for store, stored in stores.values():
+            store._restore(stored["data"])
+            for attr, value in stored["state"].items():
+                current = getattr(store, attr, None)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    current.clear()
+                    current.update(value)
+                else:
+                    setattr(store, attr, value)
+        self._set()
+
+        return datetime.fromtimestamp(state["saved_at"], tz=timezone.utc)
+
     def onmessage(self, msg: Any, ws: ClientWebSocketResponse | None = None) -> None:
         """WebSocket message handler.
 
@@ -409,8 +1942,133 @@ class DataStoreCollection:
             msg: WebSocket メッセージ
             ws: WebSocket レスポンスクラス
         """
-        self._onmessage(msg, ws)
-        self._set()
+        try:
+            if self._timing is None:
+                with self._batch():
+                    self._onmessage(msg, ws)
+            else:
+                self._timed_onmessage(msg, ws, self._timing)
+        finally:
+            # The message has been applied even if a stream overflowed.
+            self._set()
+
+    def _timed_onmessage(
+        self, msg: Any, ws: ClientWebSocketResponse | None, timing: _Timing
+    ) -> None:
+        # Time spent is attributed to every DataStore (channel) changed by the message.
+        changes = [store._changes() for store in self._stores.values()]
+        start = time.perf_counter()
+        with self._batch():
+            self._onmessage(msg, ws)
+        elapsed = time.perf_counter() - start
+        timing.add(elapsed)
+        for (name, store), before in zip(self._stores.items(), changes, strict=True):
+            if store._changes() != before:
+                self._channels.setdefault(name, _Timing()).add(elapsed)
+
+    @property
+    def collect_metrics(self) -> bool:
+        """メトリクスを計測するかどうか
+
+        有効にすると、全ての DataStore の :attr:`.DataStore.collect_metrics` と
+        onmessage の処理時間の計測が有効になります。 デフォルトは無効です。
+        """
+        return self._timing is not None
+
+    @collect_metrics.setter
+    def collect_metrics(self, value: bool) -> None:
+        for store in self._stores.values():
+            store.collect_metrics = value
+        if not value:
+            self._timing = None
+            self._channels.clear()
+        elif self._timing is None:
+            self._timing = _Timing()
+
+    def metrics(self) -> dict[str, Any]:
+        """全ての DataStore と onmessage のメトリクスを取得します。
+
+        onmessage の処理時間は :attr:`collect_metrics` が有効な間のみ計測されます。
+        ``channels`` はメッセージによって変更された DataStore ごとの処理時間です。
+
+        Returns:
+            メトリクスの辞書
+
+        Usage example: :ref:`metrics`
+        """
+        timing = self._timing or _Timing()
+        return {
+            **timing.asdict(),
+            "channels": {name: t.asdict() for name, t in self._channels.items()},
+            "stores": {name: store.metrics() for name, store in self._stores.items()},
+        }
+
+    def export_metrics(self, prefix: str = "pybotters") -> str:
+        """:meth:`metrics` を Prometheus のテキスト形式で出力します。
+
+        Args:
+            prefix: メトリクス名の接頭辞
+
+        Returns:
+            Prometheus のテキスト形式の文字列
+
+        Usage example: :ref:`metrics`
+        """
+        metrics = self.metrics()
+        lines: list[str] = []
+
+        def family(
+            name: str, kind: str, samples: Iterable[tuple[dict[str, str], Any]]
+        ) -> None:
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(
+                    f"{prefix}_{name}{{{label}}} {value}"
+                    if label
+                    else f"{prefix}_{name} {value}"
+                )
+
+        stores = metrics["stores"]
+        family(
+            "datastore_changes_total",
+            "counter",
+            (
+                ({"store": name, "operation": op}, m[op])
+                for name, m in stores.items()
+                for op in ("insert", "update", "delete")
+            ),
+        )
+        for key, name, kind in _STORE_METRICS:
+            family(name, kind, (({"store": n}, m[key]) for n, m in stores.items()))
+        for key, name, kind in _ONMESSAGE_METRICS:
+            family(name, kind, [({}, metrics[key])])
+            family(
+                f"channel_{name}",
+                kind,
+                (({"channel": n}, m[key]) for n, m in metrics["channels"].items()),
+            )
+        return "\n".join(lines) + "\n"
+
+    @contextlib.contextmanager
+    def _batch(self) -> Iterator[None]:
+        # Defers the notifications of every DataStore until the block exits, so
+        # watchers and waiters observe a fully applied message at once.
+        stores = list(self._stores.values())
+        for store in stores:
+            store._deferred += 1
+        try:
+            yield
+        finally:
+            overflowed = False
+            for store in stores:
+                store._deferred -= 1
+                store._set()
+                if store._overflowed:
+                    store._overflowed = False
+                    overflowed = True
+            if overflowed:
+                raise asyncio.QueueFull
 
     def _set(self) -> None:
         for event in self._events:
@@ -1,6 +1,6 @@
 from __future__ import annotations  # pragma: no cover
 
-from typing import TYPE_CHECKING, Any, Protocol  # pragma: no cover
+from typing import TYPE_CHECKING, Any, Literal, Protocol  # pragma: no cover
 
 if TYPE_CHECKING:
     import sys
@@ -31,9 +31,19 @@ if TYPE_CHECKING:
     WsBytesHandler = Callable[[bytes, ClientWebSocketResponse], None]
     WsJsonHandler = Callable[[Any, ClientWebSocketResponse], None]
 
+    JSONLoads = Callable[[str | bytes], Any]
+    JSONDumps = Callable[[Any], str]
+
     WsHeartBeatHandler = Callable[[ClientWebSocketResponse], Coroutine[Any, Any, None]]
     WsRateLimitHandler = Callable[
         [ClientWebSocketResponse, Awaitable[None]], Awaitable[None]
     ]
+    WsMessageBatchHandler = Callable[
+        [ClientWebSocketResponse, Any, Callable[[Any], Awaitable[None]]],
+        Awaitable[None],
+    ]
 
     Item: TypeAlias = dict[str, Any]
+    StoreOverflow: TypeAlias = Literal[
+        "drop_oldest", "drop_newest", "block_producer_error", "conflate_by_key"
+    ]
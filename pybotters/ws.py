@@ -3,10 +3,12 @@ from __future__ import annotations
 import asyncio
 import base64
 import datetime
+import functools
 import hashlib
+import heapq
 import hmac
 import inspect
-import json
+import itertools
 import logging
 import random
 import struct
@@ -15,30 +17,41 @@ import uuid
 import zlib
 from dataclasses import dataclass
 from secrets import token_hex
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Literal, cast
 from urllib.parse import urlencode
 
 import aiohttp
+from yarl import URL
 
+from . import _json
 from .auth import Auth as _Auth
 
 if TYPE_CHECKING:
     from collections.abc import (
         AsyncIterator,
         Awaitable,
+        Callable,
         Generator,
+        Hashable,
     )
 
+    from .client import Client
     from .typedefs import (
+        JSONDumps,
+        JSONLoads,
         WsBytesHandler,
         WsHeartBeatHandler,
         WsJsonHandler,
+        WsMessageBatchHandler,
         WsRateLimitHandler,
         WsStrHandler,
     )
 
 logger = logging.getLogger(__name__)
 
+# Params per SUBSCRIBE/UNSUBSCRIBE request on Binance streams
+_BINANCE_MAX_ARGS = 200
+
 
 def pretty_modulename(e: Exception) -> str:
     modulename = e.__class__.__name__
@@ -48,6 +61,13 @@ def pretty_modulename(e: Exception) -> str:
     return modulename
 
 
+def _loads(ws: ClientWebSocketResponse | None) -> JSONLoads:
+    # Falls back to the default for a ws that was not created by WebSocketApp.
+    if ws is None:
+        return _json.loads
+    return ws.__dict__.get("_json_loads", _json.loads)
+
+
 class WebSocketApp:
     _BACKOFF_MIN = 1.92
     _BACKOFF_MAX = 60.0
@@ -67,6 +87,9 @@ class WebSocketApp:
         hdlr_bytes: WsBytesHandler | list[WsBytesHandler] | None = None,
         hdlr_json: WsJsonHandler | list[WsJsonHandler] | None = None,
         backoff: tuple[float, float, float, float] = _DEFAULT_BACKOFF,
+        json_loads: JSONLoads | None = None,
+        json_dumps: JSONDumps | None = None,
+        dispatch: Literal["call_soon", "inline"] = "call_soon",
         **kwargs: Any,
     ) -> None:
         """WebSocket Application.
@@ -75,11 +98,26 @@ class WebSocketApp:
 
         Usage example: :ref:`websocketqueue`
         """
+        if dispatch not in {"call_soon", "inline"}:
+            raise ValueError(f"dispatch must be 'call_soon' or 'inline': {dispatch!r}")
+
         self._session = session
         self._url = url
 
+        self._json_loads: JSONLoads = json_loads or session.__dict__.get(
+            "_json_loads", _json.loads
+        )
+        self._json_dumps: JSONDumps = json_dumps or session.__dict__.get(
+            "_json_dumps", _json.dumps
+        )
+
         self._loop = session._loop
+        self._dispatch = dispatch
+        self._call_handler: Callable[..., Any] = (
+            self._call_inline if dispatch == "inline" else self._loop.call_soon
+        )
         self._current_ws: ClientWebSocketResponse | None = None
+        self._sent_ws: ClientWebSocketResponse | None = None
         self._event = asyncio.Event()
 
         self._autoping = kwargs.pop("autoping", True)
@@ -208,11 +246,16 @@ class WebSocketApp:
     ) -> None:
         async with self._session.ws_connect(self._url, autoping=False, **kwargs) as ws:
             ws = cast("ClientWebSocketResponse", ws)
+            ws._json_loads = self._json_loads
+            ws._json_dumps = self._json_dumps
             self._current_ws = ws
             self._event.set()
 
             await ws._wait_authtask()
 
+            # send_* lists are read at this point, later additions need to be sent
+            # on this ws directly
+            self._sent_ws = ws
             await self._ws_send(ws, send_str, send_bytes, send_json)
 
             await self._ws_receive(ws, hdlr_str, hdlr_bytes, hdlr_json)
@@ -237,9 +280,22 @@ class WebSocketApp:
         hdlr_bytes: list[WsBytesHandler],
         hdlr_json: list[WsJsonHandler],
     ) -> None:
-        async for msg in ws:
-            self._loop.call_soon(
-                self._onmessage, msg, ws, hdlr_str, hdlr_bytes, hdlr_json
+        if self._dispatch == "inline":
+            async for msg in ws:
+                self._onmessage(msg, ws, hdlr_str, hdlr_bytes, hdlr_json)
+        else:
+            async for msg in ws:
+                self._loop.call_soon(
+                    self._onmessage, msg, ws, hdlr_str, hdlr_bytes, hdlr_json
+                )
+
+    def _call_inline(self, hdlr: Callable[..., Any], *args: Any) -> None:
+        # Report a failing handler like a call_soon callback and keep calling the rest.
+        try:
+            hdlr(*args)
+        except Exception as e:
+            self._loop.call_exception_handler(
+                {"message": f"Exception in WebSocket handler {hdlr!r}", "exception": e}
             )
 
     def _onmessage(
@@ -253,20 +309,20 @@ class WebSocketApp:
         hdlr: WsStrHandler | WsJsonHandler | WsJsonHandler
         if msg.type == aiohttp.WSMsgType.TEXT:
             for hdlr in hdlr_str:
-                self._loop.call_soon(hdlr, msg.data, ws)
+                self._call_handler(hdlr, msg.data, ws)
         elif msg.type == aiohttp.WSMsgType.BINARY:
             for hdlr in hdlr_bytes:
-                self._loop.call_soon(hdlr, msg.data, ws)
+                self._call_handler(hdlr, msg.data, ws)
 
         if hdlr_json and msg.type in {aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY}:
             try:
-                data = msg.json()
-            except json.JSONDecodeError as e:
+                data = self._json_loads(msg.data)
+            except _json.DecodeError as e:
                 if msg.data not in {"ping", "pong"}:
-                    logger.warning(f"{pretty_modulename(e)}: {e} {e.doc}")
+                    logger.warning(f"{pretty_modulename(e)}: {e} {msg.data}")
             else:
                 for hdlr in hdlr_json:
-                    self._loop.call_soon(hdlr, data, ws)
+                    self._call_handler(hdlr, data, ws)
 
         if msg.type == aiohttp.WSMsgType.PING and self._autoping:
             self._loop.create_task(ws.pong(msg.data))
@@ -338,6 +394,260 @@ class WebSocketQueue(asyncio.Queue):
             yield await self.get()
 
 
+class WebSocketMultiplexer:
+    """WebSocket subscription multiplexer.
+
+    同じ URL の購読を 1 つの WebSocket 接続にまとめ、トピックごとに複数のハンドラへメッセージを振り分けます。
+    購読メッセージはトピックの最初の購読時、購読解除メッセージは最後の購読解除時にのみ送信されます。
+
+    Usage example: :ref:`websocket-multiplexer`
+    """
+
+    def __init__(self, client: Client, **kwargs: Any) -> None:
+        """
+        Args:
+            client: 接続に利用する :class:`.Client`
+            **kwargs: :meth:`.Client.ws_connect` にバイパスされる引数
+        """
+        self._client = client
+        self._kwargs = kwargs
+        self._connections: dict[tuple[str, Any], _MultiplexedConnection] = {}
+
+    def _connection(self, url: str, auth: Any) -> _MultiplexedConnection:
+        if (url, auth) not in self._connections:
+            protocol = _topic_protocol(url, "WebSocketMultiplexer")
+            self._connections[(url, auth)] = _MultiplexedConnection(
+                self._client, url, protocol, auth=auth, **self._kwargs
+            )
+        return self._connections[(url, auth)]
+
+    async def subscribe(
+        self,
+        url: str,
+        topic: Any,
+        handler: WsJsonHandler,
+        *,
+        auth: type[_Auth] | None = _Auth,
+    ) -> None:
+        """トピックを購読します。
+
+        Args:
+            url: WebSocket URL
+            topic: 購読するトピック (取引所の購読メッセージの形式)
+            handler: トピックのメッセージをハンドリングするコールバック (JSON)
+            auth: 認証オプション (デフォルトで有効、None で無効)
+
+        Raises:
+            ValueError: 対応していない URL の場合
+        """
+        await self._connection(url, auth).subscribe(topic, handler)
+
+    async def unsubscribe(
+        self,
+        url: str,
+        topic: Any,
+        handler: WsJsonHandler,
+        *,
+        auth: type[_Auth] | None = _Auth,
+    ) -> None:
+        """トピックの購読を解除します。
+
+        Args:
+            url: WebSocket URL
+            topic: 購読を解除するトピック
+            handler: :meth:`subscribe` で渡したコールバック
+            auth: 認証オプション
+
+        Raises:
+            ValueError: 購読していないトピックとハンドラの場合
+        """
+        connection = self._connections.get((url, auth))
+        if connection is None:
+            raise ValueError(f"Not subscribed: {url}")
+        await connection.unsubscribe(topic, handler)
+
+    async def close(self) -> None:
+        """全ての接続を閉じます。
+
+        全てのトピックとハンドラの購読は破棄されます。
+        """
+        connections = list(self._connections.values())
+        self._connections.clear()
+        await asyncio.gather(*(_close_app(c.app) for c in connections))
+
+
+def _topic_protocol(url: str, name: str) -> TopicProtocol:
+    host = URL(url).host
+    if host not in TopicHosts.items:
+        raise ValueError(f"{name} does not support {host}")
+    protocol = TopicHosts.items[host]
+    if not protocol.endpoint(URL(url)):
+        raise ValueError(f"{name} cannot route messages of {url}")
+    return protocol
+
+
+async def _close_app(app: WebSocketApp) -> None:
+    # WebSocketApp reconnects until the session is closed, so its task is cancelled.
+    # Leaving ws_connect() on cancellation closes the connection.
+    app._task.cancel()
+    await asyncio.wait([app._task])
+
+
+class _MultiplexedConnection:
+    def __init__(
+        self, client: Client, url: str, protocol: TopicProtocol, **kwargs: Any
+    ) -> None:
+        self.protocol = protocol
+        self.handlers: dict[Hashable, list[WsJsonHandler]] = {}
+        self.messages: dict[Hashable, Any] = {}
+        # WebSocketApp resends this list on every (re)connection, so it always
+        # holds the subscribe messages of the current topics.
+        self.send_json: list[Any] = []
+        self.app = client.ws_connect(
+            url, send_json=self.send_json, hdlr_json=self.onmessage, **kwargs
+        )
+
+    def _sent_ws(self) -> ClientWebSocketResponse | None:
+        # The current ws if send_json has already been sent on it
+        ws = self.app.current_ws
+        return ws if ws is not None and ws is self.app._sent_ws else None
+
+    def onmessage(self, msg: Any, ws: ClientWebSocketResponse) -> None:
+        key = self.protocol.route(msg)
+        if key is not None and key in self.handlers:
+            for handler in tuple(self.handlers[key]):
+                self.app._call_handler(handler, msg, ws)
+
+    async def subscribe(self, topic: Any, handler: WsJsonHandler) -> None:
+        key = self.protocol.key(topic)
+        handlers = self.handlers.setdefault(key, [])
+        handlers.append(handler)
+        if len(handlers) == 1:
+            message = self.protocol.subscribe([topic])
+            self.messages[key] = message
+            self.send_json.append(message)
+            ws = self._sent_ws()
+            if ws is not None:
+                await ws.send_json(message)
+        await self.app
+
+    async def unsubscribe(self, topic: Any, handler: WsJsonHandler) -> None:
+        key = self.protocol.key(topic)
+        if handler not in self.handlers.get(key, ()):
+            raise ValueError(f"Not subscribed: {topic}")
+        handlers = self.handlers[key]
+        handlers.remove(handler)
+        if not handlers:
+            del self.handlers[key]
+            self.send_json.remove(self.messages.pop(key))
+            ws = self._sent_ws()
+            if ws is not None:
+                await ws.send_json(self.protocol.unsubscribe([topic]))
+
+
+class ShardedWebSocketApp:
+    """WebSocket subscription sharding.
+
+    多数のトピックの購読を取引所の接続あたりの上限に従って複数の WebSocket 接続に分割します。
+    トピックは想定メッセージレートが均等になるように各接続に割り当てられます。
+    各接続は独立した :class:`WebSocketApp` であり、切断時は該当の接続のトピックのみが再購読されます。
+
+    Usage example: :ref:`sharded-websocket`
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        url: str,
+        topics: list[Any],
+        *,
+        hdlr_json: WsJsonHandler,
+        rate: Callable[[Any], float] | None = None,
+        shards: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            client: 接続に利用する :class:`.Client`
+            url: WebSocket URL
+            topics: 購読するトピックのリスト (取引所の購読メッセージの形式)
+            hdlr_json: 全ての接続のメッセージをハンドリングするコールバック (JSON)
+            rate: トピックの想定メッセージレートを返す関数 (デフォルトで全て 1.0)
+            shards: 最小の接続数 (デフォルトで接続あたりの上限から決定)
+            **kwargs: :meth:`.Client.ws_connect` にバイパスされる引数
+
+        Raises:
+            ValueError: 対応していない URL またはトピックが空の場合
+        """
+        protocol = _topic_protocol(url, "ShardedWebSocketApp")
+        if not topics:
+            raise ValueError("topics must not be empty")
+
+        self._topics = _shard(
+            topics, rate or (lambda topic: 1.0), shards or 1, protocol
+        )
+        self._apps = [
+            client.ws_connect(
+                url,
+                send_json=[
+                    protocol.subscribe(shard[i : i + protocol.max_args])
+                    for i in range(0, len(shard), protocol.max_args)
+                ],
+                hdlr_json=hdlr_json,
+                **kwargs,
+            )
+            for shard in self._topics
+        ]
+
+    @property
+    def apps(self) -> list[WebSocketApp]:
+        """接続ごとの :class:`WebSocketApp` のリスト"""
+        return self._apps
+
+    @property
+    def topics(self) -> list[list[Any]]:
+        """接続ごとに割り当てられたトピックのリスト"""
+        return self._topics
+
+    async def wait(self) -> None:
+        """全ての接続の待機を待ちます。"""
+        await asyncio.gather(*(app.wait() for app in self._apps))
+
+    async def close(self) -> None:
+        """全ての接続を閉じます。"""
+        await asyncio.gather(*(_close_app(app) for app in self._apps))
+
+    async def _wait_handshake(self) -> "ShardedWebSocketApp":
+        await asyncio.gather(*self._apps)
+        return self
+
+    def __await__(self) -> Generator[Any, None, "ShardedWebSocketApp"]:
+        return self._wait_handshake().__await__()
+
+
+def _shard(
+    topics: list[Any],
+    rate: Callable[[Any], float],
+    shards: int,
+    protocol: TopicProtocol,
+) -> list[list[Any]]:
+    # Greedily assign the busiest topics first to the least loaded shard that
+    # still has room, within the per-connection topic limit.
+    if protocol.max_topics is not None:
+        shards = max(shards, -(-len(topics) // protocol.max_topics))
+    shards = min(shards, len(topics))
+    capacity = protocol.max_topics or len(topics)
+
+    result: list[list[Any]] = [[] for _ in range(shards)]
+    heap = [(0.0, i) for i in range(shards)]
+    for topic in sorted(topics, key=rate, reverse=True):
+        load, i = heapq.heappop(heap)
+        result[i].append(topic)
+        if len(result[i]) < capacity:
+            heapq.heappush(heap, (load + rate(topic), i))
+    return result
+
+
 class Heartbeat:
     @staticmethod
     async def bybit(ws: ClientWebSocketResponse):
@@ -444,7 +754,7 @@ class Auth:
 
         await ws.send_json({"op": "auth", "args": [key, expires, signature]})
         async for msg in ws:
-            data = msg.json()
+            data = msg.json(loads=_loads(ws))
             if data.get("op") == "auth":
                 if not data.get("success"):
                     logger.warning(data)
@@ -477,7 +787,7 @@ class Auth:
             }
         )
         async for msg in ws:
-            data = msg.json()
+            data = msg.json(loads=_loads(ws))
             if data.get("id") == "auth":
                 if "error" in data:
                     logger.warning(data)
@@ -503,7 +813,7 @@ class Auth:
         }
         await ws.send_json(msg_to_send)
         async for msg in ws:
-            data = msg.json()
+            data = msg.json(loads=_loads(ws))
             if data.get("id") == 123:
                 if data.get("error"):
                     logger.warning(data)
@@ -540,8 +850,8 @@ class Auth:
         await ws.send_json(msg_to_send)
         async for msg in ws:
             try:
-                data = msg.json()
-            except json.JSONDecodeError:
+                data = msg.json(loads=_loads(ws))
+            except _json.DecodeError:
                 pass
             else:
                 event = data.get("event")
@@ -586,8 +896,8 @@ class Auth:
         await ws.send_json(msg_to_send)
         async for msg in ws:
             try:
-                data = msg.json()
-            except json.JSONDecodeError:
+                data = msg.json(loads=_loads(ws))
+            except _json.DecodeError:
                 pass
             else:
                 event = data.get("event")
@@ -647,8 +957,8 @@ class Auth:
             if msg.type != aiohttp.WSMsgType.BINARY:
                 continue
             try:
-                data = json.loads(zlib.decompress(msg.data, -zlib.MAX_WBITS))
-            except json.JSONDecodeError:
+                data = _loads(ws)(zlib.decompress(msg.data, -zlib.MAX_WBITS))
+            except _json.DecodeError:
                 pass
             else:
                 event = data.get("event")
@@ -705,7 +1015,7 @@ class Auth:
             if msg.type != aiohttp.WSMsgType.TEXT:
                 continue
 
-            data: dict[str, Any] = msg.json()
+            data: dict[str, Any] = msg.json(loads=_loads(ws))
             if data.get("ch") == "auth":
                 if data.get("code") == 200:
                     break
@@ -736,7 +1046,7 @@ class Auth:
         await ws.send_json(msg_to_send)
 
         async for msg in ws:
-            data: object = msg.json()
+            data: object = msg.json(loads=_loads(ws))
             if isinstance(data, dict) and "success" in data:
                 if not data["success"]:
                     logger.warning(data)
@@ -816,6 +1126,9 @@ class ClientWebSocketResponse(aiohttp.ClientWebSocketResponse):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
+        session = self._response._session
+        self._json_loads: JSONLoads = session.__dict__.get("_json_loads", _json.loads)
+        self._json_dumps: JSONDumps = session.__dict__.get("_json_dumps", _json.dumps)
         if self._response.url.host in HeartbeatHosts.items:
             self.__dict__["_pingtask"] = asyncio.create_task(
                 HeartbeatHosts.items[self._response.url.host](self)
@@ -829,12 +1142,21 @@ class ClientWebSocketResponse(aiohttp.ClientWebSocketResponse):
                     self.__dict__["_authtask"] = asyncio.create_task(
                         AuthHosts.items[self._response.url.host].func(self)
                     )
-        self._lock = asyncio.Lock()
 
     async def _wait_authtask(self):
         if "_authtask" in self.__dict__:
             await self.__dict__["_authtask"]
 
+    async def receive(self, *args, **kwargs):
+        """Receive a message from peer."""
+        replies = self.__dict__.get("_batch_replies")
+        if replies:
+            return replies.pop(0)
+        msg = await super().receive(*args, **kwargs)
+        if self.__dict__.get("_batch_acks") and msg.type == aiohttp.WSMsgType.TEXT:
+            MessageBatch._ack(self, msg)
+        return msg
+
     async def send_str(self, *args, **kwargs) -> None:
         """Send *data* to peer as :attr:`aiohttp.WSMsgType.TEXT` message."""
         if self._response.url.host not in RequestLimitHosts.items:
@@ -857,45 +1179,52 @@ class ClientWebSocketResponse(aiohttp.ClientWebSocketResponse):
             if data:
                 MessageSignHosts.items[self._response.url.host].func(self, data)
 
+        kwargs.setdefault("dumps", self._json_dumps)
+
+        if self._response.url.host in MessageBatchHosts.items and args:
+            return await MessageBatchHosts.items[self._response.url.host](
+                self, args[0], functools.partial(super().send_json, *args[1:], **kwargs)
+            )
+
         return await super().send_json(*args, **kwargs)
 
 
+class _RateLimiter:
+    # GCRA (generic cell rate algorithm) without burst: every message is scheduled
+    # ``interval`` seconds after the previous one on the local monotonic clock.
+    # Slots are reserved in the order of the calls, so senders are served FIFO.
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._tat = 0.0  # theoretical arrival time of the next message
+
+    @staticmethod
+    def get(ws: ClientWebSocketResponse, interval: float) -> _RateLimiter:
+        if "_ratelimiter" not in ws.__dict__:
+            ws.__dict__["_ratelimiter"] = _RateLimiter(interval)
+        return ws.__dict__["_ratelimiter"]
+
+    def delay(self) -> float:
+        return max(self._tat - time.monotonic(), 0.0)
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        self._tat = tat + self.interval
+        await asyncio.sleep(tat - now)
+
+
 class RequestLimit:
     @staticmethod
     async def gmocoin(ws: ClientWebSocketResponse, send_str: Awaitable[None]):
-        session = cast("aiohttp.ClientSession", ws._response._session)
-        async with ws._lock:
-            await send_str
-            r = await session.get("https://api.coin.z.com/public/v1/status", auth=_Auth)
-            data = await r.json()
-            before = datetime.datetime.fromisoformat(data["responsetime"][:-1])
-            while True:
-                await asyncio.sleep(1.0)
-                r = await session.get(
-                    "https://api.coin.z.com/public/v1/status", auth=_Auth
-                )
-                data = await r.json()
-                after = datetime.datetime.fromisoformat(data["responsetime"][:-1])
-                delta = after - before
-                if delta.total_seconds() >= 1.0:
-                    break
+        # limit of 1 subscribe request per second
+        await _RateLimiter.get(ws, 1.0).acquire()
+        await send_str
 
     @staticmethod
     async def binance(ws: ClientWebSocketResponse, send_str: Awaitable[None]) -> None:
-        session = cast("aiohttp.ClientSession", ws._response._session)
-        async with ws._lock:
-            await send_str
-            r = await session.get("https://api.binance.com/api/v3/time", auth=None)
-            data = await r.json()
-            before = datetime.datetime.fromtimestamp(data["serverTime"] / 1000)
-            while True:
-                await asyncio.sleep(0.25)  # limit of 5 incoming messages per second
-                r = await session.get("https://api.binance.com/api/v3/time", auth=None)
-                data = await r.json()
-                after = datetime.datetime.fromtimestamp(data["serverTime"] / 1000)
-                delta = after - before
-                if delta.total_seconds() > 0.25:
-                    break
+        # limit of 5 incoming messages per second, with a margin for network jitter
+        await _RateLimiter.get(ws, 0.25).acquire()
+        await send_str
 
 
 class RequestLimitHosts:
@@ -905,6 +1234,189 @@ class RequestLimitHosts:
     }
 
 
+class MessageBatch:
+    @staticmethod
+    async def binance(
+        ws: ClientWebSocketResponse,
+        data: Any,
+        send_json: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        if not (
+            isinstance(data, dict)
+            and data.get("method") in {"SUBSCRIBE", "UNSUBSCRIBE"}
+            and isinstance(data.get("params"), list)
+        ):
+            return await send_json(data)
+
+        # Requests sent while one is waiting for the rate limit are merged into it,
+        # up to _BINANCE_MAX_ARGS params per request. The merged request is sent
+        # with the id of the first request that has one, and its reply is repeated
+        # by receive() with the ids of the others.
+        batches: dict[str, tuple[dict[str, Any], asyncio.Task[None]]]
+        batches = ws.__dict__.setdefault("_batches", {})
+        method = data["method"]
+        if (
+            method in batches
+            and len(batches[method][0]["params"]) + len(data["params"])
+            <= _BINANCE_MAX_ARGS
+        ):
+            batch, task = batches[method]
+            batch["params"].extend(data["params"])
+            if "id" in data and "id" not in batch:
+                batch["id"] = data["id"]
+            elif "id" in data:
+                acks: dict[Any, list[Any]]
+                acks = ws.__dict__.setdefault("_batch_acks", {})
+                acks.setdefault(batch["id"], []).append(data["id"])
+        else:
+            # A full batch still waiting is sent first.
+            previous = batches[method][1] if method in batches else None
+            batch = {**data, "params": [*data["params"]]}
+            task = asyncio.create_task(
+                MessageBatch._flush(ws, batches, batch, send_json, previous)
+            )
+            batches[method] = (batch, task)
+        await asyncio.shield(task)
+
+    @staticmethod
+    async def _flush(
+        ws: ClientWebSocketResponse,
+        batches: dict[str, tuple[dict[str, Any], asyncio.Task[None]]],
+        batch: dict[str, Any],
+        send_json: Callable[[Any], Awaitable[None]],
+        previous: asyncio.Task[None] | None = None,
+    ) -> None:
+        limiter: _RateLimiter | None = ws.__dict__.get("_ratelimiter")
+        await asyncio.sleep(limiter.delay() if limiter else 0.0)
+        if previous is not None:
+            await asyncio.wait([previous])
+        method = batch["method"]
+        if method in batches and batches[method][0] is batch:
+            del batches[method]
+        await send_json(batch)
+
+    @staticmethod
+    def _ack(ws: ClientWebSocketResponse, msg: aiohttp.WSMessage) -> None:
+        acks: dict[Any, list[Any]] = ws.__dict__["_batch_acks"]
+        try:
+            data = _loads(ws)(msg.data)
+        except _json.DecodeError:
+            return
+        try:
+            ids = acks.pop(data["id"])
+        except (TypeError, KeyError):
+            return
+        replies: list[aiohttp.WSMessage]
+        replies = ws.__dict__.setdefault("_batch_replies", [])
+        for _id in ids:
+            replies.append(
+                aiohttp.WSMessage(
+                    aiohttp.WSMsgType.TEXT, ws._json_dumps({**data, "id": _id}), None
+                )
+            )
+
+
+class MessageBatchHosts:
+    # NOTE: yarl.URL.host is also allowed to be None. So, for brevity, relax the type check on the `items` key.
+    items: dict[str | None, WsMessageBatchHandler] = {
+        "stream.binance.com": MessageBatch.binance,
+    }
+
+
+@dataclass
+class TopicProtocol:
+    # Build a subscribe/unsubscribe message for a list of topics
+    subscribe: Callable[[list[Any]], Any]
+    unsubscribe: Callable[[list[Any]], Any]
+    # Returns the topic key of a received message, None for other messages
+    route: Callable[[Any], Hashable | None]
+    key: Callable[[Any], Hashable] = lambda topic: topic
+    # Topics per connection (None for no limit) and per subscribe message
+    max_topics: int | None = None
+    max_args: int = 1
+    # Whether messages of the URL can be routed by topic
+    endpoint: Callable[[URL], bool] = lambda url: True
+
+
+class Topic:
+    @staticmethod
+    def bybit() -> TopicProtocol:
+        # "orderbook.50.BTCUSDT", Spot accepts up to 10 args per request
+        return TopicProtocol(
+            subscribe=lambda topics: {"op": "subscribe", "args": topics},
+            unsubscribe=lambda topics: {"op": "unsubscribe", "args": topics},
+            route=lambda msg: msg.get("topic") if isinstance(msg, dict) else None,
+            max_args=10,
+        )
+
+    @staticmethod
+    def binance(max_topics: int) -> TopicProtocol:
+        # "btcusdt@depth@100ms", requires the combined stream endpoint "/stream"
+        ids = itertools.count(1)
+        return TopicProtocol(
+            subscribe=lambda topics: {
+                "method": "SUBSCRIBE",
+                "params": topics,
+                "id": next(ids),
+            },
+            unsubscribe=lambda topics: {
+                "method": "UNSUBSCRIBE",
+                "params": topics,
+                "id": next(ids),
+            },
+            route=lambda msg: msg.get("stream") if isinstance(msg, dict) else None,
+            max_topics=max_topics,
+            max_args=_BINANCE_MAX_ARGS,
+            endpoint=lambda url: url.path.rstrip("/").endswith("/stream"),
+        )
+
+    @staticmethod
+    def _arg_key(arg: dict[str, Any]) -> Hashable:
+        # Private channels push "uid" in addition to the subscribed arguments
+        return tuple(sorted((k, v) for k, v in arg.items() if k != "uid"))
+
+    @staticmethod
+    def _arg_route(msg: Any) -> Hashable | None:
+        if isinstance(msg, dict) and "event" not in msg and "arg" in msg:
+            return Topic._arg_key(msg["arg"])
+        return None
+
+    @staticmethod
+    def okx(max_topics: int | None, max_args: int) -> TopicProtocol:
+        # {"channel": "books", "instId": "BTC-USDT"}
+        # Bitget: {"instType": "SPOT", "channel": "books", "instId": "BTCUSDT"}
+        return TopicProtocol(
+            subscribe=lambda topics: {"op": "subscribe", "args": topics},
+            unsubscribe=lambda topics: {"op": "unsubscribe", "args": topics},
+            route=Topic._arg_route,
+            key=Topic._arg_key,
+            max_topics=max_topics,
+            max_args=max_args,
+        )
+
+
+class TopicHosts:
+    # NOTE: yarl.URL.host is also allowed to be None. So, for brevity, relax the type check on the `items` key.
+    # Binance: 1024 streams per connection on Spot and 200 on Futures.
+    # OKX: 64 KB of args per request. Bitget: 1000 channels per connection and
+    # 4096 bytes of args per request.
+    items: dict[str | None, TopicProtocol] = {
+        "stream.bybit.com": Topic.bybit(),
+        "stream.bytick.com": Topic.bybit(),
+        "stream-demo.bybit.com": Topic.bybit(),
+        "stream-testnet.bybit.com": Topic.bybit(),
+        "stream.binance.com": Topic.binance(1024),
+        "fstream.binance.com": Topic.binance(200),
+        "dstream.binance.com": Topic.binance(200),
+        "stream.binancefuture.com": Topic.binance(200),
+        "dstream.binancefuture.com": Topic.binance(200),
+        "ws.okx.com": Topic.okx(None, 100),
+        "wsaws.okx.com": Topic.okx(None, 100),
+        "wspap.okx.com": Topic.okx(None, 100),
+        "ws.bitget.com": Topic.okx(1000, 50),
+    }
+
+
 class MessageSign:
     @staticmethod
     def binance(ws: ClientWebSocketResponse, data: dict[str, Any]):
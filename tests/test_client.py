@@ -43,6 +43,17 @@ async def test_client():
     assert client._session.headers["User-Agent"].split("/")[1] == pybotters.__version__
 
 
+@pytest.mark.asyncio
+async def test_client_json():
+    async with pybotters.Client() as client:
+        assert client._session.__dict__["_json_loads"] is pybotters._json.loads
+        assert client._session.__dict__["_json_dumps"] is pybotters._json.dumps
+
+    async with pybotters.Client(json_loads=json.loads, json_dumps=json.dumps) as client:
+        assert client._session.__dict__["_json_loads"] is json.loads
+        assert client._session.__dict__["_json_dumps"] is json.dumps
+
+
 @pytest.mark.asyncio
 async def test_client_warn(mocker: pytest_mock.MockerFixture):
     apis = {"name1", "key1", "secret1"}
@@ -270,6 +281,7 @@ async def test_client_fetch(mocker: pytest_mock.MockerFixture):
     assert r.text == m_resp.text.return_value
     assert r.data == m_resp.json.return_value
     assert m_req.called
+    assert m_resp.json.call_args.kwargs["loads"] is pybotters._json.loads
 
 
 @pytest.mark.asyncio
@@ -314,6 +326,8 @@ async def test_client_ws_connect(mocker: pytest_mock.MockerFixture):
             autoping=True,
             heartbeat=42.0,
             auth=None,
+            json_loads=json.loads,
+            json_dumps=json.dumps,
         )
     assert m.called
     assert m.call_args == [
@@ -329,6 +343,9 @@ async def test_client_ws_connect(mocker: pytest_mock.MockerFixture):
             "autoping": True,
             "heartbeat": 42.0,
             "auth": None,
+            "json_loads": json.loads,
+            "json_dumps": json.dumps,
+            "dispatch": "call_soon",
         },
     ]
     assert ret == m.return_value
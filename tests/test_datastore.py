@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, NamedTuple
 
@@ -544,6 +545,61 @@ def test_bitbank_private_basic_stores(
     assert s.get(query) == expected
 
 
+def test_bitflyer_positions_snapshot() -> None:
+    """Executions do not change rows of a live snapshot."""
+    store = pybotters.bitFlyerDataStore()
+    store.collateral._onresponse({"collateral": 100000.0, "open_position_pnl": 0.0})
+    store.positions._onresponse(
+        [
+            {
+                "product_code": "FX_BTC_JPY",
+                "side": "BUY",
+                "price": 5000000.0,
+                "size": 0.3,
+                "commission": 0.0,
+                "sfd": 0.0,
+            }
+        ]
+    )
+    positions = store.positions.snapshot()
+    collateral = store.collateral.snapshot()
+
+    store.positions._onmessage(
+        [
+            {
+                "product_code": "FX_BTC_JPY",
+                "event_type": "EXECUTION",
+                "side": "SELL",
+                "price": 5100000.0,
+                "size": 0.1,
+                "commission": 0.0,
+                "sfd": 0.0,
+            }
+        ],
+        store.collateral,
+    )
+    store.collateral._onresponse({"collateral": 110000.0, "open_position_pnl": 1.0})
+
+    assert [x["size"] for x in positions] == [0.3]
+    assert [x["size"] for x in store.positions] == [0.2]
+    assert collateral.find() == [{"collateral": 100000.0, "open_position_pnl": 0.0}]
+    assert store.collateral.find() == [
+        {"collateral": 110000.0, "open_position_pnl": 1.0}
+    ]
+
+
+def test_bitbank_margin_payable_snapshot() -> None:
+    """MarginPayable updates do not change rows of a live snapshot."""
+    store = pybotters.bitbankPrivateDataStore().margin_payable
+    store._insert([{"amount": "1"}])
+    snapshot = store.snapshot()
+
+    store._onmessage([{"amount": "2"}])
+
+    assert snapshot.find() == [{"amount": "1"}]
+    assert store.find() == [{"amount": "2"}]
+
+
 def test_bitbank_private_order() -> None:
     """Tests for bitbankPrivateDataStore spot_order only."""
     store = pybotters.bitbankPrivateDataStore()
@@ -2020,6 +2076,43 @@ async def test_binance_orderbook_reinitialize_replays_post_init_messages(
     }
 
 
+@pytest.mark.asyncio
+async def test_binance_orderbook_initialize_block_producer_error(
+    server_binance_orderbook: str,
+) -> None:
+    store = pybotters.BinanceSpotDataStore()
+    symbol = "BTCUSDT"
+
+    with store.orderbook.watch(maxsize=1, overflow="block_producer_error") as stream:
+        async with pybotters.Client(base_url=server_binance_orderbook) as client:
+            await store.initialize(
+                client.request("GET", "/api/v3/depth", params={"symbol": symbol})
+            )
+
+        assert len(store.orderbook) == 5
+        assert store.orderbook.initialized[symbol]
+        assert store.orderbook._last_update_id == {symbol: 102}
+
+        with pytest.raises(asyncio.QueueFull):
+            store.onmessage(
+                {
+                    "e": "depthUpdate",
+                    "s": symbol,
+                    "U": 103,
+                    "u": 103,
+                    "a": [["100.0", "0.0"]],
+                    "b": [],
+                }
+            )
+        assert len(store.orderbook) == 4
+        assert store.orderbook._last_update_id == {symbol: 103}
+        assert stream._queue.qsize() == 1
+
+        store.onmessage(
+            {"e": "depthUpdate", "s": symbol, "U": 104, "u": 104, "a": [], "b": []}
+        )
+
+
 @pytest.mark.asyncio
 async def test_coincheck_orderbook_initialize_replays_buffered_messages(
     server_coincheck: str,
@@ -2796,6 +2889,33 @@ def test_bitbank_depth_sequence_replay() -> None:
     }, "Scenario 2 failed: second snapshot re-init with replay of s>10 diffs only"
 
 
+def test_bitbank_json_loads() -> None:
+    """Test that bitbankDataStore decodes messages with the json_loads of the ws."""
+    store = pybotters.bitbankDataStore()
+    decoded = [
+        "message",
+        {
+            "room_name": "ticker_btc_jpy",
+            "message": {"data": {"last": "100", "timestamp": 1}},
+        },
+    ]
+    calls: list[str] = []
+
+    def loads(data: str) -> Any:
+        calls.append(data)
+        return decoded
+
+    class WebSocket:
+        pass
+
+    ws: Any = WebSocket()
+    ws._json_loads = loads
+    store.onmessage('42["message"]', ws)
+
+    assert calls == ['["message"]']
+    assert store.ticker.find() == [{"pair": "btc_jpy", "last": "100", "timestamp": 1}]
+
+
 def test_kucoin_orders_update() -> None:
     """Test that KuCoin Orders store applies 'update' messages correctly.
 
@@ -2877,3 +2997,23 @@ def test_kucoin_orders_update() -> None:
     )
     assert updated_order["canceledSize"] == "0.00001"
     assert updated_order["remainSize"] == "0.00001"
+
+
+def test_okx_candle_columns() -> None:
+    """Test that only OKX candle channels with volume have a volume column."""
+    store = pybotters.OKXDataStore()
+    for channel in ("candle1m", "mark-price-candle1m"):
+        store.onmessage(
+            {
+                "arg": {"channel": channel, "instId": "BTC-USDT"},
+                "data": [["1597026383085", "8533", "8553", "8527", "8548", "45", "1"]],
+            }
+        )
+
+    columns = store.candle.columns()
+    assert columns.keys() == {"timestamp", "open", "high", "low", "close", "volume"}
+    assert list(columns["volume"]) == [45.0]
+
+    columns = store.markpricecandle.columns()
+    assert columns.keys() == {"timestamp", "open", "high", "low", "close"}
+    assert list(columns["close"]) == [8548.0]
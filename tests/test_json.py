@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import sys
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+import pybotters._json
+
+if TYPE_CHECKING:
+    import pytest_mock
+
+
+class FakeDecodeError(Exception): ...
+
+
+def fake_orjson() -> SimpleNamespace:
+    return SimpleNamespace(
+        loads=json.loads,
+        dumps=lambda obj, option: json.dumps(obj).encode(),
+        OPT_NON_STR_KEYS=1,
+    )
+
+
+def fake_msgspec() -> SimpleNamespace:
+    class Encoder:
+        def encode(self, obj):
+            return json.dumps(obj).encode()
+
+    class Decoder:
+        def decode(self, data):
+            return json.loads(data)
+
+    return SimpleNamespace(
+        json=SimpleNamespace(Encoder=Encoder, Decoder=Decoder),
+        DecodeError=FakeDecodeError,
+    )
+
+
+def test_json_orjson(mocker: pytest_mock.MockerFixture):
+    orjson = fake_orjson()
+    mocker.patch.dict(sys.modules, {"orjson": orjson, "msgspec": fake_msgspec()})
+
+    loads, dumps = pybotters._json._detect()
+
+    assert loads is orjson.loads
+    assert dumps({"foo": "bar"}) == '{"foo": "bar"}'
+
+
+def test_json_msgspec(mocker: pytest_mock.MockerFixture):
+    mocker.patch.dict(sys.modules, {"orjson": None, "msgspec": fake_msgspec()})
+
+    loads, dumps = pybotters._json._detect()
+
+    assert loads('{"foo":"bar"}') == {"foo": "bar"}
+    assert dumps({"foo": "bar"}) == '{"foo": "bar"}'
+    assert pybotters._json._decode_errors() == (ValueError, FakeDecodeError)
+
+
+def test_json_stdlib(mocker: pytest_mock.MockerFixture):
+    mocker.patch.dict(sys.modules, {"orjson": None, "msgspec": None})
+
+    assert pybotters._json._detect() == (json.loads, json.dumps)
+    assert pybotters._json._decode_errors() == (ValueError,)
+
+
+BACKENDS = {
+    "json": lambda: (json.loads, json.dumps),
+    "orjson": pybotters._json._orjson,
+    "msgspec": pybotters._json._msgspec,
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_backend(backend: str):
+    # Runs the real modules if installed, the same assertions hold for json
+    pytest.importorskip(backend)
+    loads, dumps = BACKENDS[backend]()
+
+    data = {"foo": [1, 1.5, "bar", None, True], "baz": {"qux": -1}}
+    assert loads(json.dumps(data)) == data
+    assert loads(json.dumps(data).encode()) == data
+    assert isinstance(dumps(data), str)
+    assert json.loads(dumps(data)) == data
+    assert json.loads(dumps({1: "int", 2.5: "float"})) == json.loads(
+        json.dumps({1: "int", 2.5: "float"})
+    )
+
+    errors = pybotters._json._decode_errors()
+    for invalid in ("", "{", "not json", b"\xff"):
+        with pytest.raises(errors):
+            loads(invalid)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+from unittest.mock import call
+
+import pytest
+
+import pybotters
+import pybotters.sharedbook
+import pybotters.store
+
+if TYPE_CHECKING:
+    import pytest_mock
+
+    from pybotters.typedefs import Item
+
+
+class OrderBookForTest(pybotters.store.SortedBookStore):
+    _KEYS = ["symbol", "side", "price"]
+    _BOOK_KEYS = ["symbol"]
+    _SIDE_KEY = "side"
+    _ASC_SIDE = "asks"
+    _DESC_SIDE = "bids"
+    _PRICE_KEY = "price"
+    _SIZE_KEY = "size"
+
+
+class TradeForTest(pybotters.store.RingStore):
+    _MAXLEN = 10
+    _COLUMNS = {
+        "timestamp": ("time", "q", int),
+        "price": ("price", "d", float),
+        "size": ("size", "d", float),
+    }
+
+
+def _book(symbol: str, levels: int, size: str = "1") -> list[Item]:
+    return [
+        {"symbol": symbol, "side": side, "price": str(price), "size": size}
+        for i in range(levels)
+        for side, price in (("asks", 101 + i), ("bids", 100 - i))
+    ]
+
+
+def test_sharedbook_publish_and_read():
+    book = OrderBookForTest(
+        data=[*_book("BTC", 5), *_book("ETH", 5)]
+        + [{"symbol": "BTC", "side": "asks", "price": "200", "size": None}]
+    )
+    trades = TradeForTest(
+        data=[
+            {"symbol": "BTC" if i % 2 else "ETH", "time": i, "price": i, "size": 0.1}
+            for i in range(10)
+        ]
+    )
+
+    with pybotters.SharedBookPublisher(
+        book,
+        {"symbol": "BTC"},
+        depth=6,
+        trades=trades,
+        trades_query={"symbol": "BTC"},
+        trades_limit=3,
+    ) as publisher:
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            assert publisher.version == 0
+            assert reader.version == 0
+            empty = reader.read()
+            assert empty.version == 0
+            assert empty.asks == [] and empty.bids == [] and empty.trades == []
+
+            assert publisher.publish() == 2
+            assert reader.version == 2
+            shared = reader.read()
+            assert isinstance(shared, pybotters.SharedBook)
+            assert shared.version == 2
+            assert shared.published_at > 0.0
+            assert shared.asks[:5] == [(101.0 + i, 1.0) for i in range(5)]
+            assert shared.asks[5][0] == 200.0 and math.isnan(shared.asks[5][1])
+            assert shared.bids == [(100.0 - i, 1.0) for i in range(5)]
+            assert [t[:3] for t in shared.trades] == [
+                (5.0, 5.0, 0.1),
+                (7.0, 7.0, 0.1),
+                (9.0, 9.0, 0.1),
+            ]
+            # "side" is not in TradeForTest._COLUMNS
+            assert all(math.isnan(t[3]) for t in shared.trades)
+
+            book._delete(book.find({"symbol": "BTC", "side": "asks"}))
+            assert publisher.publish() == 4
+            shared = reader.read(timeout=None)
+            assert shared.version == 4
+            assert shared.asks == []
+            assert len(shared.bids) == 5
+
+
+def test_sharedbook_without_trades():
+    book = OrderBookForTest(data=_book("BTC", 3))
+    with pybotters.SharedBookPublisher(book, depth=1) as publisher:
+        publisher.publish()
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            shared = reader.read()
+    assert shared.asks == [(101.0, 1.0)]
+    assert shared.bids == [(100.0, 1.0)]
+    assert shared.trades == []
+
+
+def test_sharedbook_invalid(mocker: pytest_mock.MockerFixture):
+    book = OrderBookForTest()
+    with pytest.raises(ValueError):
+        pybotters.SharedBookPublisher(book, depth=0)
+    with pytest.raises(ValueError):
+        pybotters.SharedBookPublisher(book, trades=pybotters.store.RingStore())
+
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    # Owned by this process like a segment of a SharedBookPublisher.
+    mocker.patch.object(pybotters.sharedbook, "_published", {shm.name})
+    try:
+        with pytest.raises(ValueError):
+            pybotters.SharedBookReader(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_sharedbook_reader_untracked(mocker: pytest_mock.MockerFixture):
+    book = OrderBookForTest(data=_book("BTC", 3))
+    with pybotters.SharedBookPublisher(book, depth=1) as publisher:
+        publisher.publish()
+        # A segment of another process is unregistered from the resource tracker
+        # of the reader, so that the reader does not unlink it on exit.
+        mocker.patch.object(pybotters.sharedbook, "_published", set())
+        m_unregister = mocker.patch.object(
+            pybotters.sharedbook.resource_tracker, "unregister"
+        )
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            assert reader.read().asks == [(101.0, 1.0)]
+        mocker.stopall()
+        assert m_unregister.call_args == call(f"/{publisher.name}", "shared_memory")
+
+
+def test_sharedbook_reader_readonly(mocker: pytest_mock.MockerFixture):
+    book = OrderBookForTest(data=_book("BTC", 3))
+    with pybotters.SharedBookPublisher(book, depth=1) as publisher:
+        publisher.publish()
+        mocker.patch.object(
+            pybotters.sharedbook, "_open_untracked", side_effect=PermissionError
+        )
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            assert reader.read().bids == [(100.0, 1.0)]
+
+
+def test_sharedbook_read_timeout():
+    with pybotters.SharedBookPublisher(OrderBookForTest()) as publisher:
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            # A publisher that stopped in the middle of a write.
+            publisher._shm.buf[8] = 1
+            assert reader.version == 1
+            with pytest.raises(TimeoutError):
+                reader.read(timeout=0.01)
+
+
+def test_sharedbook_concurrent_reader():
+    book = OrderBookForTest(data=_book("BTC", 20))
+    with pybotters.SharedBookPublisher(book) as publisher:
+        publisher.publish()
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            stop = threading.Event()
+            sizes: list[set[float]] = []
+
+            def read() -> None:
+                while not stop.is_set():
+                    shared = reader.read()
+                    sizes.append({size for _, size in (*shared.asks, *shared.bids)})
+
+            thread = threading.Thread(target=read)
+            thread.start()
+            try:
+                for i in range(300):
+                    book._update(_book("BTC", 20, str(i)))
+                    publisher.publish()
+            finally:
+                stop.set()
+                thread.join()
+    assert sizes
+    assert all(len(levels) == 1 for levels in sizes)
+
+
+def _read_in_process(name: str, queue: multiprocessing.Queue) -> None:  # no cov
+    # Runs in a spawned child process that coverage does not measure.
+    with pybotters.SharedBookReader(name) as reader:
+        shared = reader.read()
+    queue.put((shared.version, shared.asks, shared.bids))
+
+
+def test_sharedbook_multiprocess():
+    book = OrderBookForTest(data=_book("BTC", 3))
+    with pybotters.SharedBookPublisher(book) as publisher:
+        publisher.publish()
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        process = ctx.Process(target=_read_in_process, args=(publisher.name, queue))
+        process.start()
+        result = queue.get(timeout=30)
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert result == (
+            2,
+            [(101.0, 1.0), (102.0, 1.0), (103.0, 1.0)],
+            [(100.0, 1.0), (99.0, 1.0), (98.0, 1.0)],
+        )
+        # The reader process must not unlink the segment on exit.
+        with pybotters.SharedBookReader(publisher.name) as reader:
+            assert reader.read().version == 2
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import uuid
-from typing import TYPE_CHECKING
+import concurrent.futures
+import datetime
+import decimal
+import math
+import sys
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 import pytest
@@ -12,6 +16,7 @@ from aiohttp import web
 import pybotters.store
 
 if TYPE_CHECKING:
+    import pytest_mock
     from aiohttp.test_utils import TestClient
     from pytest_aiohttp.plugin import AiohttpClient  # type: ignore
 
@@ -31,6 +36,12 @@ def test_dsm_construct():
     )
 
 
+def test_dsm_create_with_indexes():
+    dsm = pybotters.store.DataStoreCollection()
+    dsm._create("example", keys=["id"], indexes=[["symbol"]])
+    assert set(dsm._get("example", pybotters.store.DataStore)._indexes) == {("symbol",)}
+
+
 def test_dsm_subcls_construct():
     called = False
 
@@ -108,6 +119,58 @@ async def test_dsc_wait() -> None:
     await asyncio.wait_for(wait_task, timeout=5.0)
 
 
+@pytest.mark.asyncio
+async def test_dsc_batch() -> None:
+    class DSC(pybotters.store.DataStoreCollection):
+        def _init(self) -> None:
+            self._create("orders", keys=["id"])
+            self._create("positions", keys=["symbol"])
+
+        def _onmessage(
+            self, msg: Any, ws: ClientWebSocketResponse | None = None
+        ) -> None:
+            orders, positions = self["orders"], self["positions"]
+            assert orders is not None and positions is not None
+            orders._delete([{"id": msg["id"]}])
+            positions._update([{"symbol": "BTC", "size": msg["size"]}])
+            assert positions._pending
+            orders._insert([{"id": msg["id"] + 1}])
+            orders._update([{"id": msg["id"] + 1, "price": 100}])
+
+    dsc = DSC()
+    orders, positions = dsc["orders"], dsc["positions"]
+    assert orders is not None and positions is not None
+    orders._insert([{"id": 1}])
+
+    with (
+        orders.watch(batch=True) as batches,
+        orders.watch() as stream,
+        positions.watch(maxsize=1, overflow="block_producer_error") as blocked,
+    ):
+        wait_task = asyncio.create_task(orders.wait())
+        await asyncio.sleep(0)
+
+        dsc.onmessage({"id": 1, "size": 1})
+        await asyncio.wait_for(wait_task, timeout=5.0)
+        assert [x.operation for x in batches._queue.get_nowait()] == [
+            "delete",
+            "insert",
+            "update",
+        ]
+        assert batches._queue.empty()
+        assert stream._queue.qsize() == 3
+        assert blocked._queue.qsize() == 1
+        assert not orders._deferred and not orders._pending
+
+        dsc_wait_task = asyncio.create_task(dsc.wait())
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.QueueFull):
+            dsc.onmessage({"id": 2, "size": 2})
+        assert blocked.dropped == 1
+        await asyncio.wait_for(dsc_wait_task, timeout=5.0)
+        assert orders.get({"id": 3}) == {"id": 3, "price": 100}
+
+
 def test_ds_construct():
     ds1 = pybotters.store.DataStore()
     assert len(ds1._data) == 0
@@ -156,9 +219,14 @@ def test_ds_subcls_construct():
     assert called
 
 
-def test_ds_hash():
-    hashed = pybotters.store.DataStore._hash({"foo": "bar"})
-    assert isinstance(hashed, int)
+def test_ds_key():
+    ds1 = pybotters.store.DataStore(keys=["foo"])
+    assert ds1._key({"foo": "bar", "baz": 1}) == ("bar",)
+
+    ds2 = pybotters.store.DataStore(keys=["foo", "baz"])
+    assert ds2._key({"foo": "bar", "baz": 1}) == ("bar", 1)
+    with pytest.raises(KeyError):
+        ds2._key({"foo": "bar"})
 
 
 def test_ds_sweep_with_key():
@@ -186,16 +254,16 @@ def test_ds_insert():
     ds1._insert(data)
     assert len(ds1._data) == 1000
     assert len(ds1._index) == 1000
-    assert isinstance(next(iter(ds1._data.keys())), uuid.UUID)
+    assert isinstance(next(iter(ds1._data.keys())), int)
     assert isinstance(next(iter(ds1._data.values())), dict)
-    assert isinstance(next(iter(ds1._index.keys())), int)
-    assert isinstance(next(iter(ds1._index.values())), uuid.UUID)
+    assert isinstance(next(iter(ds1._index.keys())), tuple)
+    assert isinstance(next(iter(ds1._index.values())), int)
 
     ds2 = pybotters.store.DataStore()
     ds2._insert(data)
     assert len(ds2._data) == 1000
     assert len(ds2._index) == 0
-    assert isinstance(next(iter(ds2._data.keys())), uuid.UUID)
+    assert isinstance(next(iter(ds2._data.keys())), int)
     assert isinstance(next(iter(ds2._data.values())), dict)
 
     ds3 = pybotters.store.DataStore(keys=["invalid"])
@@ -221,16 +289,16 @@ def test_ds_update():
     ds2._update(newdata)
     assert len(ds2._data) == 2000
     assert len(ds2._index) == 2000
-    assert isinstance(list(ds2._data.keys())[-1], uuid.UUID)
+    assert isinstance(list(ds2._data.keys())[-1], int)
     assert isinstance(list(ds2._data.values())[-1], dict)
-    assert isinstance(list(ds2._index.keys())[-1], int)
-    assert isinstance(list(ds2._index.values())[-1], uuid.UUID)
+    assert isinstance(list(ds2._index.keys())[-1], tuple)
+    assert isinstance(list(ds2._index.values())[-1], int)
 
     ds3 = pybotters.store.DataStore()
     ds3._update(data)
     assert len(ds3._data) == 1000
     assert len(ds3._index) == 0
-    assert isinstance(next(iter(ds3._data.keys())), uuid.UUID)
+    assert isinstance(next(iter(ds3._data.keys())), int)
     assert isinstance(next(iter(ds3._data.values())), dict)
 
     ds4 = pybotters.store.DataStore(keys=["invalid"])
@@ -366,15 +434,129 @@ def test_ds_find_with_uuid():
 
     result = ds._find_with_uuid()
     assert len(result.keys()) == 2
-    assert all(isinstance(x, uuid.UUID) for x in result.keys())
+    assert all(isinstance(x, int) for x in result.keys())
     assert list(result.values()) == [{"id": 1}, {"id": 2}]
 
     result = ds._find_with_uuid({"id": 1})
     assert len(result.keys()) == 1
-    assert all(isinstance(x, uuid.UUID) for x in result.keys())
+    assert all(isinstance(x, int) for x in result.keys())
     assert list(result.values()) == [{"id": 1}]
 
 
+def test_ds_indexes():
+    data = [{"id": i, "symbol": f"SYM{i % 4}", "side": i % 2} for i in range(100)]
+
+    ds = pybotters.store.DataStore(keys=["id"], data=data, indexes=[["symbol"]])
+    assert set(ds._indexes) == {("symbol",)}
+    assert len(ds._indexes[("symbol",)]) == 4
+    assert len(ds._indexes[("symbol",)][("SYM1",)]) == 25
+
+    assert ds.find({"symbol": "SYM1"}) == [x for x in data if x["symbol"] == "SYM1"]
+    assert ds.find({"symbol": "SYM1", "side": 1}) == [
+        x for x in data if x["symbol"] == "SYM1" and x["side"] == 1
+    ]
+    assert ds.find({"symbol": "SYM9"}) == []
+    assert len(ds._find_with_uuid({"symbol": "SYM2"})) == 25
+
+    ds._update([{"id": 1, "symbol": "SYM2"}])
+    assert len(ds._indexes[("symbol",)][("SYM1",)]) == 24
+    assert len(ds._indexes[("symbol",)][("SYM2",)]) == 26
+    assert {"id": 1, "symbol": "SYM2", "side": 1} in ds.find({"symbol": "SYM2"})
+
+    ds._update([{"id": 2, "side": 1}, {"id": 3, "symbol": "SYM3"}])
+    assert len(ds._indexes[("symbol",)][("SYM2",)]) == 26
+    assert len(ds._indexes[("symbol",)][("SYM3",)]) == 25
+
+    ds._insert([{"id": 5, "symbol": "SYM0", "side": 1}])
+    assert len(ds._indexes[("symbol",)][("SYM1",)]) == 23
+    assert len(ds._indexes[("symbol",)][("SYM0",)]) == 26
+
+    ds._delete(ds.find({"symbol": "SYM0"}))
+    assert ("SYM0",) not in ds._indexes[("symbol",)]
+
+    ds._remove(list(ds._find_with_uuid({"symbol": "SYM3"})))
+    assert ("SYM3",) not in ds._indexes[("symbol",)]
+
+    ds._pop({"id": 1})
+    assert len(ds._indexes[("symbol",)][("SYM2",)]) == 25
+
+    ds._MAXLEN = 10
+    ds._sweep_with_key()
+    assert sum(len(x) for x in ds._indexes[("symbol",)].values()) == 10
+
+    ds._clear()
+    assert ds._indexes[("symbol",)] == {}
+
+
+def test_ds_indexes_without_key():
+    data = [{"symbol": f"SYM{i % 4}", "price": str(i)} for i in range(100)]
+
+    ds = pybotters.store.DataStore(data=data, indexes=[["symbol", "price"]])
+    assert len(ds._indexes[("symbol", "price")]) == 100
+    assert ds.find({"symbol": "SYM1", "price": "1"}) == [
+        {"symbol": "SYM1", "price": "1"}
+    ]
+
+    ds._update([{"symbol": "SYM1", "price": "1"}])
+    assert len(ds.find({"symbol": "SYM1", "price": "1"})) == 2
+
+    ds._remove(list(ds._find_with_uuid({"symbol": "SYM1", "price": "1"})))
+    assert ds.find({"symbol": "SYM1", "price": "1"}) == []
+
+    ds._MAXLEN = 10
+    ds._sweep_without_key()
+    assert sum(len(x) for x in ds._indexes[("symbol", "price")].values()) == 10
+
+
+def test_ds_indexes_unhashable():
+    class DataStoreWithIndexes(pybotters.store.DataStore):
+        _KEYS = ["id"]
+        _INDEXES = [["tags"], ["symbol"]]
+
+    ds = DataStoreWithIndexes(
+        data=[
+            {"id": 1, "symbol": "A", "tags": ["x"]},
+            {"id": 2, "symbol": "B", "tags": ("x",)},
+            {"id": 3, "tags": ("y",)},
+        ]
+    )
+    assert list(ds._indexes[("tags",)]) == [(("x",),), (("y",),)]
+    assert list(ds._indexes[("symbol",)]) == [("A",), ("B",)]
+
+    assert ds.find({"tags": ["x"]}) == [{"id": 1, "symbol": "A", "tags": ["x"]}]
+    assert ds.find({"tags": ("x",)}) == [{"id": 2, "symbol": "B", "tags": ("x",)}]
+
+    ds._update([{"id": 1, "tags": ["z"]}, {"id": 3, "symbol": "C"}])
+    assert ds.find({"tags": ["z"]}) == [{"id": 1, "symbol": "A", "tags": ["z"]}]
+    assert ds.find({"symbol": "C"}) == [{"id": 3, "tags": ("y",), "symbol": "C"}]
+
+    ds._delete([{"id": 1}, {"id": 3}])
+    assert list(ds._indexes[("tags",)]) == [(("x",),)]
+
+
+def test_ds_lookup():
+    data = [{"s": f"SYM{i % 4}", "S": i % 2, "p": str(i)} for i in range(100)]
+
+    ds = pybotters.store.DataStore(
+        keys=["s", "S", "p"], data=data, indexes=[["s"], ["s", "S"]]
+    )
+    # primary key
+    assert list(ds._lookup({"s": "SYM1", "S": 1, "p": "1"})) == [
+        ds._index[("SYM1", 1, "1")]
+    ]
+    assert list(ds._lookup({"s": "SYM1", "S": 1, "p": "2"})) == []
+    assert ds._lookup({"s": "SYM1", "S": 1, "p": ["1"]}) is None
+    # best matching index
+    assert len(list(ds._lookup({"s": "SYM1"}))) == 25
+    assert len(list(ds._lookup({"s": "SYM1", "S": 1}))) == 25
+    assert len(list(ds._lookup({"s": "SYM0", "S": 1}))) == 0
+    assert ds._lookup({"s": ["SYM1"]}) is None
+    assert ds._lookup({"S": 1}) is None
+
+    assert ds.find({"s": "SYM1", "S": 1, "p": "1"}) == [{"s": "SYM1", "S": 1, "p": "1"}]
+    assert ds.find({"s": ["SYM1"]}) == []
+
+
 @pytest.mark.parametrize(
     "test_input,query,limit,expected",
     [
@@ -460,6 +642,306 @@ def test_ds_sorted(test_input, query, limit, expected):
     assert actual == expected
 
 
+class OrderBookForTest(pybotters.store.SortedBookStore):
+    _KEYS = ["name", "sort_type", "id"]
+    _BOOK_KEYS = ["name"]
+    _SIDE_KEY = "sort_type"
+    _ASC_SIDE = "asc"
+    _DESC_SIDE = "desc"
+    _PRICE_KEY = "id"
+
+
+@pytest.mark.parametrize(
+    "test_input,query,limit,expected",
+    [
+        (
+            [
+                {"name": "foo", "id": "2", "sort_type": "desc"},
+                {"name": "foo", "id": "5", "sort_type": "asc"},
+                {"name": "foo", "id": "6", "sort_type": "asc"},
+                {"name": "foo", "id": "1", "sort_type": "desc"},
+                {"name": "foo", "id": "4", "sort_type": "asc"},
+                {"name": "foo", "id": "3", "sort_type": "desc"},
+            ],
+            None,
+            None,
+            {
+                "asc": [
+                    {"name": "foo", "id": "4", "sort_type": "asc"},
+                    {"name": "foo", "id": "5", "sort_type": "asc"},
+                    {"name": "foo", "id": "6", "sort_type": "asc"},
+                ],
+                "desc": [
+                    {"name": "foo", "id": "3", "sort_type": "desc"},
+                    {"name": "foo", "id": "2", "sort_type": "desc"},
+                    {"name": "foo", "id": "1", "sort_type": "desc"},
+                ],
+            },
+        ),
+        (
+            [
+                {"name": "foo", "id": "2", "sort_type": "desc"},
+                {"name": "foo", "id": "5", "sort_type": "asc"},
+                {"name": "bar", "id": "6", "sort_type": "asc"},
+                {"name": "bar", "id": "1", "sort_type": "desc"},
+                {"name": "foo", "id": "4", "sort_type": "asc"},
+                {"name": "foo", "id": "3", "sort_type": "desc"},
+            ],
+            {"name": "foo"},
+            None,
+            {
+                "asc": [
+                    {"name": "foo", "id": "4", "sort_type": "asc"},
+                    {"name": "foo", "id": "5", "sort_type": "asc"},
+                ],
+                "desc": [
+                    {"name": "foo", "id": "3", "sort_type": "desc"},
+                    {"name": "foo", "id": "2", "sort_type": "desc"},
+                ],
+            },
+        ),
+        (
+            [
+                {"name": "foo", "id": "2", "sort_type": "desc"},
+                {"name": "bar", "id": "5", "sort_type": "asc"},
+                {"name": "foo", "id": "6", "sort_type": "asc"},
+                {"name": "bar", "id": "1", "sort_type": "desc"},
+                {"name": "foo", "id": "4", "sort_type": "asc"},
+                {"name": "bar", "id": "3", "sort_type": "desc"},
+            ],
+            None,
+            2,
+            {
+                "asc": [
+                    {"name": "foo", "id": "4", "sort_type": "asc"},
+                    {"name": "bar", "id": "5", "sort_type": "asc"},
+                ],
+                "desc": [
+                    {"name": "bar", "id": "3", "sort_type": "desc"},
+                    {"name": "foo", "id": "2", "sort_type": "desc"},
+                ],
+            },
+        ),
+        (
+            [
+                {"name": "foo", "id": "2", "sort_type": "desc", "x": 1},
+                {"name": "foo", "id": "5", "sort_type": "asc", "x": 1},
+                {"name": "foo", "id": "6", "sort_type": "asc", "x": 0},
+                {"name": "foo", "id": "1", "sort_type": "desc", "x": 0},
+            ],
+            {"sort_type": "asc", "x": 0},
+            None,
+            {
+                "asc": [
+                    {"name": "foo", "id": "6", "sort_type": "asc", "x": 0},
+                ],
+                "desc": [],
+            },
+        ),
+        (
+            [
+                {"name": "foo", "id": "2", "sort_type": "desc"},
+                {"name": "foo", "id": "5", "sort_type": "asc"},
+            ],
+            {"name": ["foo"]},
+            None,
+            {"asc": [], "desc": []},
+        ),
+    ],
+)
+def test_sbs_sorted(test_input, query, limit, expected):
+    ds = OrderBookForTest(data=test_input)
+    actual = ds.sorted(query=query, limit=limit)
+
+    assert actual == expected
+
+
+def test_sbs_sorted_consistency():
+    import random
+
+    rnd = random.Random(0)
+    ds = OrderBookForTest(indexes=[["name"]])
+    for _ in range(500):
+        item = {
+            "name": rnd.choice(["foo", "bar", "baz"]),
+            "sort_type": rnd.choice(["asc", "desc"]),
+            "id": str(rnd.randint(1, 50) / 4),
+            "size": rnd.randint(0, 3),
+        }
+        op = rnd.random()
+        if op < 0.4:
+            ds._insert([item])
+        elif op < 0.8:
+            ds._update([item])
+        elif op < 0.97:
+            ds._delete([item])
+        else:
+            ds._find_and_delete({"name": item["name"]})
+
+        for query in ({"name": "foo"}, {"name": "bar", "sort_type": "asc"}, None):
+            for limit in (None, 3):
+                assert ds.sorted(query, limit) == ds._sorted(
+                    "sort_type", "asc", "desc", "id", query, limit
+                )
+
+    assert sum(map(len, ds._books.values())) == len(ds) == len(ds._levels)
+
+
+def test_sbs_maintenance():
+    ds = OrderBookForTest(
+        data=[
+            {"name": "foo", "id": "1", "sort_type": "asc"},
+            {"name": "foo", "id": "2", "sort_type": "asc"},
+            {"name": "foo", "id": "x", "sort_type": "asc"},
+            {"name": "foo", "id": "3", "sort_type": "other"},
+        ]
+    )
+    assert list(ds._books) == [("foo", "asc"), ("foo", "other")]
+    assert len(ds._levels) == 3
+
+    ds._update([{"name": "foo", "id": "1", "sort_type": "asc", "size": 1}])
+    assert [x["id"] for x in ds.sorted()["asc"]] == ["1", "2"]
+
+    ds._remove(list(ds._find_with_uuid({"id": "1"})))
+    ds._pop({"name": "foo", "id": "3", "sort_type": "other"})
+    assert list(ds._books) == [("foo", "asc")]
+
+    ds._MAXLEN = 1
+    ds._sweep_with_key()
+    assert ds._books == {}
+    assert ds.find() == [{"name": "foo", "id": "x", "sort_type": "asc"}]
+
+    ds._insert([{"name": "foo", "id": "1", "sort_type": "asc"}])
+    ds._clear()
+    assert ds._books == {}
+    assert ds._levels == {}
+
+
+def test_sbs_relink():
+    class OrderBookWithId(pybotters.store.SortedBookStore):
+        _KEYS = ["symbol", "id"]
+        _BOOK_KEYS = ["symbol"]
+        _SIDE_KEY = "side"
+        _ASC_SIDE = "Sell"
+        _DESC_SIDE = "Buy"
+        _PRICE_KEY = "price"
+
+    ds = OrderBookWithId(
+        data=[
+            {"symbol": "XBTUSD", "id": 1, "side": "Sell", "price": 101.0},
+            {"symbol": "XBTUSD", "id": 2, "side": "Sell", "price": 102.0},
+            {"symbol": "XBTUSD", "id": 3, "side": "Buy", "price": 99.0},
+        ]
+    )
+    ds._update(
+        [
+            {"symbol": "XBTUSD", "id": 1, "price": 103.0},
+            {"symbol": "XBTUSD", "id": 2, "price": 102.0, "size": 1},
+            {"symbol": "XBTUSD", "id": 3, "side": "Sell"},
+        ]
+    )
+    assert ds.sorted() == {
+        "Sell": [
+            {"symbol": "XBTUSD", "id": 3, "side": "Sell", "price": 99.0},
+            {"symbol": "XBTUSD", "id": 2, "side": "Sell", "price": 102.0, "size": 1},
+            {"symbol": "XBTUSD", "id": 1, "side": "Sell", "price": 103.0},
+        ],
+        "Buy": [],
+    }
+    assert list(ds._books) == [("XBTUSD", "Sell")]
+
+
+def test_sbs_set_ticks():
+    class OrderBook(pybotters.store.SortedBookStore):
+        _KEYS = ["s", "S", "p"]
+        _BOOK_KEYS = ["s"]
+        _SIDE_KEY = "S"
+        _ASC_SIDE = "a"
+        _DESC_SIDE = "b"
+        _PRICE_KEY = "p"
+        _SIZE_KEY = "v"
+
+    ds = OrderBook(data=[{"s": "ETHUSDT", "S": "a", "p": "3000.01", "v": "1"}])
+    ds.set_ticks({"s": "BTCUSDT"}, "0.1", "0.001")
+    ds.set_ticks({"s": "XRPUSDT"}, "0.0001", "1")
+    with pytest.raises(ValueError):
+        ds.set_ticks({"s": "ETHUSDT"}, "0.01", "0.01")
+
+    ds._insert(
+        [
+            {"s": "BTCUSDT", "S": "a", "p": "100.1", "v": "0.5"},
+            {"s": "BTCUSDT", "S": "a", "p": "100.0", "v": "1"},
+            {"s": "BTCUSDT", "S": "b", "p": "99.9", "v": "2.25"},
+            {"s": "BTCUSDT", "S": "b", "p": "99.8", "v": 0.003},
+            {"s": "BTCUSDT", "S": "b", "p": 99, "v": "1e-3"},
+            {"s": "BTCUSDT", "S": "b", "p": "x", "v": "1"},
+            {"s": "XRPUSDT", "S": "a", "p": "0.5", "v": "10"},
+        ]
+    )
+    # Levels are keyed on the scaled price.
+    ds._update([{"s": "BTCUSDT", "S": "a", "p": "100.00", "v": "1.5"}])
+    assert len(ds.find({"s": "BTCUSDT", "S": "a"})) == 2
+    assert ds.get({"s": "BTCUSDT", "S": "a", "p": "100"}) == {
+        "s": "BTCUSDT",
+        "S": "a",
+        "p": "100.00",
+        "v": "1.5",
+    }
+    snapshot = ds.snapshot()
+    assert snapshot.get({"s": "BTCUSDT", "S": "a", "p": "100"}) == {
+        "s": "BTCUSDT",
+        "S": "a",
+        "p": "100.00",
+        "v": "1.5",
+    }
+    assert snapshot.get({"s": "BTCUSDT", "S": "b", "p": "x"}) == ds.get(
+        {"s": "BTCUSDT", "S": "b", "p": "x"}
+    )
+    assert ds.sorted_numeric({"s": "BTCUSDT"}) == {
+        "a": [(1000, 1500), (1001, 500)],
+        "b": [(999, 2250), (998, 3), (990, 1)],
+    }
+    assert ds.sorted_numeric({"s": "XRPUSDT"}, limit=1) == {"a": [(5000, 10)], "b": []}
+    assert [x["p"] for x in ds.sorted({"s": "BTCUSDT"})["b"]] == ["99.9", "99.8", 99]
+    assert ds.sorted_numeric({"s": "ETHUSDT"}) == {"a": [], "b": []}
+    assert ds.sorted_numeric({"v": "0.5"}) == {"a": [(1001, 500)], "b": []}
+
+    ds._update([{"s": "BTCUSDT", "S": "b", "p": "99.90", "v": "2"}])
+    ds._update([{"s": "BTCUSDT", "S": "b", "p": "99.90", "v": "3"}])
+    ds._update([{"s": "BTCUSDT", "S": "b", "p": "99.8", "v": "y"}])
+    ds._delete([{"s": "BTCUSDT", "S": "a", "p": "100.100"}])
+    assert ds.sorted_numeric({"s": "BTCUSDT"}) == {
+        "a": [(1000, 1500)],
+        "b": [(999, 3000), (990, 1)],
+    }
+
+    ds._clear()
+    assert ds._numeric == {}
+
+
+def test_sbs_set_ticks_without_price_key():
+    class OrderBookWithId(pybotters.store.SortedBookStore):
+        _KEYS = ["symbol", "id"]
+        _BOOK_KEYS = ["symbol"]
+        _SIDE_KEY = "side"
+        _ASC_SIDE = "Sell"
+        _DESC_SIDE = "Buy"
+        _PRICE_KEY = "price"
+        _SIZE_KEY = "size"
+
+    ds = OrderBookWithId()
+    key = ds._key
+    ds.set_ticks({"symbol": "XBTUSD"}, "0.5", "1")
+    assert ds._key is key
+
+    ds._insert(
+        [{"symbol": "XBTUSD", "id": 1, "side": "Sell", "price": 101.5, "size": 3}]
+    )
+    ds._update([{"symbol": "XBTUSD", "id": 1, "price": 102.0}])
+    assert ds.sorted_numeric() == {"Sell": [(1020, 3)], "Buy": []}
+    assert pybotters.store._tick_digits("Infinity") == 0
+
+
 def test_ds__len__():
     data = [{"foo": f"bar{i}"} for i in range(1000)]
     ds = pybotters.store.DataStore(keys=["foo"], data=data)
@@ -539,6 +1021,43 @@ async def test_ds_wait_functional():
     await asyncio.wait_for(wait_task, timeout=5.0)
 
 
+@pytest.mark.asyncio
+async def test_ds_wait_for():
+    ds = pybotters.store.DataStore(keys=["id"])
+    loop = asyncio.get_running_loop()
+
+    wait_task = loop.create_task(ds.wait_for({"id": 1}, op="delete"))
+    other_task = loop.create_task(
+        ds.wait_for(predicate=lambda item: item["val"] > 1, op="update")
+    )
+    any_task = loop.create_task(ds.wait_for())
+    await asyncio.sleep(0)
+    assert ds._filters.keys() == {("id",), ()}
+
+    ds._insert([{"id": 1, "val": 1}, {"id": 2, "val": 2}])
+    ds._update([{"id": 1, "val": 1}])
+    await asyncio.sleep(0)
+    assert not wait_task.done()
+    assert not other_task.done()
+    assert any_task.done()
+    assert any_task.result().data == {"id": 1, "val": 1}
+    assert any_task.result().operation == "insert"
+
+    ds._update([{"id": 2, "val": 3}])
+    ds._delete([{"id": 2}, {"id": 1}])
+    change = await asyncio.wait_for(wait_task, timeout=5.0)
+    assert change.operation == "delete"
+    assert change.data == {"id": 1, "val": 1}
+    change = await asyncio.wait_for(other_task, timeout=5.0)
+    assert change.operation == "update"
+    assert change.data == {"id": 2, "val": 3}
+    assert ds._filters == {}
+
+    with pytest.raises(asyncio.TimeoutError):
+        await ds.wait_for({"id": 1}, timeout=0.01)
+    assert ds._filters == {}
+
+
 def test_ds_put():
     ds = pybotters.store.DataStore()
     queue = asyncio.Queue()
@@ -554,6 +1073,48 @@ def test_ds_put():
     assert result == pybotters.store.StoreChange(ds, operation, source, item)
 
 
+def test_ds_put_shared_snapshot():
+    ds = pybotters.store.DataStore()
+    queues = [asyncio.Queue(), asyncio.Queue(), asyncio.Queue()]
+    ds._queues.extend(queues)
+
+    source = {"id": 123, "data": "updata"}
+    item = {"id": 123, "data": "updata", "extra": ["extra"]}
+    ds._put("update", source, item)
+    item["data"] = "changed"
+    item["extra"] = ["changed"]
+
+    changes = [queue.get_nowait() for queue in queues]
+    assert all(change is changes[0] for change in changes)
+    assert type(changes[0].data) is dict
+    assert changes[0].data == {"id": 123, "data": "updata", "extra": ["extra"]}
+    assert changes[0].source == source
+    assert changes[0].source is not source
+
+    ds._put("delete", None, item)
+    assert queues[0].get_nowait().source is None
+
+
+@pytest.mark.asyncio
+async def test_ds_watch_copy_on_receive():
+    ds = pybotters.store.DataStore(keys=["id"], data=[{"id": 1}])
+    with ds.watch() as s1, ds.watch() as s2, ds.watch(batch=True) as s3:
+        ds._update([{"id": 1, "nested": {"foo": ["bar"]}}])
+        change1, change2, (change3,) = await s1.get(), await s2.get(), await s3.get()
+        ds._update([{"id": 1, "nested": {"foo": ["baz"]}}])
+
+    assert type(change1.data) is dict
+    change1.data["id"] = 2
+    change1.data["nested"] = {}
+    change1.source = None
+    assert change2.data == change3.data == {"id": 1, "nested": {"foo": ["bar"]}}
+    assert change2.source == {"id": 1, "nested": {"foo": ["bar"]}}
+    assert change2.data["nested"] is change3.data["nested"]
+    change2.data["nested"]["foo"].append("qux")
+    assert change3.data["nested"] == {"foo": ["bar", "qux"]}
+    assert ds.get({"id": 1}) == {"id": 1, "nested": {"foo": ["baz"]}}
+
+
 def test_ds_watch():
     ds = pybotters.store.DataStore()
 
@@ -580,3 +1141,941 @@ async def test_store_stream():
                 break
 
         await asyncio.wait_for(_inner(), timeout=5.0)
+
+
+@pytest.mark.asyncio
+async def test_store_stream_batch():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(batch=True) as stream, ds.watch() as single_stream:
+        ds._insert([{"id": 1}, {"id": 2}, {"id": 3}])
+        ds._update([{"id": 1, "data": "foo"}, {"id": 4}])
+        ds._update([])
+        ds._delete([{"id": 2}, {"id": 99}])
+        ds._remove([ds._find_with_uuid({"id": 1}).popitem()[0]])
+        ds._clear()
+
+        batches = [stream._queue.get_nowait() for _ in range(5)]
+        assert stream._queue.empty()
+        assert [[(c.operation, c.data) for c in batch] for batch in batches] == [
+            [("insert", {"id": 1}), ("insert", {"id": 2}), ("insert", {"id": 3})],
+            [("update", {"id": 1, "data": "foo"}), ("update", {"id": 4})],
+            [("delete", {"id": 2})],
+            [("delete", {"id": 1, "data": "foo"})],
+            [("delete", {"id": 3}), ("delete", {"id": 4})],
+        ]
+        assert [c for batch in batches for c in batch] == [
+            single_stream._queue.get_nowait() for _ in range(9)
+        ]
+        assert ds._pending == []
+
+        ds._insert([{"id": 5}])
+
+        async def _inner():
+            async for changes in stream:
+                assert [c.data for c in changes] == [{"id": 5}]
+                break
+
+        await asyncio.wait_for(_inner(), timeout=5.0)
+
+
+def test_store_stream_drop_oldest():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(maxsize=2) as stream:
+        ds._insert([{"id": 1}, {"id": 2}, {"id": 3}])
+
+        assert stream.dropped == 1
+        assert [stream._queue.get_nowait().data for _ in range(2)] == [
+            {"id": 2},
+            {"id": 3},
+        ]
+
+
+def test_store_stream_drop_newest():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(maxsize=2, overflow="drop_newest") as stream:
+        ds._insert([{"id": 1}, {"id": 2}, {"id": 3}])
+
+        assert stream.dropped == 1
+        assert [stream._queue.get_nowait().data for _ in range(2)] == [
+            {"id": 1},
+            {"id": 2},
+        ]
+
+
+def test_store_stream_block_producer_error():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(maxsize=2, overflow="block_producer_error") as stream:
+        with pytest.raises(asyncio.QueueFull):
+            ds._insert([{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}])
+
+        assert len(ds) == 4
+        assert stream.dropped == 2
+        assert stream._queue.qsize() == 2
+        assert ds._pending == []
+        ds._insert([])
+
+
+def test_store_stream_conflate_by_key():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(maxsize=2, overflow="conflate_by_key") as stream:
+        ds._update([{"id": 1, "v": 1}, {"id": 2, "v": 1}, {"id": 1, "v": 2}])
+        assert stream.dropped == 1
+        ds._update([{"id": 3, "v": 1}])
+        assert stream.dropped == 2
+        ds._delete([{"id": 3}])
+        assert stream.dropped == 3
+
+        changes = [stream._queue.get_nowait() for _ in range(2)]
+        assert stream._queue.empty()
+        assert [(c.operation, c.data) for c in changes] == [
+            ("update", {"id": 2, "v": 1}),
+            ("delete", {"id": 3, "v": 1}),
+        ]
+
+
+def test_store_stream_conflate_by_key_unbounded():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with ds.watch(overflow="conflate_by_key") as stream:
+        ds._update([{"id": i % 3, "v": i} for i in range(10)])
+
+        assert stream.dropped == 7
+        assert [stream._queue.get_nowait().data for _ in range(3)] == [
+            {"id": 0, "v": 9},
+            {"id": 1, "v": 7},
+            {"id": 2, "v": 8},
+        ]
+
+
+def test_store_stream_batch_overflow():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with (
+        ds.watch(batch=True, maxsize=1) as oldest,
+        ds.watch(batch=True, maxsize=1, overflow="drop_newest") as newest,
+        ds.watch(batch=True, maxsize=1, overflow="block_producer_error") as error,
+    ):
+        ds._insert([{"id": 1}, {"id": 2}])
+        ds._remove([])
+        with pytest.raises(asyncio.QueueFull):
+            ds._insert([{"id": 3}])
+
+        assert oldest.dropped == 2
+        assert [c.data for c in oldest._queue.get_nowait()] == [{"id": 3}]
+        assert newest.dropped == 1
+        assert [c.data for c in newest._queue.get_nowait()] == [{"id": 1}, {"id": 2}]
+        assert error.dropped == 1
+        assert ds._pending == []
+        assert [c.data for c in error._queue.get_nowait()] == [{"id": 1}, {"id": 2}]
+
+
+def test_store_stream_overflow_invalid():
+    ds = pybotters.store.DataStore(keys=["id"])
+
+    with pytest.raises(ValueError):
+        ds.watch(overflow="foo")  # type: ignore[call-overload]
+    with pytest.raises(ValueError):
+        ds.watch(batch=True, overflow="conflate_by_key")
+    with pytest.raises(ValueError):
+        pybotters.store.DataStore().watch(overflow="conflate_by_key")
+    assert ds._queues == []
+
+
+def test_store_stream_query():
+    class CountingDataStore(pybotters.store.DataStore):
+        num_changes = 0
+
+        def _change(self, operation, source, item):
+            self.num_changes += 1
+            return super()._change(operation, source, item)
+
+    ds = CountingDataStore(keys=["s", "p"])
+
+    with (
+        ds.watch(query={"s": "BTC"}) as btc,
+        ds.watch(query={"s": "ETH", "side": "buy"}) as eth_buy,
+        ds.watch(query={"s": "BTC"}, predicate=lambda x: x["p"] > 1) as btc_predicate,
+        ds.watch(predicate=lambda x: x["p"] == 2) as predicate,
+    ):
+        assert ds._queues == []
+        assert set(ds._filters) == {("s",), ("s", "side"), ()}
+
+        ds._insert(
+            [
+                {"s": "BTC", "p": 1},
+                {"s": "BTC", "p": 2},
+                {"s": "ETH", "p": 1, "side": "buy"},
+                {"s": "ETH", "p": 2, "side": "sell"},
+                {"s": "XRP", "p": 1, "side": ["unhashable"]},
+                {"s": "XRP", "p": 3},
+            ]
+        )
+        ds._delete([{"s": "BTC", "p": 1}])
+
+        def get_all(stream):
+            result = []
+            while not stream._queue.empty():
+                change = stream._queue.get_nowait()
+                result.append((change.operation, change.data))
+            return result
+
+        assert get_all(btc) == [
+            ("insert", {"s": "BTC", "p": 1}),
+            ("insert", {"s": "BTC", "p": 2}),
+            ("delete", {"s": "BTC", "p": 1}),
+        ]
+        assert get_all(eth_buy) == [("insert", {"s": "ETH", "p": 1, "side": "buy"})]
+        assert get_all(btc_predicate) == [("insert", {"s": "BTC", "p": 2})]
+        assert get_all(predicate) == [
+            ("insert", {"s": "BTC", "p": 2}),
+            ("insert", {"s": "ETH", "p": 2, "side": "sell"}),
+        ]
+        assert ds.num_changes == 5
+
+        with ds.watch(query={"s": "BTC"}) as other:
+            assert len(ds._filters[("s",)][("BTC",)]) == 3
+        assert other._queue not in ds._filters[("s",)][("BTC",)]
+
+    assert ds._filters == {}
+    ds._insert([{"s": "BTC", "p": 3}])
+    assert ds.num_changes == 5
+
+
+class RingStoreForTest(pybotters.store.RingStore):
+    _MAXLEN = 5
+
+
+def test_rs_init():
+    rs = RingStoreForTest(data=[{"n": i} for i in range(3)])
+
+    assert list(rs) == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert list(rs._data.keys()) == [0, 1, 2]
+    assert pybotters.store.RingStore()._data._capacity == 9999
+    with pytest.raises(ValueError):
+        pybotters.store.RingStore(keys=["n"])
+
+
+def test_rs_append():
+    rs = RingStoreForTest(indexes=[["s"]])
+
+    rs._insert([{"s": i % 2, "n": i} for i in range(7)])
+    rs._update([{"s": 0, "n": 7}])
+    expected = [
+        {"s": 1, "n": 3},
+        {"s": 0, "n": 4},
+        {"s": 1, "n": 5},
+        {"s": 0, "n": 6},
+        {"s": 0, "n": 7},
+    ]
+
+    assert len(rs) == 5
+    assert list(rs) == expected
+    assert list(reversed(rs)) == expected[::-1]
+    assert rs._data.items() == list(enumerate(expected, 3))
+    assert rs.find({"s": 1}) == [{"s": 1, "n": 3}, {"s": 1, "n": 5}]
+    assert rs._indexes[("s",)] == {
+        (0,): {4: None, 6: None, 7: None},
+        (1,): {3: None, 5: None},
+    }
+    assert rs.get({"n": 7}) is None
+    rs._delete([{"n": 7}])
+    assert len(rs) == 5
+
+    assert rs.tail(2) == expected[3:]
+    assert rs.tail(3) == expected[2:]
+    assert rs.tail(10) == list(rs)
+    assert rs.tail(0) == []
+
+
+def test_rs_remove():
+    rs = RingStoreForTest(data=[{"n": i} for i in range(7)])
+
+    ids = rs._find_with_uuid({"n": 4})
+    assert list(ids) == [4]
+    rs._remove([*ids, 2, 99, "foo"])  # type: ignore[list-item]
+
+    assert len(rs) == 3
+    assert 4 not in rs._data
+    assert list(rs) == [{"n": 3}, {"n": 5}, {"n": 6}]
+    assert list(reversed(rs)) == [{"n": 6}, {"n": 5}, {"n": 3}]
+    assert list(rs._find_with_uuid()) == [3, 5, 6]
+    assert rs.tail(2) == [{"n": 5}, {"n": 6}]
+    with pytest.raises(KeyError):
+        rs._data[4]
+    with pytest.raises(KeyError):
+        del rs._data[4]
+
+    rs._insert([{"n": 7}, {"n": 8}])
+    assert len(rs) == 4
+    assert list(rs) == [{"n": 5}, {"n": 6}, {"n": 7}, {"n": 8}]
+
+
+def test_rs_clear():
+    rs = RingStoreForTest(data=[{"n": i} for i in range(7)], indexes=[["n"]])
+
+    rs._clear()
+    assert len(rs) == 0
+    assert list(rs) == []
+    assert rs.tail(1) == []
+    assert rs._indexes == {("n",): {}}
+
+    rs._insert([{"n": i} for i in range(6)])
+    assert list(rs._find_with_uuid()) == [8, 9, 10, 11, 12]
+    assert rs.find({"n": 5}) == [{"n": 5}]
+    assert rs._data[12] == {"n": 5}
+
+
+@pytest.mark.asyncio
+async def test_rs_watch():
+    rs = RingStoreForTest()
+
+    with rs.watch(query={"s": "BTC"}) as stream:
+        wait_task = asyncio.create_task(rs.wait())
+        await asyncio.sleep(0)
+        rs._insert([{"s": "ETH"}, {"s": "BTC"}])
+        rs._update([{"s": "BTC"}])
+
+        await asyncio.wait_for(wait_task, timeout=5.0)
+        changes = [stream._queue.get_nowait() for _ in range(2)]
+        assert [(c.operation, c.data) for c in changes] == [
+            ("insert", {"s": "BTC"}),
+            ("update", {"s": "BTC"}),
+        ]
+
+
+class ColumnarStoreForTest(pybotters.store.DataStore):
+    _KEYS = ["t"]
+    _MAXLEN = 5
+    _COLUMNS = {
+        "t": ("t", "q", int),
+        "p": ("p", "d", float),
+        "side": ("side", "b", {"buy": 1, "sell": -1}.__getitem__),
+    }
+
+
+def test_ds_columns():
+    ds = ColumnarStoreForTest(
+        data=[{"t": i, "p": str(i * 10), "side": "buy"} for i in range(3)]
+    )
+    assert ds._columns is None
+
+    def columns():
+        return {name: view.tolist() for name, view in ds.columns().items()}
+
+    assert columns() == {"t": [0, 1, 2], "p": [0.0, 10.0, 20.0], "side": [1, 1, 1]}
+
+    ds._update([{"t": 1, "side": "sell"}, {"t": 3, "p": None, "side": "foo"}])
+    ds._insert([{"t": 0, "p": "5"}])
+    result = columns()
+    assert result["t"] == [0, 1, 2, 3]
+    assert result["p"][:3] == [5.0, 10.0, 20.0]
+    assert math.isnan(result["p"][3])
+    assert result["side"] == [0, -1, 1, 0]
+    assert [item["t"] for item in ds] == columns()["t"]
+
+    # Sweep evicts the oldest rows
+    ds._insert([{"t": i, "p": "1", "side": "buy"} for i in range(4, 7)])
+    assert columns()["t"] == [2, 3, 4, 5, 6]
+    assert ds._columns is not None and not ds._columns._dirty
+
+    # Deleting a row in the middle rebuilds the columns on the next read
+    ds._delete([{"t": 4}])
+    ds._insert([{"t": 7, "p": "1", "side": "buy"}])
+    assert ds._columns._dirty
+    ds._update([{"t": 5, "p": "2"}])
+    ds._delete([{"t": 6}])
+    assert columns()["t"] == [2, 3, 5, 7]
+    assert columns()["p"][2] == 2.0
+    assert not ds._columns._dirty
+
+    ds._clear()
+    assert columns() == {"t": [], "p": [], "side": []}
+    ds._insert([{"t": 8, "p": "1", "side": "buy"}])
+    assert columns()["t"] == [8]
+
+    assert pybotters.store.DataStore().columns() == {}
+
+
+def test_ds_columns_exported_view():
+    ds = ColumnarStoreForTest(data=[{"t": 0, "p": "1", "side": "buy"}])
+    view = ds.columns()["t"]
+
+    ds._insert([{"t": 1, "p": "1", "side": "buy"}])
+
+    assert view.tolist() == [0]
+    assert ds.columns()["t"].tolist() == [0, 1]
+
+
+def test_rs_columns():
+    class ColumnarRingStore(pybotters.store.RingStore):
+        _MAXLEN = 2000
+        _COLUMNS = {"n": ("n", "q", int)}
+
+    rs = ColumnarRingStore(data=[{"n": i} for i in range(2000)])
+    assert rs.columns()["n"].tolist() == list(range(2000))
+
+    rs._insert([{"n": i} for i in range(2000, 4500)])
+    assert rs.columns()["n"].tolist() == list(range(2500, 4500))
+    assert rs._columns is not None and rs._columns._start < 2500
+
+    rs._remove([3000])
+    assert rs.columns()["n"].tolist() == [n for n in range(2500, 4500) if n != 3000]
+
+
+def test_ds_to_numpy(mocker: pytest_mock.MockerFixture):
+    np = pytest.importorskip("numpy")
+    ds = ColumnarStoreForTest(data=[{"t": 1, "p": "1.5", "side": "sell"}])
+
+    arrays = ds.to_numpy()
+    assert arrays["t"].dtype == np.int64
+    assert arrays["p"].dtype == np.float64
+    assert arrays["side"].dtype == np.int8
+    assert arrays["p"].tolist() == [1.5]
+
+    mocker.patch.dict("sys.modules", {"numpy": None})
+    with pytest.raises(ImportError):
+        ds.to_numpy()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (1700000000, 1700000000.0),
+        (1700000000.5, 1700000000.5),
+        (1700000000123, 1700000000.123),
+        (1700000000123456, 1700000000.123456),
+        (1700000000123456789, 1700000000.123456789),
+        ("1700000000123", 1700000000.123),
+        ("2023-11-14T22:13:20.1234567Z", 1700000000.123456),
+        ("2023-11-14T22:13:20Z", 1700000000.0),
+        ("2023-11-14T22:13:20.5", 1700000000.5),
+        ("2023-11-15T07:13:20.5+09:00", 1700000000.5),
+        ("foo", None),
+        (None, None),
+        (True, None),
+    ],
+)
+def test_parse_timestamp(value, expected):
+    assert pybotters.store._parse_timestamp(value) == pytest.approx(expected)
+
+
+class RetentionStoreForTest(pybotters.store.DataStore):
+    _KEYS = ["id"]
+    _TIMESTAMP_KEY = "ts"
+
+
+@pytest.mark.freeze_time(datetime.datetime(2023, 11, 14, 22, 13, 20))
+def test_ds_retention(freezer):
+    ds = RetentionStoreForTest(
+        data=[{"id": 0, "ts": 1699999000000}, {"id": 1, "ts": 1699999990000}],
+        indexes=[["id"]],
+    )
+    assert ds.retention is None
+
+    ds.retention = datetime.timedelta(seconds=60)
+    assert ds.retention == datetime.timedelta(seconds=60)
+    assert ds.find() == [{"id": 1, "ts": 1699999990000}]
+
+    ds._insert([{"id": 2, "ts": 1700000000000}, {"id": 3}])
+    ds._update([{"id": 1, "ts": 1700000030000}])
+    ds._insert([{"id": 2, "ts": 1700000020000}])
+
+    freezer.move_to(datetime.datetime(2023, 11, 14, 22, 14, 25))
+    ds._update([{"id": 4, "ts": 1700000065000}])
+    assert ds.find() == [
+        {"id": 1, "ts": 1700000030000},
+        {"id": 2, "ts": 1700000020000},
+        {"id": 3},
+        {"id": 4, "ts": 1700000065000},
+    ]
+
+    freezer.move_to(datetime.datetime(2023, 11, 14, 22, 15, 25))
+    ds._insert([])
+    assert ds.find() == [{"id": 3}, {"id": 4, "ts": 1700000065000}]
+    assert ds.get({"id": 1}) is None
+    assert ds._indexes[("id",)].keys() == {(3,), (4,)}
+
+    # Entries of updated rows do not pile up
+    for i in range(100):
+        ds._update([{"id": 4, "ts": 1700000065000 + i}])
+    assert ds._expiry is not None and len(ds._expiry) <= 2 * len(ds) + 1
+    assert ds._expiry[-1] == (1700000065.099, ds._index[(4,)])
+
+    ds._clear()
+    assert ds._expiry is not None and len(ds._expiry) == 0
+
+    ds.retention = None
+    assert ds._expiry is None
+    ds._insert([{"id": 5, "ts": 0}])
+    assert len(ds) == 1
+
+    with pytest.raises(ValueError):
+        pybotters.store.DataStore().retention = datetime.timedelta(seconds=1)
+
+
+@pytest.mark.freeze_time(datetime.datetime(2023, 11, 14, 22, 13, 20))
+def test_rs_retention(freezer):
+    class RetentionRingStore(pybotters.store.RingStore):
+        _MAXLEN = 5
+        _TIMESTAMP_KEY = "exec_date"
+        _RETENTION = datetime.timedelta(seconds=10)
+
+    rs = RetentionRingStore(
+        data=[
+            {"n": 0, "exec_date": "2023-11-14T22:13:00.0000000Z"},
+            {"n": 1, "exec_date": "2023-11-14T22:13:15.0000000Z"},
+            {"n": 2, "exec_date": "2023-11-14T22:13:19.0000000Z"},
+        ]
+    )
+    assert rs.retention == datetime.timedelta(seconds=10)
+    assert [item["n"] for item in rs] == [1, 2]
+    assert rs._data._start == 1
+
+    freezer.move_to(datetime.datetime(2023, 11, 14, 22, 13, 28))
+    rs._insert([{"n": 3, "exec_date": "2023-11-14T22:13:28.0000000Z"}])
+    assert [item["n"] for item in rs] == [2, 3]
+    assert rs.tail(5) == list(rs)
+
+    rs._remove([3])
+    assert rs._data._start == 2
+    assert [item["n"] for item in rs] == [2]
+
+    freezer.move_to(datetime.datetime(2023, 11, 14, 22, 14, 0))
+    rs._insert([])
+    assert len(rs) == 0
+    assert rs._expiry is not None and len(rs._expiry) == 0
+
+
+class StateStoreForTest(OrderBookForTest):
+    _STATE = ["last_id", "versions"]
+
+    def _init(self) -> None:
+        self.last_id: int | None = None
+        self.versions: dict[str, int] = {}
+
+
+class CollectionForTest(pybotters.store.DataStoreCollection):
+    def _init(self) -> None:
+        self._create("orderbook", datastore_class=StateStoreForTest)
+        self._create("trade", datastore_class=RingStoreForTest)
+        self._create("order", keys=["id"])
+
+    @property
+    def orderbook(self) -> StateStoreForTest:
+        return self._get("orderbook", StateStoreForTest)
+
+    @property
+    def trade(self) -> RingStoreForTest:
+        return self._get("trade", RingStoreForTest)
+
+    @property
+    def order(self) -> pybotters.store.DataStore:
+        return self._get("order", pybotters.store.DataStore)
+
+
+@pytest.mark.freeze_time(datetime.datetime(2023, 11, 14, 22, 13, 20))
+def test_dsc_save_and_load(tmp_path, mocker: pytest_mock.MockerFixture):
+    path = tmp_path / "state.msgpack"
+
+    store = CollectionForTest()
+    store.orderbook._insert(
+        [
+            {"s": "BTC", "S": "a", "p": "101"},
+            {"s": "BTC", "S": "a", "p": "102"},
+            {"s": "BTC", "S": "b", "p": "99"},
+        ]
+    )
+    store.orderbook.last_id = 123
+    store.orderbook.versions["BTC"] = 4
+    store.trade._insert([{"n": i} for i in range(7)])
+    store.order._insert([{"id": 1, "side": "buy"}])
+    store.save(path)
+    assert not (tmp_path / "state.msgpack.tmp").exists()
+
+    restored = CollectionForTest()
+    restored.order._insert([{"id": 2}])
+    versions = restored.orderbook.versions
+    set_mock = mocker.patch.object(restored, "_set")
+    with restored.order.watch() as stream:
+        saved_at = restored.load(path)
+        assert stream._queue.empty()
+    set_mock.assert_called_once_with()
+
+    assert saved_at == datetime.datetime(
+        2023, 11, 14, 22, 13, 20, tzinfo=datetime.timezone.utc
+    )
+    assert restored.orderbook.sorted() == store.orderbook.sorted()
+    assert restored.orderbook.last_id == 123
+    assert restored.orderbook.versions is versions
+    assert versions == {"BTC": 4}
+    assert list(restored.trade) == [{"n": i} for i in range(2, 7)]
+    assert restored.trade.tail(1) == [{"n": 6}]
+    assert restored.order.find() == [{"id": 1, "side": "buy"}]
+    assert restored.order.get({"id": 2}) is None
+
+    mocker.patch.dict("sys.modules", {"msgpack": None})
+    other = pybotters.store.DataStoreCollection()
+    other._create("order", keys=["id"], data=[{"id": 3}])
+    assert other.load(path) == saved_at
+    assert other._get("order", pybotters.store.DataStore).find() == [
+        {"id": 1, "side": "buy"}
+    ]
+
+
+def test_dsc_save_error(tmp_path, mocker: pytest_mock.MockerFixture):
+    path = tmp_path / "state.msgpack"
+    path.write_bytes(b"previous")
+
+    store = CollectionForTest()
+    store.order._insert([{"id": 1, "price": decimal.Decimal("1")}])
+    with pytest.raises(TypeError, match="'order'"):
+        store.save(path)
+    assert path.read_bytes() == b"previous"
+    assert not (tmp_path / "state.msgpack.tmp").exists()
+
+    store.order._clear()
+    mocker.patch("os.replace", side_effect=OSError)
+    with pytest.raises(OSError):
+        store.save(path)
+    assert path.read_bytes() == b"previous"
+    assert not (tmp_path / "state.msgpack.tmp").exists()
+
+
+def test_ds_restore():
+    ds = pybotters.store.DataStore(keys=["id"], indexes=[["s"]])
+    ds._insert([{"id": 9, "s": "ETH"}])
+
+    ds._restore([{"id": 1, "s": "BTC"}, {"s": "BTC"}, {"id": 1, "s": "XRP"}])
+    assert ds.find() == [{"id": 1, "s": "XRP"}]
+    assert ds.find({"s": "BTC"}) == []
+    assert ds._indexes[("s",)] == {("XRP",): {ds._index[(1,)]: None}}
+
+    ds = pybotters.store.DataStore()
+    ds._restore([{"n": 1}, {"n": 1}])
+    assert ds.find() == [{"n": 1}, {"n": 1}]
+
+
+def test_dsc_load_invalid(tmp_path):
+    from pybotters._static_dependencies import msgpack
+
+    store = CollectionForTest()
+    store["order"]._insert([{"id": 1}])
+    path = tmp_path / "state.msgpack"
+
+    other = pybotters.store.DataStoreCollection()
+    other._create("order", keys=["order_id"])
+    other._create("trade", datastore_class=RingStoreForTest)
+    other.save(path)
+    with pytest.raises(ValueError):
+        store.load(path)
+    assert store["order"].find() == [{"id": 1}]
+
+    path.write_bytes(msgpack.packb({"version": 0}))
+    with pytest.raises(ValueError):
+        store.load(path)
+
+
+@pytest.mark.asyncio
+async def test_ds_metrics():
+    ds = pybotters.store.DataStore(keys=["id"])
+    ds._MAXLEN = 3
+    assert not ds.collect_metrics
+    assert ds._counts is None
+
+    ds.collect_metrics = True
+    ds._insert([{"id": i} for i in range(5)])
+    ds._update([{"id": 4, "v": 1}])
+    ds._delete([{"id": 3}])
+    stream = ds.watch()
+    filtered = ds.watch(query={"id": 4}, maxsize=1, overflow="drop_newest")
+    ds._update([{"id": 4, "v": 2}, {"id": 4, "v": 3}])
+    waiter = asyncio.create_task(ds.wait_for({"id": 9}))
+    waiting = asyncio.create_task(ds.wait())
+    await asyncio.sleep(0)
+
+    metrics = ds.metrics()
+    assert metrics == {
+        "insert": 5,
+        "update": 3,
+        "delete": 1,
+        "sweeps": 1,
+        "evictions": 2,
+        "size": 2,
+        "bytes": metrics["bytes"],
+        "streams": 2,
+        "queued": 3,
+        "max_queued": 2,
+        "dropped": 1,
+        "waiters": 2,
+    }
+    assert metrics["bytes"] > 0
+    assert ds._changes() == 9
+
+    waiter.cancel()
+    stream.close()
+    filtered.close()
+    ds._set()
+    await waiting
+
+    ds.collect_metrics = False
+    assert ds._changes() == 0
+    assert ds.metrics()["insert"] == 0
+    ds._insert([{"id": 10}])
+    assert ds._counts is None
+
+    empty = pybotters.store.DataStore()
+    assert empty.metrics()["bytes"] == empty._estimate_bytes() > 0
+
+
+@pytest.mark.freeze_time(datetime.datetime(2023, 11, 14, 22, 13, 20))
+def test_rs_metrics():
+    class RetentionRingStore(pybotters.store.RingStore):
+        _MAXLEN = 3
+        _TIMESTAMP_KEY = "t"
+
+    rs = RetentionRingStore()
+    rs.collect_metrics = True
+    rs._insert([{"t": 1699999990 + i} for i in range(5)])
+    assert rs.metrics()["evictions"] == 2
+    assert rs.metrics()["sweeps"] == 1
+
+    rs.retention = datetime.timedelta(seconds=7.5)
+    assert len(rs) == 2
+    assert rs.metrics()["evictions"] == 3
+    assert rs.metrics()["sweeps"] == 2
+    assert rs.metrics()["bytes"] > sys.getsizeof(rs._data._items)
+
+    ds = pybotters.store.DataStore()
+    ds._MAXLEN = 1
+    ds.collect_metrics = True
+    ds._insert([{"n": 1}, {"n": 2}])
+    assert ds.metrics()["evictions"] == 1
+
+
+def test_dsc_metrics(mocker: pytest_mock.MockerFixture):
+    class DSC(pybotters.store.DataStoreCollection):
+        def _init(self) -> None:
+            self._create("orders", keys=["id"])
+            self._create('po"s', keys=["id"])
+
+        def _onmessage(
+            self, msg: Any, ws: ClientWebSocketResponse | None = None
+        ) -> None:
+            store = self[msg["store"]]
+            assert store is not None
+            store._insert(msg["data"])
+
+    dsc = DSC()
+    dsc.onmessage({"store": "orders", "data": [{"id": 1}]})
+    assert dsc.metrics()["messages"] == 0
+
+    dsc.collect_metrics = True
+    assert dsc.collect_metrics
+    orders = dsc["orders"]
+    assert orders is not None and orders.collect_metrics
+    mocker.patch("time.perf_counter", side_effect=[0.0, 0.5, 1.0, 1.25, 2.0, 2.1])
+    dsc.onmessage({"store": "orders", "data": [{"id": 2}]})
+    dsc.onmessage({"store": 'po"s', "data": [{"id": 1}]})
+    dsc.onmessage({"store": "orders", "data": []})
+
+    metrics = dsc.metrics()
+    assert metrics["messages"] == 3
+    assert metrics["seconds"] == pytest.approx(0.85)
+    assert metrics["max_seconds"] == 0.5
+    assert metrics["channels"] == {
+        "orders": {"messages": 1, "seconds": 0.5, "max_seconds": 0.5},
+        'po"s': {"messages": 1, "seconds": 0.25, "max_seconds": 0.25},
+    }
+    assert metrics["stores"]["orders"]["insert"] == 1
+    assert metrics["stores"]["orders"]["size"] == 2
+
+    text = dsc.export_metrics(prefix="bot")
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert "# TYPE bot_datastore_changes_total counter" in lines
+    assert 'bot_datastore_changes_total{store="orders",operation="insert"} 1' in lines
+    assert 'bot_datastore_size{store="po\\"s"} 1' in lines
+    assert "# TYPE bot_datastore_waiters gauge" in lines
+    assert "bot_onmessage_total 3" in lines
+    assert 'bot_channel_onmessage_total{channel="orders"} 1' in lines
+    assert "bot_onmessage_max_seconds 0.5" in lines
+
+    dsc.collect_metrics = False
+    assert dsc.metrics()["channels"] == {}
+    assert not orders.collect_metrics
+
+
+def test_ds_changes_since():
+    ds = pybotters.store.DataStore(keys=["id"])
+    ds._CHANGELOG_MAXLEN = 3
+    ds._insert([{"id": 1}])
+    assert ds.version == 1
+    assert ds._changelog is None
+    assert ds.changes_since(1) == (1, [])
+    assert ds._changelog is not None
+    assert ds.changes_since(0) == (1, None)
+
+    ds._insert([{"id": 2}])
+    ds._update([{"id": 1, "v": 1}])
+    version, changes = ds.changes_since(1)
+    assert version == 3
+    assert changes is not None
+    assert [(c.operation, c.data) for c in changes] == [
+        ("insert", {"id": 2}),
+        ("update", {"id": 1, "v": 1}),
+    ]
+    assert type(changes[1].data) is dict
+
+    ds._update([{"id": 1, "v": 2}])
+    with ds.watch() as stream:
+        ds._delete([{"id": 2}])
+        version, changes = ds.changes_since(3)
+        assert changes is not None
+        assert changes[-1] == stream._queue.get_nowait()
+    assert version == 5
+    assert [c.data for c in changes] == [{"id": 1, "v": 2}, {"id": 2}]
+    assert ds.changes_since(1) == (5, None)
+    assert ds.changes_since(2)[1] is not None
+    assert ds.changes_since(6) == (5, None)
+
+    ds._restore([{"id": 3}])
+    assert ds.version == 6
+    assert ds.changes_since(5) == (6, None)
+    ds._insert([{"id": 4}])
+    assert ds.changes_since(6)[1] is not None
+
+    assert ds.keep_changelog
+    ds.keep_changelog = False
+    assert ds._changelog is None
+    ds._insert([{"id": 5}])
+    assert ds.changes_since(7) == (8, None)
+    ds.keep_changelog = False
+    ds.keep_changelog = True
+    ds.keep_changelog = True
+    ds._insert([{"id": 6}])
+    assert ds.changes_since(8)[1] is not None
+
+    rs = RingStoreForTest(data=[{"n": 1}])
+    assert rs.changes_since(rs.version) == (1, [])
+    rs._restore([{"n": 2}])
+    assert rs.changes_since(1) == (2, None)
+
+
+@pytest.mark.freeze_time(datetime.datetime(2023, 11, 14, 22, 13, 20))
+def test_ds_changes_since_evictions(freezer):
+    def mirror(store: pybotters.store.DataStore, version: int, rows: list) -> int:
+        version, changes = store.changes_since(version)
+        assert changes is not None
+        for change in changes:
+            if change.operation == "delete":
+                rows.remove(change.data)
+            else:
+                rows.append(change.data)
+        return version
+
+    ds = RetentionStoreForTest()
+    ds._MAXLEN = 2
+    ds.retention = datetime.timedelta(seconds=60)
+    rows: list = []
+    version = mirror(ds, ds.version, rows)
+    with ds.watch() as stream:
+        ds._insert([{"id": 1}, {"id": 2, "ts": 1699999990000}, {"id": 3}])
+        version = mirror(ds, version, rows)
+        assert rows == ds.find() == [{"id": 2, "ts": 1699999990000}, {"id": 3}]
+
+        freezer.move_to(datetime.datetime(2023, 11, 14, 22, 15, 20))
+        ds._insert([])
+        version = mirror(ds, version, rows)
+        assert rows == ds.find() == [{"id": 3}]
+        assert stream._queue.qsize() == 3
+    change = ds.changes_since(version - 1)[1]
+    assert change is not None and change[0].source is None
+
+    ds2 = pybotters.store.DataStore()
+    ds2._MAXLEN = 2
+    rows = []
+    version = mirror(ds2, ds2.version, rows)
+    ds2._insert([{"n": 1}, {"n": 2}, {"n": 3}])
+    version = mirror(ds2, version, rows)
+    assert rows == ds2.find() == [{"n": 2}, {"n": 3}]
+
+    rs = RingStoreForTest()
+    rows = []
+    version = mirror(rs, rs.version, rows)
+    rs._insert([{"n": i} for i in range(7)])
+    mirror(rs, version, rows)
+    assert rows == rs.find() == [{"n": i} for i in range(2, 7)]
+
+
+def test_ds_snapshot():
+    ds = pybotters.store.DataStore(keys=["id"], data=[{"id": 1}, {"id": 2, "v": 0}])
+    assert ds._owned is None
+    item = ds.get({"id": 2})
+
+    snapshot = ds.snapshot()
+    assert isinstance(snapshot, pybotters.StoreSnapshot)
+    assert snapshot.version == ds.version == 2
+    ds._update([{"id": 2, "v": 1}, {"id": 3}])
+    ds._update([{"id": 2, "v": 2}])
+    ds._delete([{"id": 1}])
+
+    assert len(snapshot) == 2
+    assert list(snapshot) == [{"id": 1}, {"id": 2, "v": 0}]
+    assert list(reversed(snapshot)) == [{"id": 2, "v": 0}, {"id": 1}]
+    assert snapshot.get({"id": 2}) is item
+    assert snapshot.get({"id": 3}) is None
+    assert snapshot.get({"foo": 2}) is None
+    assert snapshot.find() == [{"id": 1}, {"id": 2, "v": 0}]
+    assert snapshot.find({"v": 0}) == [{"id": 2, "v": 0}]
+    assert ds.find() == [{"id": 2, "v": 2}, {"id": 3}]
+    assert ds._owned == {ds._index[(2,)]}
+
+    newer = ds.snapshot()
+    assert ds._owned == set()
+    del snapshot
+    ds._update([{"id": 2, "v": 3}])
+    assert newer.get({"id": 2}) == {"id": 2, "v": 2}
+    del newer
+    current = ds.get({"id": 3})
+    ds._update([{"id": 3, "v": 1}])
+    assert ds._owned is None
+    assert ds.get({"id": 3}) is current
+
+    rs = RingStoreForTest(data=[{"n": 1}])
+    snapshot = rs.snapshot()
+    rs._insert([{"n": 2}])
+    assert snapshot.find() == [{"n": 1}]
+    assert snapshot.get({"n": 1}) is None
+
+
+@pytest.mark.asyncio
+async def test_ds_snapshot_concurrent_readers():
+    num_rows = 500
+    ds = pybotters.store.DataStore(
+        keys=["id"], data=[{"id": i, "v": 0} for i in range(num_rows)]
+    )
+
+    def read(snapshot: pybotters.StoreSnapshot) -> set[int]:
+        values: set[int] = set()
+        for _ in range(10):
+            values.update(item["v"] for item in snapshot.find() if item["id"] >= 0)
+            assert len(snapshot.find({"v": next(iter(values))})) == num_rows
+        return values
+
+    loop = asyncio.get_running_loop()
+    tasks = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        for v in range(1, 31):
+            tasks.append(loop.run_in_executor(executor, read, ds.snapshot()))
+            ds._update([{"id": i, "v": v} for i in range(num_rows)])
+            ds._insert([{"id": -v, "v": v}])
+            ds._delete([{"id": -v}])
+            await asyncio.sleep(0)
+        results = await asyncio.gather(*tasks)
+
+    assert results == [{v} for v in range(30)]
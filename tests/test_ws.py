@@ -3,11 +3,12 @@ from __future__ import annotations
 import asyncio
 import copy
 import functools
+import itertools
 import json
 import logging
 import zlib
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from unittest.mock import ANY, AsyncMock, MagicMock, PropertyMock, call
 
 import aiohttp
@@ -262,6 +263,8 @@ async def test_ws_connect(
     ]
     assert websocketapp._event.is_set()
 
+    assert m_wsresp._json_loads is pybotters._json.loads
+    assert m_wsresp._json_dumps is pybotters._json.dumps
     assert m_wsresp._wait_authtask.call_args == call()
     assert m_wsresp.send_str.call_args == call("spam")
     assert m_wsresp.send_bytes.call_args == call(b"egg")
@@ -281,6 +284,83 @@ async def test_ws_connect(
     ]
 
 
+@pytest.mark.asyncio
+async def test_websocketapp_json(
+    caplog: pytest.LogCaptureFixture, client_session: aiohttp.ClientSession
+):
+    def loads(data: str | bytes) -> Any:
+        if data == "__TEXT__":
+            raise ValueError("not json")
+        return {"loads": data}
+
+    m_dumps = MagicMock()
+    client_session.__dict__["_json_dumps"] = m_dumps
+    websocketapp = WebSocketApp(client_session, "wss://example.com", json_loads=loads)
+    websocketapp._task.cancel()
+
+    assert websocketapp._json_loads is loads
+    assert websocketapp._json_dumps is m_dumps
+
+    hdlr_json = MagicMock()
+    m_wsresp = MagicMock()
+    for msg in [
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, '{"spam":"egg"}', None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, "__TEXT__", None),
+    ]:
+        websocketapp._onmessage(msg, m_wsresp, [], [], [hdlr_json])
+    await asyncio.sleep(0)
+
+    assert hdlr_json.call_args_list == [call({"loads": '{"spam":"egg"}'}, m_wsresp)]
+    assert caplog.record_tuples == [
+        ("pybotters.ws", logging.WARNING, "ValueError: not json __TEXT__")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_websocketapp_dispatch_inline(client_session: aiohttp.ClientSession):
+    websocketapp = WebSocketApp(client_session, "wss://example.com", dispatch="inline")
+    websocketapp._task.cancel()
+
+    m_exception_handler = MagicMock()
+    asyncio.get_running_loop().set_exception_handler(m_exception_handler)
+
+    calls: list[tuple[str, object]] = []
+    error = RuntimeError("handler error")
+
+    def hdlr_str(msg: str, ws: object) -> None:
+        calls.append(("str", msg))
+        raise error
+
+    def hdlr_json(msg: object, ws: object) -> None:
+        calls.append(("json", msg))
+
+    m_wsresp = MagicMock()
+    m_wsresp.__aiter__.return_value = [
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, '{"spam":"egg"}', None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, '{"bacon":"tomato"}', None),
+    ]
+
+    await websocketapp._ws_receive(m_wsresp, [hdlr_str], [], [hdlr_json, hdlr_json])
+
+    # Handlers are called in the receive loop without waiting for the event loop
+    assert calls == [
+        ("str", '{"spam":"egg"}'),
+        ("json", {"spam": "egg"}),
+        ("json", {"spam": "egg"}),
+        ("str", '{"bacon":"tomato"}'),
+        ("json", {"bacon": "tomato"}),
+        ("json", {"bacon": "tomato"}),
+    ]
+    assert m_exception_handler.call_count == 2
+    assert m_exception_handler.call_args.args[1]["exception"] is error
+
+
+@pytest.mark.asyncio
+async def test_websocketapp_dispatch_invalid(client_session: aiohttp.ClientSession):
+    with pytest.raises(ValueError):
+        WebSocketApp(client_session, "wss://example.com", dispatch="invalid")  # type: ignore[arg-type]
+
+
 @pytest.mark.asyncio
 async def test_websocketapp_wait(websocketapp: WebSocketApp):
     websocketapp._task.cancel()
@@ -391,6 +471,297 @@ async def test_websocketapp_functional(
     ]
 
 
+@pytest.mark.asyncio
+async def test_websocketmultiplexer(mocker: pytest_mock.MockerFixture):
+    mocker.patch.object(
+        pybotters.ws.TopicHosts, "items", {"127.0.0.1": pybotters.ws.Topic.bybit()}
+    )
+    connections = 0
+    received: asyncio.Queue[Any] = asyncio.Queue()
+    closed = asyncio.Event()
+
+    async def topics(request: web.Request):
+        nonlocal connections
+        connections += 1
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            data = msg.json()
+            await received.put(data)
+            await ws.send_json({"success": True, "op": data["op"]})
+            if data["op"] == "subscribe":
+                await ws.send_json({"topic": data["args"][0], "data": "snapshot"})
+        closed.set()
+        return ws
+
+    app = web.Application()
+    app.add_routes([web.get("/ws", topics)])
+
+    book: list[Any] = []
+    trade: list[Any] = []
+    hdlr_book_1 = MagicMock(side_effect=lambda msg, ws: book.append(msg))
+    hdlr_book_2 = MagicMock()
+    hdlr_trade = MagicMock(side_effect=lambda msg, ws: trade.append(msg))
+
+    async def wait_for(items: list[Any], count: int) -> None:
+        while len(items) < count:
+            await asyncio.sleep(0.01)
+
+    async with TestServer(app) as server, pybotters.Client() as client:
+        url = f"ws://127.0.0.1:{server.port}/ws"
+        mux = pybotters.WebSocketMultiplexer(client)
+
+        await mux.subscribe(url, "orderbook.50.BTCUSDT", hdlr_book_1)
+        await mux.subscribe(url, "orderbook.50.BTCUSDT", hdlr_book_2)
+        await mux.subscribe(url, "publicTrade.BTCUSDT", hdlr_trade)
+        await asyncio.wait_for(wait_for(trade, 1), timeout=5.0)
+        await asyncio.wait_for(wait_for(book, 1), timeout=5.0)
+
+        assert connections == 1
+        # Subscribe messages are sent once per topic, in any order on connection
+        messages = [received.get_nowait() for _ in range(received.qsize())]
+        assert sorted(messages, key=json.dumps) == [
+            {"op": "subscribe", "args": ["orderbook.50.BTCUSDT"]},
+            {"op": "subscribe", "args": ["publicTrade.BTCUSDT"]},
+        ]
+        snapshot = {"topic": "orderbook.50.BTCUSDT", "data": "snapshot"}
+        assert book == [snapshot]
+        assert trade == [{"topic": "publicTrade.BTCUSDT", "data": "snapshot"}]
+        assert hdlr_book_2.call_args == call(snapshot, ANY)
+
+        await mux.unsubscribe(url, "orderbook.50.BTCUSDT", hdlr_book_1)
+        assert received.empty()
+        await mux.unsubscribe(url, "orderbook.50.BTCUSDT", hdlr_book_2)
+        assert await asyncio.wait_for(received.get(), timeout=5.0) == {
+            "op": "unsubscribe",
+            "args": ["orderbook.50.BTCUSDT"],
+        }
+
+        # Only the remaining topic is resubscribed when reconnecting
+        connection = mux._connections[(url, pybotters.auth.Auth)]
+        assert connection.send_json == [
+            {"op": "subscribe", "args": ["publicTrade.BTCUSDT"]}
+        ]
+
+        with pytest.raises(ValueError):
+            await mux.unsubscribe(url, "orderbook.50.BTCUSDT", hdlr_book_1)
+        with pytest.raises(ValueError):
+            await mux.unsubscribe(url, "publicTrade.BTCUSDT", hdlr_trade, auth=None)
+        with pytest.raises(ValueError):
+            await mux.subscribe("ws://example.com/ws", "topic", hdlr_trade)
+        with pytest.raises(ValueError):
+            await mux.subscribe(
+                "wss://stream.binance.com/ws", "btcusdt@trade", hdlr_trade
+            )
+
+        # Reconnects and resubscribes the remaining topic
+        current_ws = connection.app.current_ws
+        assert current_ws is not None
+        await current_ws.close()
+        await asyncio.wait_for(closed.wait(), timeout=5.0)
+        assert await asyncio.wait_for(received.get(), timeout=5.0) == {
+            "op": "subscribe",
+            "args": ["publicTrade.BTCUSDT"],
+        }
+        assert connections == 2
+
+        # Closes the connection without reconnecting
+        closed.clear()
+        await mux.close()
+        await asyncio.wait_for(closed.wait(), timeout=5.0)
+        assert connection.app._task.cancelled()
+        assert connection.app.current_ws is None
+        assert mux._connections == {}
+        assert connections == 2
+
+
+@pytest.mark.asyncio
+async def test_websocketmultiplexer_disconnected(mocker: pytest_mock.MockerFixture):
+    async def run_forever(self: WebSocketApp, **kwargs: Any) -> None:
+        self._event.set()
+
+    mocker.patch.object(WebSocketApp, WebSocketApp._run_forever.__name__, run_forever)
+    m_ws_connect = mocker.spy(pybotters.Client, "ws_connect")
+    hdlr = MagicMock()
+
+    async with pybotters.Client() as client:
+        mux = pybotters.WebSocketMultiplexer(client, dispatch="inline")
+        url = "wss://stream.bybit.com/v5/public/linear"
+        await mux.subscribe(url, "orderbook.50.BTCUSDT", hdlr)
+        connection = mux._connections[(url, pybotters.auth.Auth)]
+        assert connection.send_json == [
+            {"op": "subscribe", "args": ["orderbook.50.BTCUSDT"]}
+        ]
+        # Not connected, the list is sent when connected
+        await mux.unsubscribe(url, "orderbook.50.BTCUSDT", hdlr)
+        assert connection.send_json == []
+
+    assert m_ws_connect.call_args == call(
+        client,
+        url,
+        send_json=connection.send_json,
+        hdlr_json=connection.onmessage,
+        auth=pybotters.auth.Auth,
+        dispatch="inline",
+    )
+
+
+@pytest.mark.asyncio
+async def test_shardedwebsocketapp(mocker: pytest_mock.MockerFixture):
+    async def run_forever(self: WebSocketApp, **kwargs: Any) -> None:
+        self._event.set()
+
+    mocker.patch.object(WebSocketApp, WebSocketApp._run_forever.__name__, run_forever)
+    m_ws_connect = mocker.spy(pybotters.Client, "ws_connect")
+    hdlr = MagicMock()
+    topics = [f"orderbook.50.SYMBOL{i}" for i in range(12)]
+    rates = {"orderbook.50.SYMBOL0": 20.0, "orderbook.50.SYMBOL1": 5.0}
+
+    async with pybotters.Client() as client:
+        url = "wss://stream.bybit.com/v5/public/linear"
+        ws = await pybotters.ShardedWebSocketApp(
+            client,
+            url,
+            topics,
+            hdlr_json=hdlr,
+            rate=lambda topic: rates.get(topic, 1.0),
+            shards=2,
+            auth=None,
+        )
+        await ws.wait()
+        await ws.close()
+
+    assert all(app._task.done() for app in ws.apps)
+    assert ws.topics == [
+        ["orderbook.50.SYMBOL0"],
+        ["orderbook.50.SYMBOL1", *(f"orderbook.50.SYMBOL{i}" for i in range(2, 12))],
+    ]
+    assert len(ws.apps) == 2
+    assert m_ws_connect.call_args_list == [
+        call(
+            client,
+            url,
+            send_json=[{"op": "subscribe", "args": ["orderbook.50.SYMBOL0"]}],
+            hdlr_json=hdlr,
+            auth=None,
+        ),
+        call(
+            client,
+            url,
+            send_json=[
+                {"op": "subscribe", "args": ws.topics[1][:10]},
+                {"op": "subscribe", "args": ws.topics[1][10:]},
+            ],
+            hdlr_json=hdlr,
+            auth=None,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("host", "n", "shards", "expected"),
+    [
+        ("stream.binance.com", 2048, None, [1024, 1024]),
+        ("fstream.binance.com", 450, None, [150, 150, 150]),
+        ("fstream.binance.com", 450, 5, [90, 90, 90, 90, 90]),
+        ("stream.bybit.com", 3, 10, [1, 1, 1]),
+        ("ws.okx.com", 300, None, [300]),
+    ],
+)
+def test_shard(host: str, n: int, shards: int | None, expected: list[int]):
+    protocol = pybotters.ws.TopicHosts.items[host]
+    topics = list(range(n))
+    result = pybotters.ws._shard(topics, lambda topic: 1.0, shards or 1, protocol)
+    assert [len(shard) for shard in result] == expected
+    assert sorted(itertools.chain.from_iterable(result)) == topics
+
+
+def test_shard_capacity():
+    # The busiest topics fill a shard up to its limit, the rest go to the others
+    protocol = pybotters.ws.Topic.binance(2)
+    result = pybotters.ws._shard(
+        [1, 2, 3, 4, 100], lambda topic: float(topic), 3, protocol
+    )
+    assert result == [[100], [4, 1], [3, 2]]
+
+
+def test_shardedwebsocketapp_invalid():
+    client = MagicMock()
+    with pytest.raises(ValueError):
+        pybotters.ShardedWebSocketApp(
+            client, "wss://example.com/ws", ["topic"], hdlr_json=MagicMock()
+        )
+    with pytest.raises(ValueError):
+        pybotters.ShardedWebSocketApp(
+            client, "wss://stream.bybit.com/v5/public/linear", [], hdlr_json=MagicMock()
+        )
+    with pytest.raises(ValueError):
+        pybotters.ShardedWebSocketApp(
+            client, "wss://fstream.binance.com/ws", ["topic"], hdlr_json=MagicMock()
+        )
+    pybotters.ShardedWebSocketApp(
+        client, "wss://fstream.binance.com/stream/", ["topic"], hdlr_json=MagicMock()
+    )
+    assert client.ws_connect.call_count == 1
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        (
+            (
+                pybotters.ws.Topic.bybit(),
+                "orderbook.50.BTCUSDT",
+                {"topic": "orderbook.50.BTCUSDT", "type": "snapshot"},
+            ),
+            (
+                {"op": "subscribe", "args": ["orderbook.50.BTCUSDT"]},
+                {"op": "unsubscribe", "args": ["orderbook.50.BTCUSDT"]},
+                "orderbook.50.BTCUSDT",
+            ),
+        ),
+        (
+            (
+                pybotters.ws.Topic.binance(1024),
+                "btcusdt@depth",
+                {"stream": "btcusdt@depth", "data": {}},
+            ),
+            (
+                {"method": "SUBSCRIBE", "params": ["btcusdt@depth"], "id": 1},
+                {"method": "UNSUBSCRIBE", "params": ["btcusdt@depth"], "id": 2},
+                "btcusdt@depth",
+            ),
+        ),
+        (
+            (
+                pybotters.ws.Topic.okx(None, 100),
+                {"channel": "orders", "instType": "ANY"},
+                {"arg": {"channel": "orders", "instType": "ANY", "uid": "1"}},
+            ),
+            (
+                {"op": "subscribe", "args": [{"channel": "orders", "instType": "ANY"}]},
+                {
+                    "op": "unsubscribe",
+                    "args": [{"channel": "orders", "instType": "ANY"}],
+                },
+                (("channel", "orders"), ("instType", "ANY")),
+            ),
+        ),
+    ],
+)
+def test_topic(test_input, expected):
+    protocol, topic, msg = test_input
+    subscribe, unsubscribe, key = expected
+
+    assert protocol.subscribe([topic]) == subscribe
+    assert protocol.unsubscribe([topic]) == unsubscribe
+    assert protocol.key(topic) == key
+    assert protocol.route(msg) == key
+    assert protocol.route({"success": True}) is None
+    assert protocol.route("pong") is None
+
+
 @pytest_asyncio.fixture
 async def test_ping_pong_server():
     call_count = 0
@@ -645,8 +1016,38 @@ async def test_wsresponse_send_json():
     await asyncio.wait_for(wsresp.send_json({"foo": "bar"}), timeout=5.0)
 
     assert m_writer.send_frame.call_args == call(
-        b'{"foo": "bar"}', aiohttp.WSMsgType.TEXT, compress=None
+        pybotters._json.dumps({"foo": "bar"}).encode(),
+        aiohttp.WSMsgType.TEXT,
+        compress=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_wsresponse_send_json_dumps():
+    m_resp = MagicMock()
+    m_resp._auth = None
+    m_resp._session.__dict__["_json_dumps"] = lambda obj: "__DUMPS__"
+    m_writer = AsyncMock()
+
+    wsresp = pybotters.ws.ClientWebSocketResponse(
+        reader=AsyncMock(),
+        writer=m_writer,
+        protocol=None,
+        response=m_resp,
+        timeout=10.0,
+        autoclose=True,
+        autoping=True,
+        loop=asyncio.get_running_loop(),
     )
+    await asyncio.wait_for(wsresp.send_json({"foo": "bar"}), timeout=5.0)
+    await asyncio.wait_for(
+        wsresp.send_json({"foo": "bar"}, dumps=json.dumps), timeout=5.0
+    )
+
+    assert m_writer.send_frame.call_args_list == [
+        call(b"__DUMPS__", aiohttp.WSMsgType.TEXT, compress=None),
+        call(b'{"foo": "bar"}', aiohttp.WSMsgType.TEXT, compress=None),
+    ]
 
 
 @pytest.mark.asyncio
@@ -763,6 +1164,59 @@ async def test_wsresponse_send_json_msgsign(
         assert m_msgsign.call_args == call(wsresp, expected["data"])
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        ((URL("ws://example.com"), call({"foo": "bar"})), True),
+        ((URL("ws://example.com"), call(data={"foo": "bar"})), False),
+        ((URL("ws://not-example.com"), call({"foo": "bar"})), False),
+    ],
+)
+async def test_wsresponse_send_json_batch(
+    mocker: pytest_mock.MockerFixture, test_input, expected
+):
+    m_batch = AsyncMock()
+    items = {
+        "example.com": m_batch,
+    }
+    mocker.patch.object(pybotters.ws.MessageBatchHosts, "items", items)
+    m_resp = MagicMock()
+    m_resp.__dict__["_auth"] = None
+    m_resp.url, argument = test_input
+    m_writer = AsyncMock()
+
+    wsresp = pybotters.ws.ClientWebSocketResponse(
+        reader=AsyncMock(),
+        writer=m_writer,
+        protocol=None,
+        response=m_resp,
+        timeout=10.0,
+        autoclose=True,
+        autoping=True,
+        loop=asyncio.get_running_loop(),
+    )
+    await asyncio.wait_for(
+        wsresp.send_json(*argument.args, **argument.kwargs), timeout=5.0
+    )
+
+    assert m_batch.called is expected
+    if expected:
+        assert m_batch.call_args == call(wsresp, {"foo": "bar"}, ANY)
+        await m_batch.call_args.args[2]({"spam": "eggs"})
+        assert m_writer.send_frame.call_args == call(
+            pybotters._json.dumps({"spam": "eggs"}).encode(),
+            aiohttp.WSMsgType.TEXT,
+            compress=None,
+        )
+    else:
+        assert m_writer.send_frame.call_args == call(
+            pybotters._json.dumps({"foo": "bar"}).encode(),
+            aiohttp.WSMsgType.TEXT,
+            compress=None,
+        )
+
+
 @pytest.mark.asyncio
 async def test_websocketqueue():
     wsq = pybotters.ws.WebSocketQueue()
@@ -1744,65 +2198,183 @@ async def test_auth_coincheck_ws(test_input, expected, caplog) -> None:
 
 
 @pytest.mark.asyncio
-async def test_ratelimit_gmocoin(mocker: pytest_mock.MockerFixture):
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        (pybotters.ws.RequestLimit.gmocoin, [call(0.0), call(1.0), call(1.5)]),
+        (pybotters.ws.RequestLimit.binance, [call(0.0), call(0.25), call(0.0)]),
+    ],
+)
+async def test_ratelimit(mocker: pytest_mock.MockerFixture, test_input, expected):
     m_sleep = mocker.patch("asyncio.sleep")
+    m_time = mocker.patch.object(pybotters.ws, "time")
+    m_time.monotonic.side_effect = [100.0, 100.0, 100.5]
 
-    m_resp = AsyncMock()
-    m_resp.json.side_effect = [
-        {
-            "status": 0,
-            "data": {"status": "OPEN"},
-            "responsetime": "2024-01-18T02:28:40.000Z",
-        },
-        {
-            "status": 0,
-            "data": {"status": "OPEN"},
-            "responsetime": "2024-01-18T02:28:40.800Z",
-        },
-        {
-            "status": 0,
-            "data": {"status": "OPEN"},
-            "responsetime": "2024-01-18T02:28:41.600Z",
-        },
-        AssertionError(),
-    ]
-    m_wsresp = AsyncMock()
-    m_wsresp._lock = AsyncMock()
-    m_wsresp._response._session.get.return_value = m_resp
-    m_send_str = AsyncMock().send_str()
+    m_wsresp = MagicMock()
+    m_send = AsyncMock()
+
+    for i in range(3):
+        await asyncio.wait_for(test_input(m_wsresp, m_send(i)), timeout=5.0)
+
+    assert m_sleep.call_args_list == expected
+    assert m_send.await_args_list == [call(0), call(1), call(2)]
+    assert not m_wsresp._response._session.get.called
+
+
+@pytest.mark.asyncio
+async def test_messagebatch_binance():
+    m_wsresp = MagicMock()
+    m_send_json = AsyncMock()
+
+    def subscribe(method: str, params: list[str], id: int):
+        return {"method": method, "params": params, "id": id}
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", ["a@trade"], 1), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("UNSUBSCRIBE", ["c@trade"], 2), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", ["b@trade", "b@depth"], 3), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, {"method": "LIST_SUBSCRIPTIONS", "id": 4}, m_send_json
+            ),
+        ),
+        timeout=5.0,
+    )
 
+    assert m_send_json.await_args_list == [
+        call({"method": "LIST_SUBSCRIPTIONS", "id": 4}),
+        call(subscribe("SUBSCRIBE", ["a@trade", "b@trade", "b@depth"], 1)),
+        call(subscribe("UNSUBSCRIBE", ["c@trade"], 2)),
+    ]
+    assert m_wsresp.__dict__["_batches"] == {}
+    assert m_wsresp.__dict__["_batch_acks"] == {1: [3]}
+    m_wsresp.__dict__["_batch_acks"].clear()
+
+    # Requests are merged while the first one waits for the rate limit
+    m_send_json.reset_mock()
+    limiter = pybotters.ws._RateLimiter.get(m_wsresp, 0.05)
+    await limiter.acquire()
+
+    first = asyncio.create_task(
+        pybotters.ws.MessageBatch.binance(
+            m_wsresp, subscribe("SUBSCRIBE", ["d@trade"], 5), m_send_json
+        )
+    )
+    await asyncio.sleep(0.01)
     await asyncio.wait_for(
-        pybotters.ws.RequestLimit.gmocoin(m_wsresp, m_send_str), timeout=5.0
+        pybotters.ws.MessageBatch.binance(
+            m_wsresp, subscribe("SUBSCRIBE", ["e@trade"], 6), m_send_json
+        ),
+        timeout=5.0,
     )
+    await asyncio.wait_for(first, timeout=5.0)
 
-    assert m_wsresp._response._session.get.call_count == 3
-    assert m_resp.json.call_count == 3
-    assert m_sleep.call_count == 2
+    assert m_send_json.await_args_list == [
+        call(subscribe("SUBSCRIBE", ["d@trade", "e@trade"], 5))
+    ]
+    assert m_wsresp.__dict__["_batch_acks"] == {5: [6]}
 
+    # Merged params are limited to _BINANCE_MAX_ARGS per request
+    m_send_json.reset_mock()
+    m_wsresp.__dict__["_batch_acks"].clear()
+    await limiter.acquire()
+    params = [f"s{i}@trade" for i in range(250)]
 
-@pytest.mark.asyncio
-async def test_ratelimit_binance(mocker: pytest_mock.MockerFixture):
-    m_sleep = mocker.patch("asyncio.sleep")
+    await asyncio.wait_for(
+        asyncio.gather(
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", params[:150], 7), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", params[150:200], 8), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", params[200:], 9), m_send_json
+            ),
+        ),
+        timeout=5.0,
+    )
 
-    m_resp = AsyncMock()
-    m_resp.json.side_effect = [
-        {"serverTime": 1705545344000},
-        {"serverTime": 1705545344200},
-        {"serverTime": 1705545344400},
-        AssertionError(),
+    assert m_send_json.await_args_list == [
+        call(subscribe("SUBSCRIBE", params[:200], 7)),
+        call(subscribe("SUBSCRIBE", params[200:], 9)),
     ]
-    m_wsresp = AsyncMock()
-    m_wsresp._lock = AsyncMock()
-    m_wsresp._response._session.get.return_value = m_resp
-    m_send_str = AsyncMock().send_str()
+    assert m_wsresp.__dict__["_batch_acks"] == {7: [8]}
+    assert m_wsresp.__dict__["_batches"] == {}
+
+    # The merged request takes the first id when the first request has none
+    m_send_json.reset_mock()
+    m_wsresp.__dict__["_batch_acks"].clear()
+    await limiter.acquire()
 
     await asyncio.wait_for(
-        pybotters.ws.RequestLimit.binance(m_wsresp, m_send_str), timeout=5.0
+        asyncio.gather(
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, {"method": "SUBSCRIBE", "params": ["f@trade"]}, m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, {"method": "SUBSCRIBE", "params": ["g@trade"]}, m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", ["h@trade"], 10), m_send_json
+            ),
+            pybotters.ws.MessageBatch.binance(
+                m_wsresp, subscribe("SUBSCRIBE", ["i@trade"], 11), m_send_json
+            ),
+        ),
+        timeout=5.0,
+    )
+
+    assert m_send_json.await_args_list == [
+        call(subscribe("SUBSCRIBE", ["f@trade", "g@trade", "h@trade", "i@trade"], 10))
+    ]
+    assert m_wsresp.__dict__["_batch_acks"] == {10: [11]}
+
+
+@pytest.mark.asyncio
+async def test_wsresponse_receive_batch_acks(mocker: pytest_mock.MockerFixture):
+    messages = [
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, '{"result":null,"id":1}', None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, "[1]", None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, "not json", None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, b'{"id":4}', None),
+        aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, '{"result":null,"id":4}', None),
+    ]
+    mocker.patch.object(
+        aiohttp.ClientWebSocketResponse, "receive", AsyncMock(side_effect=messages)
+    )
+    m_resp = MagicMock()
+    m_resp.__dict__["_auth"] = None
+    m_resp.url = URL("wss://example.com/stream")
+    wsresp = pybotters.ws.ClientWebSocketResponse(
+        reader=AsyncMock(),
+        writer=AsyncMock(),
+        protocol=None,
+        response=m_resp,
+        timeout=10.0,
+        autoclose=True,
+        autoping=True,
+        loop=asyncio.get_running_loop(),
     )
+    wsresp.__dict__["_batch_acks"] = {1: [2, 3], 4: [5]}
+
+    received = [await wsresp.receive() for _ in range(7)]
 
-    assert m_wsresp._response._session.get.call_count == 3
-    assert m_resp.json.call_count == 3
-    assert m_sleep.call_count == 2
+    assert [json.loads(msg.data) for msg in received[:3]] == [
+        {"result": None, "id": 1},
+        {"result": None, "id": 2},
+        {"result": None, "id": 3},
+    ]
+    assert received[3:6] == messages[1:4]
+    assert json.loads(received[6].data) == {"result": None, "id": 4}
+    assert json.loads((await wsresp.receive()).data) == {"result": None, "id": 5}
+    assert wsresp.__dict__["_batch_acks"] == {}
 
 
 @pytest.mark.parametrize(